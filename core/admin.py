@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
 from .models import (
     IngredientCategory,
@@ -8,6 +10,8 @@ from .models import (
     RecipeIngredient,
     MealPlan,
     RecipeMealPlan,
+    MealPlanTemplate,
+    MealPlanTemplateRecipe,
     ShoppingList,
     ShoppingListItem,
     ShoppingListTemplate,
@@ -17,6 +21,8 @@ from .models import (
     PremiumMealPlanRecipe,
     UserPurchase,
 )
+from .sync import record_queryset_changes
+from .versions import bump_queryset_versions
 
 
 # Inline для отображения ингредиентов рецепта прямо в форме рецепта
@@ -39,6 +45,13 @@ class RecipeMealPlanInline(admin.TabularInline):
     raw_id_fields = ["recipe"]
 
 
+# Inline для отображения рецептов в шаблоне плана питания
+class MealPlanTemplateRecipeInline(admin.TabularInline):
+    model = MealPlanTemplateRecipe
+    extra = 0
+    raw_id_fields = ["recipe"]
+
+
 # Inline для отображения элементов списка покупок
 class ShoppingListItemInline(admin.TabularInline):
     model = ShoppingListItem
@@ -202,15 +215,19 @@ class ShoppingListAdmin(admin.ModelAdmin):
     progress_display.short_description = "Прогресс"
 
     def mark_as_completed(self, request, queryset):
-        from django.utils import timezone
-
-        updated = queryset.update(status="completed", completed_at=timezone.now())
+        record_queryset_changes(queryset)
+        updated = queryset.update(
+            status="completed", completed_at=timezone.now(), updated_at=timezone.now()
+        )
         self.message_user(request, f"{updated} списков отмечены как завершенные")
 
     mark_as_completed.short_description = "Отметить как завершенные"
 
     def mark_as_active(self, request, queryset):
-        updated = queryset.update(status="active", completed_at=None)
+        record_queryset_changes(queryset)
+        updated = queryset.update(
+            status="active", completed_at=None, updated_at=timezone.now()
+        )
         self.message_user(request, f"{updated} списков отмечены как активные")
 
     mark_as_active.short_description = "Отметить как активные"
@@ -237,13 +254,19 @@ class ShoppingListItemAdmin(admin.ModelAdmin):
     raw_id_fields = ["shopping_list", "ingredient"]
 
     def mark_as_checked(self, request, queryset):
-        updated = queryset.update(checked=True)
+        record_queryset_changes(queryset)
+        updated = queryset.update(
+            checked=True, checked_changed_at=timezone.now(), updated_at=timezone.now()
+        )
         self.message_user(request, f"{updated} элементов отмечены как купленные")
 
     mark_as_checked.short_description = "Отметить как купленные"
 
     def mark_as_unchecked(self, request, queryset):
-        updated = queryset.update(checked=False)
+        record_queryset_changes(queryset)
+        updated = queryset.update(
+            checked=False, checked_changed_at=timezone.now(), updated_at=timezone.now()
+        )
         self.message_user(request, f"{updated} элементов отмечены как некупленные")
 
     mark_as_unchecked.short_description = "Отметить как некупленные"
@@ -521,6 +544,15 @@ class RecipeMealPlanAdmin(admin.ModelAdmin):
     raw_id_fields = ["meal_plan", "recipe"]
 
 
+@admin.register(MealPlanTemplate)
+class MealPlanTemplateAdmin(admin.ModelAdmin):
+    list_display = ["name", "user", "duration_days", "created_at"]
+    search_fields = ["name", "user__username"]
+    list_select_related = ["user"]
+    raw_id_fields = ["user"]
+    inlines = [MealPlanTemplateRecipeInline]
+
+
 @admin.register(PremiumMealPlan)
 class PremiumMealPlanAdmin(admin.ModelAdmin):
     list_display = [
@@ -710,19 +742,25 @@ class UserPurchaseAdmin(admin.ModelAdmin):
 
     # Действия для массового изменения статусов
     def mark_as_paid(self, request, queryset):
-        updated = queryset.update(status='paid')
+        with transaction.atomic():
+            bump_queryset_versions(queryset, 'purchases')
+            updated = queryset.update(status='paid')
         self.message_user(request, f"{updated} покупок отмечены как оплаченные")
 
     mark_as_paid.short_description = "Отметить как оплаченные"
 
     def mark_as_processing(self, request, queryset):
-        updated = queryset.update(status='processing')
+        with transaction.atomic():
+            bump_queryset_versions(queryset, 'purchases')
+            updated = queryset.update(status='processing')
         self.message_user(request, f"{updated} покупок отмечены как в обработке")
 
     mark_as_processing.short_description = "Отметить как в обработке"
 
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
+        with transaction.atomic():
+            bump_queryset_versions(queryset, 'purchases')
+            updated = queryset.update(status='cancelled')
         self.message_user(request, f"{updated} покупок отмечены как отмененные")
 
     mark_as_cancelled.short_description = "Отметить как отмененные"
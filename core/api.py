@@ -5,10 +5,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
 from datetime import datetime
+import uuid
 from .models import *
 from .serializers import *
 from .services import activate_premium_menu_for_user, create_meal_plan_from_premium
@@ -16,11 +19,59 @@ from .shopping_list_manager import (
     get_or_create_shopping_list,
     archive_old_shopping_lists,
 )
+from .sync import build_sync_payload, record_changes
+from .events import (
+    publish_shopping_list_events,
+    stream_shopping_list_events,
+    item_checked_event,
+    item_quantity_event,
+    item_updated_event,
+    item_removed_event,
+)
+from .renderers import EventStreamRenderer
+from .fast_serializers import (
+    ingredient_rows,
+    serialize_ingredients,
+    meal_plan_rows,
+    serialize_meal_plans,
+    shopping_list_rows,
+    serialize_shopping_lists,
+    purchase_rows,
+    serialize_purchases,
+    recipe_rows,
+    serialize_recipes,
+)
+from .streaming import StreamedRows, streaming_json_response
+from .recipe_fragments import (
+    recipe_version_rows,
+    render_recipe_page,
+    render_recipes_by_id,
+)
+from .entitlements import get_entitlements
+from .tiered_cache import reference_data
+from .week import get_week
+from .ical import calendar_url
+from .meal_plan_summary import MAX_SUMMARY_DAYS, day_summaries
+from .meal_plan_bulk import (
+    BulkEditError,
+    apply_operations,
+    apply_template,
+    copy_meal_plans,
+)
+from .bootstrap import (
+    build_bootstrap,
+    popular_tags,
+    recipe_filters,
+    user_access_info,
+)
+from .throttling import bucket_throttles, limit_concurrency
+from .versions import conditional_user_data
 from django.contrib.auth.models import User
 from rest_framework.decorators import api_view
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 
@@ -60,17 +111,70 @@ def register_user(request):
         )
 
 
+def fast_list_response(view, rows, serialize):
+    """
+    Ответ списка через быстрые сериализаторы (core/fast_serializers.py)
+    с обычной пагинацией view
+    """
+    page = view.paginate_queryset(rows)
+    if page is not None:
+        return view.get_paginated_response(serialize(page))
+    return Response(serialize(rows))
+
+
+def reference_list_response(view, name, load):
+    """
+    Полный список справочника из двухуровневого кэша (core/tiered_cache.py).
+    Запросы с поиском, фильтрами или сортировкой идут в БД: None
+    """
+    if set(view.request.query_params) - {"page", "format"}:
+        return None
+    return fast_list_response(view, reference_data(name, load), list)
+
+
+class ReferenceListMixin:
+    """list() справочника через reference_list_response"""
+
+    reference_name = None
+
+    def list(self, request, *args, **kwargs):
+        response = reference_list_response(
+            self,
+            self.reference_name,
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return response
+
+
+class AtomicWritesMixin:
+    """
+    Изменяющие запросы выполняются в одной транзакции: данные, журнал
+    синхронизации и версии данных пользователя (ETag) меняются вместе.
+    При ошибке DRF откатывает транзакцию (set_rollback).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in permissions.SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+
 # Базовые ViewSets
-class IngredientCategoryViewSet(viewsets.ModelViewSet):
+class IngredientCategoryViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     queryset = IngredientCategory.objects.all()
     serializer_class = IngredientCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reference_name = "ingredient_categories"
 
 
-class CookingMethodViewSet(viewsets.ModelViewSet):
+class CookingMethodViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     queryset = CookingMethod.objects.all()
     serializer_class = CookingMethodSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reference_name = "cooking_methods"
 
 
 class IngredientViewSet(viewsets.ModelViewSet):
@@ -81,6 +185,19 @@ class IngredientViewSet(viewsets.ModelViewSet):
     filterset_fields = ["category"]
     search_fields = ["name"]
 
+    def list(self, request, *args, **kwargs):
+        response = reference_list_response(
+            self,
+            "ingredients",
+            lambda: serialize_ingredients(ingredient_rows(self.get_queryset())),
+        )
+        if response is not None:
+            return response
+        queryset = self.filter_queryset(self.get_queryset())
+        return fast_list_response(
+            self, ingredient_rows(queryset), serialize_ingredients
+        )
+
 
 # Рецепты
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -92,6 +209,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "description", "ingredients__ingredient__name"]
     ordering_fields = ["name", "cooking_time", "difficulty"]
     ordering = ["name"]
+    # /api/recipes/batch/: максимум рецептов и поля для ?fields=
+    batch_limit = 100
+    batch_fields = [
+        name for name in RecipeSerializer.Meta.fields if name != "tag_ids"
+    ]
 
     def get_queryset(self):
         """
@@ -114,6 +236,14 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return final_queryset
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return fast_list_response(
+            self,
+            recipe_version_rows(queryset),
+            lambda rows: render_recipe_page(rows, request),
+        )
+
     def _get_purchased_premium_recipe_ids(self, user):
         """
         Возвращает ID всех премиум рецептов из меню, купленных пользователем
@@ -121,20 +251,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return []
 
-        # Более эффективный запрос с использованием exists и подзапроса
-        from django.db.models import Exists, OuterRef
-        from .models import PremiumMealPlanRecipe, UserPurchase
-
-        # Получаем все премиум рецепты из купленных меню пользователя
-        purchased_recipe_ids = (
-            PremiumMealPlanRecipe.objects.filter(
-                premium_meal_plan__userpurchase__user=user
-            )
-            .values_list("recipe_id", flat=True)
-            .distinct()
-        )
-
-        return list(purchased_recipe_ids)
+        # Те же данные нужны для полей доступа в ответе - считаются один раз
+        return list(get_entitlements(user))
 
     def get_serializer_context(self):
         """Добавляем информацию о доступе к рецепту в контекст"""
@@ -144,31 +262,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def _get_user_access_info(self):
         """Возвращает информацию о доступе пользователя к рецептам"""
-        if not self.request.user.is_authenticated:
-            return {"has_premium_access": False, "purchased_menus": []}
-
-        user = self.request.user
-        purchased_menus = UserPurchase.objects.filter(user=user).select_related(
-            "premium_meal_plan"
-        )
-
-        return {
-            "has_premium_access": purchased_menus.exists(),
-            "purchased_menus": [
-                purchase.premium_meal_plan_id for purchase in purchased_menus
-            ],
-        }
+        return user_access_info(self.request.user)
 
     @action(detail=False, methods=["get"])
     def filters(self, request):
         """Получить доступные фильтры для рецептов с учетом премиум доступа"""
-        response_data = {
-            "cooking_methods": CookingMethodSerializer(
-                CookingMethod.objects.all(), many=True
-            ).data,
-            "difficulty_levels": Recipe.DIFFICULTY_LEVELS,
-            "tags": TagSerializer(Tag.objects.all(), many=True).data,
-        }
+        response_data = recipe_filters()
 
         # Добавляем информацию о премиум доступе
         access_info = self._get_user_access_info()
@@ -176,7 +275,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response(response_data)
 
-    @action(detail=False, methods=["get"])
+    @action(
+        detail=False,
+        methods=["get"],
+        throttle_classes=bucket_throttles("recipes.search"),
+    )
+    @limit_concurrency("recipes.search")
     def search(self, request):
         """Расширенный поиск рецептов с учетом премиум доступа"""
         search_query = request.query_params.get("q", "")
@@ -209,13 +313,85 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(tags__id=tag_id)
             queryset = queryset.distinct()
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return fast_list_response(
+            self,
+            recipe_version_rows(queryset),
+            lambda rows: render_recipe_page(rows, request),
+        )
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """
+        Рецепты по списку id одним запросом для экранов планов питания и
+        премиум меню: ?ids=<id>,<id>&fields=id,name,ingredients
+
+        Премиум доступ проверяется один раз на весь набор (get_queryset),
+        ингредиенты и теги загружаются постоянным числом запросов. Ответ -
+        рецепты по id; несуществующие и недоступные id - в missing.
+        """
+        ids = []
+        for value in request.query_params.getlist("ids"):
+            for part in filter(None, value.split(",")):
+                try:
+                    recipe_id = uuid.UUID(part)
+                except ValueError:
+                    return Response(
+                        {"error": f"Неверный id рецепта: {part}"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                if recipe_id not in ids:
+                    ids.append(recipe_id)
+
+        if not ids:
+            return Response(
+                {"error": "Необходимо указать ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > self.batch_limit:
+            return Response(
+                {"error": f"Не больше {self.batch_limit} рецептов за запрос"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fields = [
+            name
+            for value in request.query_params.getlist("fields")
+            for name in value.split(",")
+            if name
+        ]
+        unknown = sorted(set(fields) - set(self.batch_fields))
+        if unknown:
+            return Response(
+                {"error": f"Неизвестные поля: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.get_queryset().filter(id__in=ids)
+        if fields:
+            # Выборка полей: без кэша фрагментов, он хранит рецепт целиком
+            by_id = {row["id"]: row for row in recipe_rows(queryset)}
+            rows = [by_id[recipe_id] for recipe_id in ids if recipe_id in by_id]
+            recipes = {
+                row["id"]: {name: item[name] for name in fields if name in item}
+                for row, item in zip(rows, serialize_recipes(rows, request))
+            }
+        else:
+            by_id = {row["id"]: row for row in recipe_version_rows(queryset)}
+            recipes = render_recipes_by_id(
+                [by_id[recipe_id] for recipe_id in ids if recipe_id in by_id],
+                request,
+            )
+
+        return Response(
+            {
+                "recipes": {
+                    str(recipe_id): data for recipe_id, data in recipes.items()
+                },
+                "missing": [
+                    str(recipe_id) for recipe_id in ids if recipe_id not in recipes
+                ],
+            }
+        )
 
     @action(detail=True, methods=["get"])
     def access_info(self, request, pk=None):
@@ -259,25 +435,22 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return Response(access_info)
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [SearchFilter]
     search_fields = ["name"]
+    reference_name = "tags"
 
     @action(detail=False, methods=["get"])
     def popular(self, request):
         """Получить популярные теги"""
-        popular_tags = Tag.objects.annotate(recipe_count=Count("recipe")).order_by(
-            "-recipe_count"
-        )[:10]
-        serializer = self.get_serializer(popular_tags, many=True)
-        return Response(serializer.data)
+        return Response(popular_tags())
 
 
 # Планы питания
-class MealPlanViewSet(viewsets.ModelViewSet):
+class MealPlanViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     queryset = MealPlan.objects.all()
     serializer_class = MealPlanSerializer
     permission_classes = [IsAuthenticated]
@@ -294,7 +467,12 @@ class MealPlanViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return fast_list_response(self, meal_plan_rows(queryset), serialize_meal_plans)
+
     @action(detail=False, methods=["get"])
+    @conditional_user_data("meal_plans")
     def range(self, request):
         """Получить планы питания за период"""
         start_date = request.query_params.get("start")
@@ -308,8 +486,110 @@ class MealPlanViewSet(viewsets.ModelViewSet):
 
         queryset = self.get_queryset().filter(date__gte=start_date, date__lte=end_date)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return streaming_json_response(
+            request, StreamedRows(meal_plan_rows(queryset), serialize_meal_plans)
+        )
+
+    @action(detail=False, methods=["get"])
+    @conditional_user_data("meal_plans")
+    def summary(self, request):
+        """
+        Сводка по дням за период для календаря (core/meal_plan_summary.py):
+        число рецептов, время готовки и заполненные приемы пищи
+        """
+        try:
+            start_date = datetime.strptime(
+                request.query_params["start"], "%Y-%m-%d"
+            ).date()
+            end_date = datetime.strptime(request.query_params["end"], "%Y-%m-%d").date()
+        except KeyError:
+            return Response(
+                {"error": "Необходимо указать start и end даты"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError:
+            return Response(
+                {"error": "Неверный формат даты. Используйте YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not 0 <= (end_date - start_date).days < MAX_SUMMARY_DAYS:
+            return Response(
+                {"error": f"Период от 1 до {MAX_SUMMARY_DAYS} дней"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(day_summaries(request.user, start_date, end_date))
+
+    @action(detail=False, methods=["get"])
+    @conditional_user_data("meal_plans")
+    def week(self, request):
+        """
+        Неделя для планировщика (core/week.py): сетка день × прием пищи с
+        карточками рецептов и итогами по дням. Параметр date - любой день
+        недели (по умолчанию - сегодня).
+        """
+        day = timezone.localdate()
+        if "date" in request.query_params:
+            try:
+                day = datetime.strptime(request.query_params["date"], "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"error": "Неверный формат даты. Используйте YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        return Response(get_week(request.user, day, request))
+
+    @action(detail=False, methods=["get"], url_path="calendar-link")
+    def calendar_link(self, request):
+        """Ссылка на ленту iCalendar для подписки в календаре (core/ical.py)"""
+        return Response({"url": calendar_url(request, request.user)})
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Пакетное редактирование планов питания (core/meal_plan_bulk.py):
+        операции add, remove, move, portions, reorder применяются по порядку
+        в одной транзакции. Возвращает затронутые слоты.
+        """
+        serializer = MealPlanBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            slot_ids = apply_operations(
+                request.user, serializer.validated_data["operations"]
+            )
+        except BulkEditError as error:
+            return Response(
+                {"error": error.message, "operation": error.index},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.get_queryset().filter(id__in=slot_ids)
+        return Response(serialize_meal_plans(meal_plan_rows(queryset)))
+
+    @action(detail=False, methods=["post"])
+    def copy(self, request):
+        """
+        Скопировать планы питания периода в другие периоды, например
+        повторить неделю 4 раза: {"source_start", "source_end", "repeat": 4}
+        """
+        serializer = MealPlanCopySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        result = copy_meal_plans(
+            request.user,
+            data["source_start"],
+            data["source_end"],
+            data["target_starts"],
+            data["on_conflict"],
+        )
+        result["target_starts"] = [start.isoformat() for start in data["target_starts"]]
+        return Response(result, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"])
     def add_recipe(self, request, pk=None):
@@ -362,7 +642,7 @@ class MealPlanViewSet(viewsets.ModelViewSet):
 
 
 # Списки покупок
-class ShoppingListViewSet(viewsets.ModelViewSet):
+class ShoppingListViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = ShoppingList.objects.all()
 
@@ -379,7 +659,19 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    @action(detail=False, methods=["post"])
+    @conditional_user_data("shopping_lists")
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return fast_list_response(
+            self, shopping_list_rows(queryset), serialize_shopping_lists
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        throttle_classes=bucket_throttles("shopping_lists.generate"),
+    )
+    @limit_concurrency("shopping_lists.generate")
     def generate(self, request):
         """Умная генерация списка покупок с проверкой актуальности"""
         start_date = request.data.get("start_date")
@@ -468,16 +760,15 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
 
         history_lists = get_shopping_list_history(request.user, days)
 
-        from .serializers import ShoppingListSerializer
-
-        serializer = ShoppingListSerializer(history_lists, many=True)
-
-        return Response(
+        return streaming_json_response(
+            request,
             {
                 "period_days": days,
-                "total_lists": len(history_lists),
-                "lists": serializer.data,
-            }
+                "total_lists": history_lists.count(),
+                "lists": StreamedRows(
+                    shopping_list_rows(history_lists), serialize_shopping_lists
+                ),
+            },
         )
 
     @action(detail=True, methods=["get"])
@@ -503,6 +794,30 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
             }
         )
 
+    @action(
+        detail=True,
+        methods=["get"],
+        renderer_classes=[EventStreamRenderer],
+        throttle_classes=bucket_throttles("shopping_lists.events"),
+    )
+    @limit_concurrency("shopping_lists.events")
+    def events(self, request, pk=None):
+        """
+        SSE-поток изменений элементов списка (checked, quantity, added,
+        removed, updated). Клиент подключается через EventSource-полифилл
+        с заголовком Authorization и при переподключении перечитывает список.
+        """
+        shopping_list = get_object_or_404(
+            ShoppingList.objects.only("id"), pk=pk, user=request.user
+        )
+        response = StreamingHttpResponse(
+            stream_shopping_list_events(shopping_list.id),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
     @action(detail=True, methods=["post"])
     def duplicate(self, request, pk=None):
         """Создать копию списка покупок"""
@@ -538,7 +853,7 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
         )
 
 
-class ShoppingListItemViewSet(viewsets.ModelViewSet):
+class ShoppingListItemViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
     serializer_class = ShoppingListItemSerializer
     permission_classes = [IsAuthenticated]
     queryset = ShoppingListItem.objects.all()
@@ -548,12 +863,39 @@ class ShoppingListItemViewSet(viewsets.ModelViewSet):
             shopping_list__user=self.request.user
         ).select_related("ingredient", "category")
 
+    def perform_update(self, serializer):
+        item = serializer.instance
+        previous_checked = item.checked
+        previous_quantity = (item.quantity, item.unit)
+
+        checked = serializer.validated_data.get("checked")
+        if checked is not None and checked != previous_checked:
+            serializer.save(checked_changed_at=timezone.now())
+        else:
+            serializer.save()
+
+        events = []
+        if item.checked != previous_checked:
+            events.append(item_checked_event(item))
+        if (item.quantity, item.unit) != previous_quantity:
+            events.append(item_quantity_event(item))
+        if set(serializer.validated_data) - {"checked", "quantity"}:
+            events.append(item_updated_event(item))
+        publish_shopping_list_events(item.shopping_list_id, events)
+
+    def perform_destroy(self, instance):
+        shopping_list_id, item_id = instance.shopping_list_id, instance.id
+        instance.delete()
+        publish_shopping_list_events(shopping_list_id, [item_removed_event(item_id)])
+
     @action(detail=True, methods=["post"])
     def toggle(self, request, pk=None):
         """Переключить статус checked с обновлением счетчиков списка"""
         item = self.get_object()
         item.checked = not item.checked
+        item.checked_changed_at = timezone.now()
         item.save()
+        publish_shopping_list_events(item.shopping_list_id, [item_checked_event(item)])
 
         # Получаем родительский список покупок
         shopping_list = item.shopping_list
@@ -577,6 +919,126 @@ class ShoppingListItemViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(item)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["post"])
+    def batch_check(self, request):
+        """
+        Применить пачку отметок, накопленных в офлайне.
+        Каждая операция задает конкретное состояние (а не переключает его),
+        поэтому повторная отправка безопасна. При конфликте побеждает операция
+        с более поздним client_timestamp.
+        """
+        serializer = ShoppingListItemBatchCheckSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+
+        # Схлопываем операции по элементу: остается самая поздняя
+        latest_operations = {}
+        for operation in serializer.validated_data["operations"]:
+            # Часы клиента могут спешить - не даем им "закрепить" состояние в будущем
+            operation["client_timestamp"] = min(operation["client_timestamp"], now)
+            current = latest_operations.get(operation["item_id"])
+            if (
+                current is None
+                or operation["client_timestamp"] >= current["client_timestamp"]
+            ):
+                latest_operations[operation["item_id"]] = operation
+
+        with transaction.atomic():
+            items = list(
+                ShoppingListItem.objects.select_for_update(of=("self",)).filter(
+                    shopping_list__user=request.user, id__in=latest_operations.keys()
+                )
+            )
+
+            changed_items = []
+            for item in items:
+                operation = latest_operations[item.id]
+                if (
+                    item.checked_changed_at is not None
+                    and operation["client_timestamp"] < item.checked_changed_at
+                ):
+                    # На сервере уже есть более свежее изменение
+                    continue
+                if (
+                    item.checked == operation["checked"]
+                    and item.checked_changed_at == operation["client_timestamp"]
+                ):
+                    continue
+                item.checked = operation["checked"]
+                item.checked_changed_at = operation["client_timestamp"]
+                item.updated_at = now
+                changed_items.append(item)
+
+            if changed_items:
+                ShoppingListItem.objects.bulk_update(
+                    changed_items, ["checked", "checked_changed_at", "updated_at"]
+                )
+                record_changes(
+                    ShoppingListItem,
+                    [(request.user.id, item.id) for item in changed_items],
+                )
+                for item in changed_items:
+                    publish_shopping_list_events(
+                        item.shopping_list_id, [item_checked_event(item)]
+                    )
+
+            # Счетчики и журнал - только для списков, где что-то изменилось:
+            # повторная отправка того же пакета не меняет ETag списков.
+            # Пересчет одним UPDATE по всем спискам
+            changed_list_ids = {item.shopping_list_id for item in changed_items}
+            if changed_list_ids:
+
+                def count_items(**filters):
+                    return Coalesce(
+                        Subquery(
+                            ShoppingListItem.objects.filter(
+                                shopping_list_id=OuterRef("pk"), **filters
+                            )
+                            .values("shopping_list_id")
+                            .annotate(count=Count("id"))
+                            .values("count")
+                        ),
+                        0,
+                    )
+
+                ShoppingList.objects.filter(id__in=changed_list_ids).update(
+                    total_items=count_items(),
+                    items_checked=count_items(checked=True),
+                    updated_at=now,
+                )
+                record_changes(
+                    ShoppingList,
+                    [(request.user.id, list_id) for list_id in changed_list_ids],
+                )
+
+        found_ids = {item.id for item in items}
+        shopping_lists = ShoppingList.objects.filter(
+            id__in={item.shopping_list_id for item in items}
+        )
+
+        return Response(
+            {
+                "items": self.get_serializer(
+                    self.get_queryset().filter(id__in=found_ids), many=True
+                ).data,
+                "applied": [item.id for item in changed_items],
+                "not_found": [
+                    item_id for item_id in latest_operations if item_id not in found_ids
+                ],
+                "shopping_lists": [
+                    {
+                        "id": shopping_list.id,
+                        "total_items": shopping_list.total_items,
+                        "items_checked": shopping_list.items_checked,
+                        "progress": shopping_list.get_progress(),
+                    }
+                    for shopping_list in shopping_lists
+                ],
+            }
+        )
+
 
 # Шаблоны списков покупок
 class ShoppingListTemplateViewSet(viewsets.ModelViewSet):
@@ -593,6 +1055,55 @@ class ShoppingListTemplateViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
+class MealPlanTemplateViewSet(AtomicWritesMixin, viewsets.ModelViewSet):
+    """Шаблоны планов питания пользователя (core/meal_plan_bulk.py)"""
+
+    permission_classes = [IsAuthenticated]
+    queryset = MealPlanTemplate.objects.all()
+
+    def get_queryset(self):
+        return MealPlanTemplate.objects.filter(user=self.request.user).prefetch_related(
+            "recipes__recipe"
+        )
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return MealPlanTemplateCreateSerializer
+        return MealPlanTemplateSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        template = serializer.save()
+        return Response(
+            MealPlanTemplateSerializer(template).data, status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=["post"])
+    def apply(self, request, pk=None):
+        """Разложить шаблон на даты начиная с start_date"""
+        serializer = ApplyMealPlanTemplateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        template = get_object_or_404(self.get_queryset().prefetch_related(None), pk=pk)
+        start_date = serializer.validated_data["start_date"]
+        entries = apply_template(request.user, template, start_date)
+
+        queryset = MealPlan.objects.filter(
+            user=request.user,
+            date__gte=start_date,
+            date__lte=start_date + timedelta(days=template.duration_days - 1),
+        )
+        return Response(
+            {
+                "created_recipes_count": len(entries),
+                "meal_plans": serialize_meal_plans(meal_plan_rows(queryset)),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class PremiumMealPlanViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet для работы с премиум меню
@@ -725,11 +1236,10 @@ class PremiumMealPlanViewSet(viewsets.ReadOnlyModelViewSet):
                 {"error": "Требуется авторизация"}, status=status.HTTP_401_UNAUTHORIZED
             )
 
-        purchases = UserPurchase.objects.filter(user=request.user).select_related(
-            "premium_meal_plan"
+        purchases = UserPurchase.objects.filter(user=request.user)
+        return streaming_json_response(
+            request, StreamedRows(purchase_rows(purchases), serialize_purchases)
         )
-        serializer = UserPurchaseSerializer(purchases, many=True)
-        return Response(serializer.data)
 
     @action(detail=True, methods=["post"])
     def activate(self, request, pk=None):
@@ -951,6 +1461,50 @@ class UserPurchaseViewSet(viewsets.ReadOnlyModelViewSet):
             "premium_meal_plan"
         )
 
+    @conditional_user_data("purchases")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def bootstrap(request):
+    """
+    Данные первого экрана приложения одним запросом (core/bootstrap.py).
+    Параметр date - текущая дата клиента (по умолчанию - дата сервера).
+    """
+    day = timezone.localdate()
+    if "date" in request.query_params:
+        try:
+            day = datetime.strptime(request.query_params["date"], "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Неверный формат даты. Используйте YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    return Response(build_bootstrap(request.user, day))
+
+
+@api_view(["GET"])
+def sync_changes(request):
+    """
+    Дельта-синхронизация планов питания и списков покупок.
+    Параметр cursor - значение из предыдущего ответа. Без курсора
+    возвращается полный снимок данных (reset=true).
+    """
+    cursor = request.query_params.get("cursor")
+    if cursor is not None:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return Response(
+                {"error": "Параметр cursor должен быть числом"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    return Response(build_sync_payload(request.user, cursor))
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -962,26 +1516,34 @@ def sitemap_data(request):
     from .models import PremiumMealPlan, Recipe
 
     # Получаем все активные премиум меню
-    premium_menus = PremiumMealPlan.objects.filter(is_active=True).values('id', 'updated_at')
+    premium_menus = PremiumMealPlan.objects.filter(is_active=True).values(
+        "id", "updated_at"
+    )
 
     # Получаем все рецепты (только бесплатные для публичного доступа)
-    recipes = Recipe.objects.filter(is_premium=False).values('id', 'updated_at')
+    recipes = (
+        Recipe.objects.filter(is_premium=False)
+        .order_by("id")
+        .values("id", "updated_at")
+    )
+
+    return streaming_json_response(
+        request,
+        {
+            "premium_menus": StreamedRows(premium_menus, sitemap_entries),
+            "recipes": StreamedRows(recipes, sitemap_entries),
+        },
+    )
 
-    data = {
-        'premium_menus': [
-            {
-                'id': str(menu['id']),
-                'lastmod': menu['updated_at'].isoformat() if menu['updated_at'] else timezone.now().isoformat()
-            }
-            for menu in premium_menus
-        ],
-        'recipes': [
-            {
-                'id': str(recipe['id']),
-                'lastmod': recipe['updated_at'].isoformat() if recipe['updated_at'] else timezone.now().isoformat()
-            }
-            for recipe in recipes
-        ]
-    }
 
-    return Response(data)
+def sitemap_entries(rows):
+    now = timezone.now().isoformat()
+    return [
+        {
+            "id": str(row["id"]),
+            "lastmod": (
+                row["updated_at"].isoformat() if row.get("updated_at") else now
+            ),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,88 @@
+"""
+JWT-аутентификация без обращения к таблице пользователей на чтение.
+
+Для GET/HEAD/OPTIONS пользователь собирается из подписанных claims токена
+(id, username). Остальные поля модели User отложены (deferred) и подгрузятся
+из БД только при обращении к ним. Для записи пользователь загружается из БД
+как обычно.
+
+Деактивированный или удаленный пользователь теряет доступ сразу, а не после
+истечения токена. В токене есть версия токенов пользователя
+(UserDataVersion.auth), запрос на чтение сверяет ее с БД одним запросом по
+первичному ключу маленькой таблицы. Деактивация увеличивает версию
+(core/signals.py), при удалении пользователя строка удаляется каскадом.
+"""
+
+from django.contrib.auth.models import User
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .models import UserDataVersion
+
+USERNAME_CLAIM = "username"
+AUTH_VERSION_CLAIM = "auth_ver"
+
+# Поля, которые берутся из токена; порядок - как в concrete_fields модели User.
+# is_active в токене нет: актуальность проверяет версия токенов
+TOKEN_USER_FIELDS = ["id", "username"]
+
+
+def get_auth_version(user_id):
+    """Версия токенов пользователя; строка создается при первом входе"""
+    row, _ = UserDataVersion.objects.get_or_create(user_id=user_id)
+    return row.auth
+
+
+def check_auth_version(user_id, version):
+    auth = (
+        UserDataVersion.objects.filter(user_id=user_id)
+        .values_list("auth", flat=True)
+        .first()
+    )
+    if auth is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if auth != version:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+
+def build_token_user(validated_token):
+    """Собирает легковесный экземпляр User из claims токена"""
+    user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+    check_auth_version(user_id, validated_token[AUTH_VERSION_CLAIM])
+    return User.from_db(
+        router.db_for_read(User),
+        TOKEN_USER_FIELDS,
+        [user_id, validated_token[USERNAME_CLAIM]],
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        # Экземпляр аутентификатора создается на каждый запрос
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if (
+            self.request.method not in SAFE_METHODS
+            # Токены, выданные до появления claims, проверяются по БД
+            or USERNAME_CLAIM not in validated_token
+            or AUTH_VERSION_CLAIM not in validated_token
+            or api_settings.USER_ID_CLAIM not in validated_token
+        ):
+            return super().get_user(validated_token)
+        return build_token_user(validated_token)
+
+
+class MealtimeTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # Claims копируются из refresh-токена в access-токены при refresh
+        token = super().get_token(user)
+        token[USERNAME_CLAIM] = user.username
+        token[AUTH_VERSION_CLAIM] = get_auth_version(user.pk)
+        return token
@@ -0,0 +1,219 @@
+"""
+Пакетный endpoint: несколько запросов к API за один HTTP-запрос.
+
+POST /api/batch/
+    {"requests": [
+        {"method": "GET", "path": "/api/recipes/filters/"},
+        {"path": "/api/meal-plans/range/",
+         "params": {"start": "2025-01-06", "end": "2025-01-12"},
+         "headers": {"If-None-Match": "\\"...\\""}}
+    ]}
+
+Подзапросы выполняются в процессе через обычные view (resolve), без
+повторной аутентификации и middleware: пользователь пакета передается
+в каждый подзапрос, а доступы к премиум рецептам (entitlements.py)
+запоминаются на нем и считаются один раз на пакет. Ответ - список
+{"status", "headers", "body"} в порядке подзапросов.
+
+Ограничения (settings.MEALTIME_BATCH): число подзапросов, разрешенные
+методы и суммарная стоимость (COSTS по префиксу пути, остальные -
+DEFAULT_COST).
+"""
+
+import io
+import logging
+import orjson
+from urllib.parse import urlencode, urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import StreamingHttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .renderers import ORJSONRenderer
+from .throttling import bucket_throttles
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MAX_REQUESTS": 10,
+    "MAX_COST": 20,
+    "ALLOWED_METHODS": ["GET"],
+    "DEFAULT_COST": 1,
+    "COSTS": {},
+}
+
+BATCH_PATH = "/api/batch/"
+
+# Заголовки, которые можно передать в подзапрос
+ALLOWED_HEADERS = {"if-none-match", "accept-language"}
+# Заголовки ответа подзапроса, которые возвращаются клиенту
+RESPONSE_HEADERS = ["ETag", "Cache-Control"]
+
+
+def get_batch_config():
+    return {**DEFAULTS, **getattr(settings, "MEALTIME_BATCH", {})}
+
+
+def request_cost(path, config):
+    """Стоимость подзапроса: самый длинный подходящий префикс из COSTS"""
+    prefixes = [prefix for prefix in config["COSTS"] if path.startswith(prefix)]
+    if not prefixes:
+        return config["DEFAULT_COST"]
+    return config["COSTS"][max(prefixes, key=len)]
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.CharField(default="GET")
+    path = serializers.CharField()
+    params = serializers.DictField(required=False, default=dict)
+    headers = serializers.DictField(
+        child=serializers.CharField(), required=False, default=dict
+    )
+
+    def validate_method(self, value):
+        value = value.upper()
+        if value not in get_batch_config()["ALLOWED_METHODS"]:
+            raise ValidationError(f"Метод {value} не поддерживается в пакете")
+        return value
+
+    def validate_path(self, value):
+        parts = urlsplit(value)
+        if not parts.path.startswith("/api/") or parts.path == BATCH_PATH:
+            raise ValidationError("Недопустимый путь")
+        return value
+
+    def validate_headers(self, value):
+        extra = {name for name in value if name.lower() not in ALLOWED_HEADERS}
+        if extra:
+            raise ValidationError(f"Недопустимые заголовки: {', '.join(sorted(extra))}")
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True)
+
+    def validate_requests(self, value):
+        config = get_batch_config()
+        if not value:
+            raise ValidationError("Пустой пакет")
+        if len(value) > config["MAX_REQUESTS"]:
+            raise ValidationError(
+                f"Не больше {config['MAX_REQUESTS']} запросов в пакете"
+            )
+        cost = sum(request_cost(urlsplit(item["path"]).path, config) for item in value)
+        if cost > config["MAX_COST"]:
+            raise ValidationError(
+                f"Стоимость пакета {cost} больше допустимой {config['MAX_COST']}"
+            )
+        return value
+
+
+def build_subrequest(request, item):
+    """WSGI-запрос для подзапроса на основе окружения пакетного запроса"""
+    parts = urlsplit(item["path"])
+    query = "&".join(
+        query for query in (parts.query, urlencode(item["params"], doseq=True)) if query
+    )
+    # Заголовки пакета не наследуются, кроме хоста и заголовков прокси
+    environ = {
+        key: value
+        for key, value in request._request.META.items()
+        if not key.startswith("HTTP_")
+        or key == "HTTP_HOST"
+        or key.startswith("HTTP_X_FORWARDED_")
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": item["method"],
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": query,
+            "CONTENT_LENGTH": "0",
+            "wsgi.input": io.BytesIO(b""),
+            # Тот же формат, что у пакета: данные подзапроса встраиваются как есть
+            "HTTP_ACCEPT": request.accepted_media_type,
+        }
+    )
+    environ.pop("CONTENT_TYPE", None)
+    for name, value in item["headers"].items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+    subrequest = WSGIRequest(environ)
+    if request.user and request.user.is_authenticated:
+        # Аутентификация пакета без повторной проверки токена
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def response_body(response, renderer):
+    """Данные ответа подзапроса для ответа пакета"""
+    if hasattr(response, "data"):
+        return response.data
+    if isinstance(response, StreamingHttpResponse):
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    if not content:
+        return None
+    if "json" not in response.get("Content-Type", ""):
+        return content.decode(response.charset or "utf-8")
+    if isinstance(renderer, ORJSONRenderer):
+        # Готовый JSON встраивается без повторного разбора
+        return orjson.Fragment(content)
+    return orjson.loads(content)
+
+
+def execute_subrequest(request, item):
+    subrequest = build_subrequest(request, item)
+    try:
+        match = resolve(subrequest.path_info)
+    except Resolver404:
+        return {
+            "status": status.HTTP_404_NOT_FOUND,
+            "headers": {},
+            "body": {"detail": "Не найдено."},
+        }
+
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        try:
+            body = response_body(response, request.accepted_renderer)
+        finally:
+            response.close()
+    except Exception:
+        logger.exception("Ошибка подзапроса пакета: %s", item["path"])
+        return {
+            "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "headers": {},
+            "body": {"detail": "Внутренняя ошибка сервера"},
+        }
+    finally:
+        subrequest.close()
+
+    return {
+        "status": response.status_code,
+        "headers": {
+            name: response[name] for name in RESPONSE_HEADERS if name in response
+        },
+        "body": body,
+    }
+
+
+class BatchView(APIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = bucket_throttles("batch")
+    # Пакет - POST: пользователь загружается из БД один раз на весь пакет
+    # и передается подзапросам
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            [
+                execute_subrequest(request, item)
+                for item in serializer.validated_data["requests"]
+            ]
+        )
@@ -0,0 +1,225 @@
+"""
+Общие утилиты для бенчмарков (manage.py benchmark_*):
+данные в форме реальных ответов API и замер времени.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+from django.db import DatabaseError
+
+WORDS = [
+    "курица",
+    "рис",
+    "морковь",
+    "лук",
+    "чеснок",
+    "томаты",
+    "сыр",
+    "яйца",
+    "сливки",
+    "картофель",
+    "говядина",
+    "паста",
+    "базилик",
+    "укроп",
+    "масло",
+    "обжарить",
+    "нарезать",
+    "добавить",
+    "тушить",
+    "перемешать",
+    "посолить",
+]
+
+
+def measure(func, number=100, repeat=5):
+    """Медианное время одного вызова func в миллисекундах"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings) * 1000
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def synthetic_recipe(rng):
+    """Рецепт в форме вывода RecipeSerializer"""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": _text(rng, 3),
+        "description": _text(rng, 25),
+        "cooking_time": rng.randint(10, 120),
+        "difficulty": "medium",
+        "difficulty_display": "Средне",
+        "cooking_method": uuid.UUID(int=rng.getrandbits(128)),
+        "cooking_method_name": "Варка",
+        "tags": [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "name": _text(rng, 1),
+                "color": "#8a837a",
+                "description": None,
+            }
+            for _ in range(3)
+        ],
+        "instructions": "\n".join(_text(rng, 18) for _ in range(8)),
+        "image": None,
+        "portions": 2,
+        "ingredients": [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "ingredient": uuid.UUID(int=rng.getrandbits(128)),
+                "ingredient_name": _text(rng, 2),
+                "quantity": rng.choice([1, 200, "0.5", "1.25"]),
+                "unit": "g",
+                "unit_display": "гр.",
+            }
+            for _ in range(10)
+        ],
+        "is_premium": False,
+        "user_has_access": True,
+        "accessible_through_menus": [],
+    }
+
+
+def synthetic_shopping_list(rng, items=40):
+    """Список покупок в форме вывода ShoppingListSerializer"""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "user": 1,
+        "name": "Покупки на неделю",
+        "period_start": "2025-09-22",
+        "period_end": "2025-09-28",
+        "status": "active",
+        "total_items": items,
+        "items_checked": items // 3,
+        "progress": 33,
+        "is_outdated": False,
+        "created_at": "2025-09-22T10:15:30.123456+03:00",
+        "updated_at": "2025-09-22T12:01:02.654321+03:00",
+        "items": [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "ingredient": uuid.UUID(int=rng.getrandbits(128)),
+                "ingredient_name": _text(rng, 2),
+                "quantity": rng.choice([1, 450, "0.75", "2.5"]),
+                "unit": "g",
+                "unit_display": "гр.",
+                "checked": rng.random() < 0.3,
+                "category": uuid.UUID(int=rng.getrandbits(128)),
+                "category_name": "Овощи и зелень",
+                "custom_name": "",
+                "notes": "",
+                "order": index,
+            }
+            for index in range(items)
+        ],
+    }
+
+
+def synthetic_meal_plans(rng, days=31):
+    """Планы питания за период в форме вывода MealPlanSerializer"""
+    start = date(2025, 9, 1)
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user": 1,
+            "date": (start + timedelta(days=day)).isoformat(),
+            "meal_type": meal_type,
+            "meal_type_display": display,
+            "recipes": [
+                {
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "recipe": uuid.UUID(int=rng.getrandbits(128)),
+                    "recipe_name": _text(rng, 3),
+                    "recipe_cooking_time": rng.randint(10, 90),
+                    "portions": 2,
+                    "order": 0,
+                }
+            ],
+        }
+        for day in range(days)
+        for meal_type, display in [
+            ("breakfast", "Завтрак"),
+            ("lunch", "Обед"),
+            ("dinner", "Ужин"),
+        ]
+    ]
+
+
+def synthetic_payloads():
+    rng = random.Random(42)
+    recipes = [synthetic_recipe(rng) for _ in range(20)]
+    return {
+        "recipes page (20)": {
+            "count": 240,
+            "next": "http://testserver/api/recipes/?page=2",
+            "previous": None,
+            "results": recipes,
+        },
+        "shopping list (40 items)": synthetic_shopping_list(rng),
+        "meal plans (month)": synthetic_meal_plans(rng),
+    }
+
+
+def database_payloads():
+    """
+    Вывод настоящих сериализаторов по данным из БД.
+    Возвращает None, если БД недоступна или в ней нет данных.
+    """
+    from .models import Recipe, MealPlan, ShoppingList
+    from .serializers import (
+        RecipeSerializer,
+        MealPlanSerializer,
+        ShoppingListSerializer,
+    )
+
+    try:
+        if not Recipe.objects.exists():
+            return None
+        payloads = {
+            "recipes page (20)": RecipeSerializer(
+                Recipe.objects.prefetch_related(
+                    "ingredients__ingredient", "tags", "cooking_method"
+                ).order_by("name")[:20],
+                many=True,
+            ).data
+        }
+        shopping_list = (
+            ShoppingList.objects.prefetch_related(
+                "items__ingredient", "items__category"
+            )
+            .order_by("-total_items")
+            .first()
+        )
+        if shopping_list:
+            payloads["shopping list"] = ShoppingListSerializer(shopping_list).data
+        meal_plan = MealPlan.objects.order_by("-date").first()
+        if meal_plan:
+            payloads["meal plans (month)"] = MealPlanSerializer(
+                MealPlan.objects.filter(
+                    user_id=meal_plan.user_id,
+                    date__gt=meal_plan.date - timedelta(days=31),
+                ).prefetch_related("recipes__recipe"),
+                many=True,
+            ).data
+        return payloads
+    except DatabaseError:
+        return None
+
+
+def api_payloads(synthetic=False):
+    """Данные из БД, если они есть, иначе синтетические"""
+    if not synthetic:
+        payloads = database_payloads()
+        if payloads:
+            return payloads, "database"
+    return synthetic_payloads(), "synthetic"
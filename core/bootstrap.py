@@ -0,0 +1,140 @@
+"""
+Данные первого экрана приложения одним запросом (/api/bootstrap/).
+
+Общие для всех части (фильтры, популярные теги) берутся из реестра
+справочников и справочного кэша, личные - несколькими запросами:
+покупки, сводка планов питания на неделю (один GROUP BY) и прогресс
+активного списка покупок. Сравнение с прежней цепочкой запросов:
+manage.py benchmark_bootstrap.
+"""
+
+from datetime import timedelta
+from django.db.models import Count
+from .fast_serializers import MEAL_TYPE_LABELS
+from .meal_plan_summary import meal_slot_rows
+from .models import Recipe, ShoppingList, Tag, UserPurchase
+from .reference import reference
+from .serializers import CookingMethodSerializer, TagSerializer
+from .tiered_cache import reference_data
+
+POPULAR_TAGS_LIMIT = 10
+
+
+def recipe_filters():
+    """Фильтры рецептов без user_access (как RecipeViewSet.filters)"""
+    return {
+        "cooking_methods": CookingMethodSerializer(
+            reference.cooking_methods().all, many=True
+        ).data,
+        "difficulty_levels": Recipe.DIFFICULTY_LEVELS,
+        "tags": TagSerializer(reference.tags().all, many=True).data,
+    }
+
+
+def popular_tags():
+    """Самые используемые теги; общие для всех, хранятся в справочном кэше"""
+    return reference_data(
+        "popular_tags",
+        lambda: list(
+            TagSerializer(
+                Tag.objects.annotate(recipe_count=Count("recipe")).order_by(
+                    "-recipe_count"
+                )[:POPULAR_TAGS_LIMIT],
+                many=True,
+            ).data
+        ),
+    )
+
+
+def user_access_info(user):
+    """Купленные пользователем меню одним запросом"""
+    if not user.is_authenticated:
+        return {"has_premium_access": False, "purchased_menus": []}
+    menus = list(
+        UserPurchase.objects.filter(user=user).values_list(
+            "premium_meal_plan_id", flat=True
+        )
+    )
+    return {"has_premium_access": bool(menus), "purchased_menus": menus}
+
+
+def week_bounds(day):
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+def week_summary(user, day):
+    """Приемы пищи недели, в которую попадает day, с числом рецептов"""
+    start, end = week_bounds(day)
+    rows = meal_slot_rows(user, start, end).order_by("date", "meal_type")
+    days = {
+        start + timedelta(days=offset): [] for offset in range((end - start).days + 1)
+    }
+    for row in rows:
+        days[row["date"]].append(
+            {
+                "meal_type": row["meal_type"],
+                "meal_type_display": MEAL_TYPE_LABELS.get(
+                    row["meal_type"], row["meal_type"]
+                ),
+                "recipes_count": row["recipes_count"],
+            }
+        )
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": [
+            {"date": date.isoformat(), "meals": meals} for date, meals in days.items()
+        ],
+        "total_meals": sum(len(meals) for meals in days.values()),
+        "total_recipes": sum(
+            meal["recipes_count"] for meals in days.values() for meal in meals
+        ),
+    }
+
+
+def active_shopping_list(user):
+    """Последний черновой или активный список покупок с прогрессом"""
+    row = (
+        ShoppingList.objects.filter(user=user, status__in=["draft", "active"])
+        .order_by("-updated_at")
+        .values(
+            "id",
+            "name",
+            "period_start",
+            "period_end",
+            "status",
+            "total_items",
+            "items_checked",
+            "is_outdated",
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    total, checked = row["total_items"], row["items_checked"]
+    return {
+        "id": str(row["id"]),
+        "name": row["name"],
+        "period_start": row["period_start"].isoformat(),
+        "period_end": row["period_end"].isoformat(),
+        "status": row["status"],
+        "total_items": total,
+        "items_checked": checked,
+        "progress": round((checked / total) * 100) if total else 0,
+        "is_outdated": row["is_outdated"],
+    }
+
+
+def build_bootstrap(user, day):
+    data = {
+        "filters": recipe_filters(),
+        "popular_tags": popular_tags(),
+        "user_access": user_access_info(user),
+        "week": None,
+        "shopping_list": None,
+    }
+    if user.is_authenticated:
+        data["week"] = week_summary(user, day)
+        data["shopping_list"] = active_shopping_list(user)
+    return data
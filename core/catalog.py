@@ -0,0 +1,260 @@
+"""
+Статический снимок каталога для анонимного трафика.
+
+publish_catalog() рендерит анонимные страницы каталога (списки рецептов
+по страницам, фильтры, премиум меню, теги, способы приготовления) через
+обычные view и сохраняет их в MEALTIME_CATALOG["ROOT"] готовыми файлами
+JSON вместе со сжатыми вариантами (.gz, .br) и manifest.json.
+
+Раскладка файлов: <ROOT>/<путь>/index<page>.json, например
+api/recipes/index.json и api/recipes/index2.json для ?page=2. Так их
+может отдавать и nginx без Django:
+
+    location /api/ {
+        if ($http_authorization = "") {
+            rewrite ^ /catalog$uri/index$arg_page.json break;
+        }
+        ...
+    }
+
+(с gzip_static/brotli_static и fallback на приложение, если файла нет).
+В Django их отдает CatalogSnapshotMiddleware.
+
+Снимок публикуется командой manage.py publish_catalog и автоматически
+после изменений каталога (signals.py): старый снимок сразу перестает
+отдаваться, новый собирается в фоне. Публикации из разных процессов
+выполняются по очереди (flock на <ROOT>/.lock), иначе уборка старых
+снимков удаляла бы папку, которую собирает соседний процесс.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve
+from .middleware import brotli
+
+try:
+    import fcntl
+except ImportError:  # Windows: публикации не сериализуются между процессами
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+
+# Страницы с пагинацией: публикуются все страницы по ссылкам next
+PAGINATED_PATHS = ["/api/recipes/", "/api/premium-meal-plans/"]
+STATIC_PATHS = [
+    "/api/recipes/filters/",
+    "/api/tags/",
+    "/api/cooking-methods/",
+    "/api/ingredient-categories/",
+]
+
+
+def get_catalog_config():
+    return {
+        "ROOT": os.path.join(settings.BASE_DIR, "catalog"),
+        "BASE_URL": "http://localhost:8000",
+        "AUTO_PUBLISH": False,
+        **getattr(settings, "MEALTIME_CATALOG", {}),
+    }
+
+
+def snapshot_filename(path, page=""):
+    return f"{path.strip('/')}/index{page}.json"
+
+
+class CatalogRenderer:
+    """Рендер анонимных ответов view без middleware и без HTTP"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.factory = RequestFactory(
+            HTTP_HOST=parts.netloc, HTTP_ACCEPT="application/json"
+        )
+        self.secure = parts.scheme == "https"
+
+    def get(self, path, page=""):
+        request = self.factory.get(
+            path, {"page": page} if page else {}, secure=self.secure
+        )
+        match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"{path}?page={page}: HTTP {response.status_code}")
+        return response.content
+
+
+def iter_catalog_pages(renderer):
+    """(путь, page, тело JSON) всех страниц снимка"""
+    for path in STATIC_PATHS:
+        yield path, "", renderer.get(path)
+
+    for path in PAGINATED_PATHS:
+        page = ""
+        while True:
+            body = renderer.get(path, page)
+            yield path, page, body
+            data = json.loads(body)
+            next_url = data.get("next") if isinstance(data, dict) else None
+            if not next_url:
+                break
+            page = parse_qs(urlsplit(next_url).query)["page"][0]
+            if page == "1":
+                break
+
+    # Детальные страницы премиум меню
+    from .models import PremiumMealPlan
+
+    for menu_id in PremiumMealPlan.objects.filter(is_active=True).values_list(
+        "id", flat=True
+    ):
+        path = f"/api/premium-meal-plans/{menu_id}/"
+        yield path, "", renderer.get(path)
+
+
+def write_variants(root, filename, body):
+    target = os.path.join(root, filename)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as file:
+        file.write(body)
+    with open(target + ".gz", "wb") as file:
+        file.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(target + ".br", "wb") as file:
+            file.write(brotli.compress(body, quality=11))
+
+
+def publish_catalog():
+    """
+    Рендерит снимок в новую папку и атомарно переключает на нее
+    <ROOT>/current. Возвращает манифест.
+    """
+    config = get_catalog_config()
+    root = config["ROOT"]
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_NAME), "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return _publish_locked(root, config["BASE_URL"])
+
+
+def _publish_locked(root, base_url):
+    version = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    build_dir = os.path.join(root, version)
+
+    renderer = CatalogRenderer(base_url)
+    files = {}
+    for path, page, body in iter_catalog_pages(renderer):
+        filename = snapshot_filename(path, page)
+        write_variants(build_dir, filename, body)
+        files[filename] = hashlib.sha1(body).hexdigest()
+
+    manifest = {
+        "version": version,
+        "host": urlsplit(base_url).netloc,
+        "files": files,
+    }
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w") as file:
+        json.dump(manifest, file)
+
+    # Атомарная замена симлинка current
+    link = os.path.join(root, "current")
+    tmp_link = f"{link}.{version}"
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, link)
+
+    # Под блокировкой чужих сборок нет: остальные папки - старые снимки
+    # или остатки прерванных публикаций
+    for name in os.listdir(root):
+        if name in (version, "current", LOCK_NAME) or name.startswith("current."):
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return manifest
+
+
+def invalidate_catalog():
+    """Снимок перестает отдаваться до следующей публикации"""
+    link = os.path.join(get_catalog_config()["ROOT"], "current")
+    try:
+        os.unlink(link)
+    except FileNotFoundError:
+        pass
+
+
+class SnapshotStore:
+    """Манифест текущего снимка; перечитывается при смене снимка"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._target = None
+        self._manifest = None
+
+    def get_manifest(self):
+        """(манифест, папка снимка) или (None, None), если снимка нет"""
+        root = get_catalog_config()["ROOT"]
+        try:
+            target = os.readlink(os.path.join(root, "current"))
+        except OSError:
+            return None, None
+        with self._lock:
+            if target != self._target:
+                try:
+                    with open(os.path.join(root, target, MANIFEST_NAME)) as file:
+                        self._manifest = json.load(file)
+                except (OSError, ValueError):
+                    return None, None
+                self._target = target
+            return self._manifest, os.path.join(root, target)
+
+
+snapshot_store = SnapshotStore()
+
+
+# Автоматическая публикация после изменений каталога. Изменения, пришедшие
+# во время публикации, объединяются в одну следующую публикацию.
+_publish_lock = threading.Lock()
+_publish_state = {"running": False, "dirty": False}
+
+
+def _publish_loop():
+    try:
+        while True:
+            with _publish_lock:
+                if not _publish_state["dirty"]:
+                    _publish_state["running"] = False
+                    return
+                _publish_state["dirty"] = False
+            try:
+                publish_catalog()
+            except Exception:
+                logger.exception("Не удалось опубликовать снимок каталога")
+    finally:
+        connections.close_all()
+
+
+def catalog_changed():
+    """Вызывается после коммита изменений каталога"""
+    invalidate_catalog()
+    if not get_catalog_config()["AUTO_PUBLISH"]:
+        return
+    with _publish_lock:
+        _publish_state["dirty"] = True
+        if _publish_state["running"]:
+            return
+        _publish_state["running"] = True
+    threading.Thread(target=_publish_loop, daemon=True).start()
@@ -0,0 +1,42 @@
+"""
+Доступы пользователя к премиум рецептам.
+"""
+
+from django.core.cache import cache
+from .models import PremiumMealPlanRecipe
+from .versions import get_user_versions
+
+ENTITLEMENTS_TIMEOUT = 3600
+
+
+def get_entitlements(user):
+    """
+    Премиум рецепты из меню, купленных пользователем:
+    {recipe_id: [{"menu_id": ..., "menu_name": ...}, ...]}
+    (меню в порядке, как в RecipeSerializer.get_accessible_through_menus).
+
+    Считается один раз на запрос (запоминается на объекте user) и хранится
+    в кэше по версии покупок. Версия читается из БД, а не из claim токена:
+    после оплаты доступ должен появиться сразу, а не после refresh.
+    """
+    if user is None or not user.is_authenticated:
+        return {}
+    if hasattr(user, "_entitlements"):
+        return user._entitlements
+
+    version = get_user_versions(user.pk, "purchases")["purchases"]
+    key = f"entitlements:{user.pk}:{version}"
+    entitlements = cache.get(key)
+    if entitlements is None:
+        entitlements = {}
+        rows = PremiumMealPlanRecipe.objects.filter(
+            premium_meal_plan__userpurchase__user=user
+        ).values_list("recipe_id", "premium_meal_plan_id", "premium_meal_plan__name")
+        for recipe_id, menu_id, menu_name in rows:
+            entitlements.setdefault(recipe_id, []).append(
+                {"menu_id": menu_id, "menu_name": menu_name}
+            )
+        cache.set(key, entitlements, ENTITLEMENTS_TIMEOUT)
+
+    user._entitlements = entitlements
+    return entitlements
@@ -0,0 +1,201 @@
+"""
+События изменения списков покупок для live-обновлений (Server-Sent Events).
+
+Изменения публикуются в брокер только после коммита транзакции.
+Брокер настраивается через settings.MEALTIME_EVENTS_BROKER:
+- core.events.LocalBroker - в пределах одного процесса (по умолчанию);
+- core.events.RedisBroker - через Redis pub/sub для нескольких воркеров.
+"""
+
+import json
+import queue
+import threading
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class LocalBroker:
+    """Брокер в памяти процесса: подписчики видят только события своего воркера"""
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def subscribe(self, channel):
+        subscription = LocalSubscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription.queue)
+        return subscription
+
+    def _unsubscribe(self, channel, subscriber_queue):
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber_queue)
+                if not subscribers:
+                    del self._channels[channel]
+
+
+class LocalSubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Ждет следующее сообщение; None, если за timeout ничего не пришло"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self.channel, self.queue)
+
+
+class RedisBroker:
+    """Брокер на Redis pub/sub (подходит любой Redis-совместимый сервер)"""
+
+    def __init__(self, url="redis://localhost:6379/0", **options):
+        import redis
+
+        self.client = redis.Redis.from_url(url, **options)
+
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.client, channel)
+
+
+class RedisSubscription:
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        data = message["data"]
+        return data.decode("utf-8") if isinstance(data, bytes) else data
+
+    def close(self):
+        self.pubsub.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Возвращает брокер событий процесса (создается при первом обращении)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(
+                    settings,
+                    "MEALTIME_EVENTS_BROKER",
+                    {"BACKEND": "core.events.LocalBroker"},
+                )
+                broker_class = import_string(config["BACKEND"])
+                _broker = broker_class(**config.get("OPTIONS", {}))
+    return _broker
+
+
+def shopping_list_channel(shopping_list_id):
+    return f"shopping-list:{shopping_list_id}"
+
+
+def stream_shopping_list_events(shopping_list_id):
+    """
+    Генератор SSE-потока для списка покупок.
+    Периодически отправляет keepalive-комментарии и завершается через
+    MEALTIME_EVENTS_STREAM_TIMEOUT секунд - EventSource переподключится сам,
+    а воркер не будет занят бесконечно.
+    """
+    keepalive = getattr(settings, "MEALTIME_EVENTS_KEEPALIVE", 15)
+    stream_timeout = getattr(settings, "MEALTIME_EVENTS_STREAM_TIMEOUT", 300)
+
+    subscription = get_broker().subscribe(shopping_list_channel(shopping_list_id))
+    try:
+        yield "retry: 3000\n\n"
+        waited = 0
+        while waited < stream_timeout:
+            message = subscription.get(timeout=keepalive)
+            if message is None:
+                waited += keepalive
+                yield ": keepalive\n\n"
+                continue
+            event_type = json.loads(message)["type"]
+            yield f"event: {event_type}\ndata: {message}\n\n"
+    finally:
+        subscription.close()
+
+
+def publish_shopping_list_events(shopping_list_id, events):
+    """
+    Публикует события списка покупок после коммита текущей транзакции.
+    events - список словарей вида {"type": "checked", "item": {...}}
+    """
+    if not events:
+        return
+    channel = shopping_list_channel(shopping_list_id)
+    messages = [json.dumps(event, cls=DjangoJSONEncoder) for event in events]
+
+    def publish():
+        broker = get_broker()
+        for message in messages:
+            broker.publish(channel, message)
+
+    transaction.on_commit(publish)
+
+
+def item_checked_event(item):
+    return {
+        "type": "checked",
+        "item": {
+            "id": item.id,
+            "checked": item.checked,
+            "checked_changed_at": item.checked_changed_at,
+        },
+    }
+
+
+def item_quantity_event(item):
+    from .serializers import FormattedDecimalField
+
+    quantity = FormattedDecimalField(max_digits=10, decimal_places=2)
+    return {
+        "type": "quantity",
+        "item": {
+            "id": item.id,
+            "quantity": quantity.to_representation(item.quantity),
+            "unit": item.unit,
+        },
+    }
+
+
+def item_added_event(item):
+    from .serializers import ShoppingListItemSerializer
+
+    return {"type": "added", "item": ShoppingListItemSerializer(item).data}
+
+
+def item_updated_event(item):
+    from .serializers import ShoppingListItemSerializer
+
+    return {"type": "updated", "item": ShoppingListItemSerializer(item).data}
+
+
+def item_removed_event(item_id):
+    return {"type": "removed", "item": {"id": item_id}}
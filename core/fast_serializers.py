@@ -0,0 +1,380 @@
+"""
+Быстрая сериализация списков только для чтения.
+
+Словари собираются напрямую из .values() с заранее посчитанными таблицами
+подписей, без экземпляров моделей и полей ModelSerializer на каждую строку.
+Вложенные коллекции загружаются одним запросом на страницу.
+
+Вывод побайтно совпадает с сериализаторами из serializers.py, включая
+порядок ключей и пропуск "*_name" при пустой связи (так делает DRF для
+read_only полей с source через None). Проверка - core/tests.py
+(FastSerializerGoldenTests), замер - manage.py benchmark_serializers.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from rest_framework import serializers
+from .models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    MealPlan,
+    RecipeMealPlan,
+    ShoppingListItem,
+)
+from .entitlements import get_entitlements
+
+UNIT_LABELS = dict(Ingredient.UNITS)
+DIFFICULTY_LABELS = dict(Recipe.DIFFICULTY_LEVELS)
+MEAL_TYPE_LABELS = dict(MealPlan.MEAL_TYPES)
+
+TWO_PLACES = Decimal("0.01")
+
+# Как в RecipeSerializer.get_accessible_through_menus
+MAX_ACCESSIBLE_MENUS = 5
+
+_datetime_field = serializers.DateTimeField()
+_image_storage = Recipe._meta.get_field("image").storage
+
+
+def format_quantity(value):
+    """То же, что FormattedDecimalField(max_digits=10, decimal_places=2)"""
+    if value is None:
+        return None
+    value = value.quantize(TWO_PLACES)
+    if value == value.to_integral_value():
+        return int(value)
+    return f"{value:f}".rstrip("0")
+
+
+def format_datetime(value):
+    return _datetime_field.to_representation(value)
+
+
+def format_image(name, request):
+    if not name:
+        return None
+    url = _image_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+# Ингредиенты
+INGREDIENT_FIELDS = ["id", "name", "category_id", "category__name", "default_unit"]
+
+
+def ingredient_rows(queryset):
+    return queryset.values(*INGREDIENT_FIELDS)
+
+
+def serialize_ingredients(rows):
+    data = []
+    for row in rows:
+        item = {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "category": row["category_id"],
+        }
+        if row["category_id"] is not None:
+            item["category_name"] = row["category__name"]
+        item["default_unit"] = row["default_unit"]
+        item["default_unit_display"] = UNIT_LABELS.get(
+            row["default_unit"], row["default_unit"]
+        )
+        data.append(item)
+    return data
+
+
+# Рецепты
+RECIPE_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "cooking_time",
+    "difficulty",
+    "cooking_method_id",
+    "cooking_method__name",
+    "instructions",
+    "image",
+    "portions",
+    "is_premium",
+    # Не выводится, нужно для ключей кэша фрагментов
+    "updated_at",
+]
+
+
+def recipe_rows(queryset):
+    return queryset.prefetch_related(None).values(*RECIPE_FIELDS)
+
+
+def _recipe_tags(recipe_ids):
+    tags = defaultdict(list)
+    rows = (
+        Recipe.tags.through.objects.filter(recipe_id__in=recipe_ids)
+        .order_by("tag__name")
+        .values("recipe_id", "tag_id", "tag__name", "tag__color", "tag__description")
+    )
+    for row in rows:
+        tags[row["recipe_id"]].append(
+            {
+                "id": str(row["tag_id"]),
+                "name": row["tag__name"],
+                "color": row["tag__color"],
+                "description": row["tag__description"],
+            }
+        )
+    return tags
+
+
+def _recipe_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    rows = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).values(
+        "id",
+        "recipe_id",
+        "ingredient_id",
+        "ingredient__name",
+        "ingredient__default_unit",
+        "quantity",
+    )
+    for row in rows:
+        unit = row["ingredient__default_unit"]
+        ingredients[row["recipe_id"]].append(
+            {
+                "id": str(row["id"]),
+                "ingredient": row["ingredient_id"],
+                "ingredient_name": row["ingredient__name"],
+                "quantity": format_quantity(row["quantity"]),
+                "unit": unit,
+                "unit_display": UNIT_LABELS.get(unit, unit),
+            }
+        )
+    return ingredients
+
+
+def serialize_recipes_shared(rows, request=None):
+    """
+    Общая для всех пользователей часть RecipeSerializer - все поля,
+    кроме user_has_access и accessible_through_menus
+    """
+    rows = list(rows)
+    recipe_ids = [row["id"] for row in rows]
+    tags = _recipe_tags(recipe_ids)
+    ingredients = _recipe_ingredients(recipe_ids)
+
+    data = []
+    for row in rows:
+        recipe_id = row["id"]
+        item = {
+            "id": str(recipe_id),
+            "name": row["name"],
+            "description": row["description"],
+            "cooking_time": row["cooking_time"],
+            "difficulty": row["difficulty"],
+            "difficulty_display": DIFFICULTY_LABELS.get(
+                row["difficulty"], row["difficulty"]
+            ),
+            "cooking_method": row["cooking_method_id"],
+        }
+        if row["cooking_method_id"] is not None:
+            item["cooking_method_name"] = row["cooking_method__name"]
+        item["tags"] = tags.get(recipe_id, [])
+        item["instructions"] = row["instructions"]
+        item["image"] = format_image(row["image"], request)
+        item["portions"] = row["portions"]
+        item["ingredients"] = ingredients.get(recipe_id, [])
+        item["is_premium"] = row["is_premium"]
+        data.append(item)
+    return data
+
+
+def recipe_access_fields(recipe_id, is_premium, request, entitlements):
+    """Персональные поля RecipeSerializer по набору доступов пользователя"""
+    if request is None:
+        return {"user_has_access": not is_premium, "accessible_through_menus": []}
+    menus = entitlements.get(recipe_id, []) if is_premium else []
+    return {
+        "user_has_access": not is_premium or bool(menus),
+        "accessible_through_menus": menus[:MAX_ACCESSIBLE_MENUS],
+    }
+
+
+def serialize_recipes(rows, request=None):
+    """Список рецептов в формате RecipeSerializer"""
+    rows = list(rows)
+    entitlements = get_entitlements(request.user) if request is not None else {}
+    data = serialize_recipes_shared(rows, request)
+    for item, row in zip(data, rows):
+        item.update(
+            recipe_access_fields(row["id"], row["is_premium"], request, entitlements)
+        )
+    return data
+
+
+# Планы питания
+MEAL_PLAN_FIELDS = ["id", "user_id", "date", "meal_type"]
+
+
+def meal_plan_rows(queryset):
+    return queryset.prefetch_related(None).values(*MEAL_PLAN_FIELDS)
+
+
+def _meal_plan_recipes(meal_plan_ids):
+    recipes = defaultdict(list)
+    rows = RecipeMealPlan.objects.filter(meal_plan_id__in=meal_plan_ids).values(
+        "id",
+        "meal_plan_id",
+        "recipe_id",
+        "recipe__name",
+        "recipe__cooking_time",
+        "portions",
+        "order",
+    )
+    for row in rows:
+        recipes[row["meal_plan_id"]].append(
+            {
+                "id": str(row["id"]),
+                "recipe": row["recipe_id"],
+                "recipe_name": row["recipe__name"],
+                "recipe_cooking_time": row["recipe__cooking_time"],
+                "portions": row["portions"],
+                "order": row["order"],
+            }
+        )
+    return recipes
+
+
+def serialize_meal_plans(rows):
+    """Список планов питания в формате MealPlanSerializer"""
+    rows = list(rows)
+    recipes = _meal_plan_recipes([row["id"] for row in rows])
+    return [
+        {
+            "id": str(row["id"]),
+            "user": row["user_id"],
+            "date": row["date"].isoformat(),
+            "meal_type": row["meal_type"],
+            "meal_type_display": MEAL_TYPE_LABELS.get(
+                row["meal_type"], row["meal_type"]
+            ),
+            "recipes": recipes.get(row["id"], []),
+        }
+        for row in rows
+    ]
+
+
+# Списки покупок
+SHOPPING_LIST_FIELDS = [
+    "id",
+    "user_id",
+    "name",
+    "period_start",
+    "period_end",
+    "status",
+    "total_items",
+    "items_checked",
+    "is_outdated",
+    "created_at",
+    "updated_at",
+]
+
+
+def shopping_list_rows(queryset):
+    return queryset.prefetch_related(None).values(*SHOPPING_LIST_FIELDS)
+
+
+def _shopping_list_items(list_ids):
+    items = defaultdict(list)
+    rows = ShoppingListItem.objects.filter(shopping_list_id__in=list_ids).values(
+        "id",
+        "shopping_list_id",
+        "ingredient_id",
+        "ingredient__name",
+        "ingredient__default_unit",
+        "quantity",
+        "unit",
+        "checked",
+        "category_id",
+        "category__name",
+        "custom_name",
+        "notes",
+        "order",
+    )
+    for row in rows:
+        unit = row["unit"] or row["ingredient__default_unit"]
+        item = {
+            "id": str(row["id"]),
+            "ingredient": row["ingredient_id"],
+            "ingredient_name": row["ingredient__name"],
+            "quantity": format_quantity(row["quantity"]),
+            "unit": unit,
+            "unit_display": UNIT_LABELS.get(unit, unit),
+            "checked": row["checked"],
+            "category": row["category_id"],
+        }
+        if row["category_id"] is not None:
+            item["category_name"] = row["category__name"]
+        item["custom_name"] = row["custom_name"]
+        item["notes"] = row["notes"]
+        item["order"] = row["order"]
+        items[row["shopping_list_id"]].append(item)
+    return items
+
+
+def serialize_shopping_lists(rows):
+    """Список списков покупок в формате ShoppingListSerializer"""
+    rows = list(rows)
+    items = _shopping_list_items([row["id"] for row in rows])
+    data = []
+    for row in rows:
+        total, checked = row["total_items"], row["items_checked"]
+        data.append(
+            {
+                "id": str(row["id"]),
+                "user": row["user_id"],
+                "name": row["name"],
+                "period_start": row["period_start"].isoformat(),
+                "period_end": row["period_end"].isoformat(),
+                "status": row["status"],
+                "total_items": total,
+                "items_checked": checked,
+                "progress": round((checked / total) * 100) if total else 0,
+                "is_outdated": row["is_outdated"],
+                "created_at": format_datetime(row["created_at"]),
+                "updated_at": format_datetime(row["updated_at"]),
+                "items": items.get(row["id"], []),
+            }
+        )
+    return data
+
+
+# Покупки
+PURCHASE_FIELDS = [
+    "id",
+    "user_id",
+    "premium_meal_plan_id",
+    "premium_meal_plan__name",
+    "purchase_date",
+    "price_paid",
+]
+
+
+def purchase_rows(queryset):
+    return queryset.values(*PURCHASE_FIELDS)
+
+
+def serialize_purchases(rows):
+    """Список покупок в формате UserPurchaseSerializer"""
+    return [
+        {
+            "id": str(row["id"]),
+            "user": row["user_id"],
+            "premium_meal_plan": row["premium_meal_plan_id"],
+            "premium_meal_plan_name": row["premium_meal_plan__name"],
+            "purchase_date": format_datetime(row["purchase_date"]),
+            "price_paid": (
+                None
+                if row["price_paid"] is None
+                else f"{row['price_paid'].quantize(TWO_PLACES):f}"
+            ),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,225 @@
+"""
+Лента планов питания пользователя в формате iCalendar (RFC 5545) для
+календаря телефона: GET /api/calendar/<token>.ics
+
+Календарные приложения не передают заголовок Authorization, поэтому
+пользователь определяется по токену в ссылке: id пользователя и HMAC от
+id и хэша пароля. Ссылку выдает /api/meal-plans/calendar-link/, после
+смены пароля старые ссылки перестают работать.
+
+Событие (VEVENT) - слот MealPlan с рецептами, время начала - из
+MEAL_TIMES. Слоты читаются серверным курсором пачками, и каждая пачка
+сразу уходит клиенту. ETag и Last-Modified зависят от версии планов
+питания пользователя (versions.py): приложения опрашивают ленту каждые
+15 минут и без изменений получают 304 после одного запроса к БД.
+"""
+
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpResponseNotFound, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+from .fast_serializers import MEAL_TYPE_LABELS
+from .models import MealPlan, RecipeMealPlan
+from .reference import reference_version
+
+DEFAULTS = {
+    # Время начала приема пищи в часовом поясе календаря
+    "MEAL_TIMES": {
+        "breakfast": "08:00",
+        "lunch": "13:00",
+        "snack": "16:00",
+        "dinner": "19:00",
+        "supper": "21:00",
+    },
+    "DURATION_MINUTES": 45,
+    # Прошедшие дни в ленте; будущие - все
+    "PAST_DAYS": 30,
+    "CHUNK_SIZE": 500,
+}
+
+TOKEN_SALT = "core.ical.calendar_token"
+PRODID = "-//Mealtime//Meal plans//RU"
+
+
+def get_calendar_config():
+    return {**DEFAULTS, **getattr(settings, "MEALTIME_CALENDAR", {})}
+
+
+# Токен ленты
+
+
+def _token_signature(user_id, password):
+    return salted_hmac(TOKEN_SALT, f"{user_id}:{password}").hexdigest()[:32]
+
+
+def calendar_token(user):
+    return f"{user.pk}-{_token_signature(user.pk, user.password)}"
+
+
+def calendar_url(request, user):
+    return request.build_absolute_uri(
+        reverse("meal_plan_calendar", args=[calendar_token(user)])
+    )
+
+
+def _token_user(token):
+    """
+    Данные владельца токена одним запросом: пароль для проверки подписи и
+    версия планов питания. None, если токен неверный.
+    """
+    user_id, _, signature = token.partition("-")
+    if not user_id.isdigit():
+        return None
+    row = (
+        User.objects.filter(pk=int(user_id), is_active=True)
+        .values(
+            "pk", "password", "data_version__meal_plans", "data_version__updated_at"
+        )
+        .first()
+    )
+    if row is None or not constant_time_compare(
+        signature, _token_signature(row["pk"], row["password"])
+    ):
+        return None
+    return row
+
+
+# iCalendar
+
+
+def escape_text(value):
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    """Строки длиннее 75 октетов переносятся (RFC 5545, 3.1)"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return encoded + b"\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Не разрываем многобайтовый символ UTF-8
+        while cut < len(encoded) and encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = 74
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def format_local(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def meal_plan_event(row, recipes, config):
+    meal_time = time.fromisoformat(config["MEAL_TIMES"].get(row["meal_type"], "12:00"))
+    start = datetime.combine(row["date"], meal_time)
+    end = start + timedelta(minutes=config["DURATION_MINUTES"])
+    label = MEAL_TYPE_LABELS.get(row["meal_type"], row["meal_type"])
+    names = ", ".join(recipe["recipe__name"] for recipe in recipes)
+    description = "\n".join(
+        f"{recipe['recipe__name']} - {recipe['portions']} порц." for recipe in recipes
+    )
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{row['id']}@mealtime",
+        f"DTSTAMP:{format_utc(row['updated_at'])}",
+        f"LAST-MODIFIED:{format_utc(row['updated_at'])}",
+        # Время без часового пояса: событие в местном времени устройства
+        f"DTSTART:{format_local(start)}",
+        f"DTEND:{format_local(end)}",
+        f"SUMMARY:{escape_text(f'{label}: {names}')}",
+        f"DESCRIPTION:{escape_text(description)}",
+        "END:VEVENT",
+    ]
+    return b"".join(fold_line(line) for line in lines)
+
+
+def iter_calendar(user_id, config):
+    yield b"".join(
+        fold_line(line)
+        for line in [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{escape_text('Mealtime: планы питания')}",
+        ]
+    )
+
+    since = timezone.localdate() - timedelta(days=config["PAST_DAYS"])
+    # Слоты без рецептов в календарь не попадают
+    rows = (
+        MealPlan.objects.filter(user_id=user_id, date__gte=since, recipes__isnull=False)
+        .distinct()
+        .order_by("date", "meal_type")
+        .values("id", "date", "meal_type", "updated_at")
+        .iterator(chunk_size=config["CHUNK_SIZE"])
+    )
+    while True:
+        batch = list(islice(rows, config["CHUNK_SIZE"]))
+        if not batch:
+            break
+        recipes = {row["id"]: [] for row in batch}
+        for recipe in (
+            RecipeMealPlan.objects.filter(meal_plan_id__in=list(recipes))
+            .order_by("order")
+            .values("meal_plan_id", "recipe__name", "portions")
+        ):
+            recipes[recipe["meal_plan_id"]].append(recipe)
+        yield b"".join(
+            meal_plan_event(row, recipes[row["id"]], config) for row in batch
+        )
+
+    yield b"END:VCALENDAR\r\n"
+
+
+@require_GET
+def meal_plan_calendar(request, token):
+    owner = _token_user(token)
+    if owner is None:
+        return HttpResponseNotFound()
+
+    config = get_calendar_config()
+    today = timezone.localdate()
+    version = owner["data_version__meal_plans"] or 0
+    # Лента зависит и от названий рецептов, и от даты: прошедшие дни уходят
+    # из окна PAST_DAYS
+    parts = [owner["pk"], version, reference_version("recipes"), today.isoformat()]
+    etag = '"%s"' % hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+    last_modified = timezone.make_aware(datetime.combine(today, time.min))
+    if owner["data_version__updated_at"] is not None:
+        last_modified = max(last_modified, owner["data_version__updated_at"])
+    last_modified = int(last_modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = StreamingHttpResponse(
+            iter_calendar(owner["pk"], config),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'inline; filename="mealtime.ics"'
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
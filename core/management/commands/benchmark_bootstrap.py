@@ -0,0 +1,78 @@
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from core.benchmarks import measure
+from core.bootstrap import week_bounds
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare /api/bootstrap/ with the sequence of calls the home screen "
+        "made before it (queries and time)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=20, help="Calls per timing round"
+        )
+        parser.add_argument(
+            "--user",
+            help="Username; by default the user with the most meal plans",
+        )
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"User {username!r} not found")
+        user = User.objects.annotate(plans=Count("mealplan")).order_by("-plans").first()
+        if user is None:
+            raise CommandError("No users in the database")
+        return user
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        client = APIClient()
+        client.force_authenticate(user)
+        start, end = week_bounds(date.today())
+
+        sequence = [
+            "/api/recipes/filters/",
+            "/api/tags/popular/",
+            f"/api/meal-plans/range/?start={start}&end={end}",
+            "/api/shopping-lists/",
+        ]
+
+        def get(path):
+            response = client.get(path, HTTP_HOST="localhost")
+            if response.status_code != 200:
+                raise CommandError(f"{path}: HTTP {response.status_code}")
+            return response
+
+        def before():
+            for path in sequence:
+                get(path)
+
+        def after():
+            get("/api/bootstrap/")
+
+        # Прогрев справочного кэша
+        before()
+        after()
+
+        self.stdout.write(f"user: {user.username}, week {start}..{end}")
+        self.stdout.write(f"{'variant':<24}{'requests':>9}{'queries':>9}{'time':>12}")
+        for name, requests, func in [
+            ("sequence of calls", len(sequence), before),
+            ("/api/bootstrap/", 1, after),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            count = len(queries)
+            elapsed = measure(func, options["number"])
+            self.stdout.write(f"{name:<24}{requests:>9}{count:>9}{elapsed:>10.2f}ms")
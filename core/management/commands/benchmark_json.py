@@ -0,0 +1,53 @@
+import io
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core.benchmarks import api_payloads, measure
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Compare stock DRF JSONRenderer/JSONParser with the orjson-based pair"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=200, help="Calls per timing round"
+        )
+        parser.add_argument(
+            "--synthetic",
+            action="store_true",
+            help="Use generated payloads even if the database has data",
+        )
+
+    def handle(self, *args, **options):
+        payloads, source = api_payloads(options["synthetic"])
+        number = options["number"]
+        stock_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), ORJSONParser()
+
+        self.stdout.write(f"Payloads: {source}, {number} calls per round\n")
+        self.stdout.write(
+            f"{'payload':<26}{'size':>9}{'render':>16}{'parse':>16}{'saved/req':>12}"
+        )
+        for name, data in payloads.items():
+            stock_bytes = stock_renderer.render(data)
+            fast_bytes = fast_renderer.render(data)
+            if stock_bytes != fast_bytes:
+                self.stderr.write(f"{name}: output differs from JSONRenderer")
+
+            render_stock = measure(lambda: stock_renderer.render(data), number)
+            render_fast = measure(lambda: fast_renderer.render(data), number)
+            parse_stock = measure(
+                lambda: stock_parser.parse(io.BytesIO(stock_bytes)), number
+            )
+            parse_fast = measure(
+                lambda: fast_parser.parse(io.BytesIO(stock_bytes)), number
+            )
+
+            self.stdout.write(
+                f"{name:<26}{len(stock_bytes):>8}B"
+                f"{render_stock:>8.3f}→{render_fast:.3f}ms"
+                f"{parse_stock:>8.3f}→{parse_fast:.3f}ms"
+                f"{render_stock - render_fast:>10.3f}ms"
+            )
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from core.authentication import MealtimeTokenObtainPairSerializer
+from core.benchmarks import measure
+from core.middleware import full_stack_middleware
+
+HOST = "localhost"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time API requests through the full and the lean middleware stacks "
+        "(behaviour of both stacks is covered by core.tests)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=200, help="Calls per timing round"
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="API path to time (repeatable); default /api/tags/",
+        )
+        parser.add_argument(
+            "--user", help="Username for the JWT; by default the first user"
+        )
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"User {username!r} not found")
+        user = User.objects.order_by("pk").first()
+        if user is None:
+            raise CommandError("No users in the database")
+        return user
+
+    def get(self, client, path, token):
+        response = client.get(path, HTTP_HOST=HOST, HTTP_AUTHORIZATION=token)
+        if response.status_code != 200:
+            raise CommandError(f"{path}: HTTP {response.status_code}")
+        return response
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        access = MealtimeTokenObtainPairSerializer.get_token(user).access_token
+        token = f"Bearer {access}"
+
+        self.stdout.write(f"user: {user.username}")
+        self.stdout.write(
+            f"{'path':<28}{'full':>10}{'lean':>10}{'saved':>10}  dropped headers"
+        )
+        for path in options["paths"] or ["/api/tags/"]:
+            timings = []
+            headers = []
+            for middleware in [full_stack_middleware(), settings.MIDDLEWARE]:
+                with override_settings(MIDDLEWARE=middleware):
+                    client = APIClient()
+                    response = self.get(client, path, token)
+                    names = set(response.headers)
+                    if response.cookies:
+                        names.add("Set-Cookie")
+                    headers.append(names)
+                    timings.append(
+                        measure(
+                            lambda: self.get(client, path, token), options["number"]
+                        )
+                    )
+            dropped = ", ".join(sorted(headers[0] - headers[1])) or "-"
+            self.stdout.write(
+                f"{path:<28}{timings[0]:>8.3f}ms{timings[1]:>8.3f}ms"
+                f"{timings[0] - timings[1]:>8.3f}ms  {dropped}"
+            )
@@ -0,0 +1,44 @@
+import gzip
+import io
+from django.core.management.base import BaseCommand
+from core.benchmarks import api_payloads, measure
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Compare JSON and MessagePack payload size and encode/decode time"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=200, help="Calls per timing round"
+        )
+        parser.add_argument(
+            "--synthetic",
+            action="store_true",
+            help="Use generated payloads even if the database has data",
+        )
+
+    def handle(self, *args, **options):
+        payloads, source = api_payloads(options["synthetic"])
+        number = options["number"]
+        formats = [
+            ("json", ORJSONRenderer(), ORJSONParser()),
+            ("msgpack", MessagePackRenderer(), MessagePackParser()),
+        ]
+
+        self.stdout.write(f"Payloads: {source}, {number} calls per round\n")
+        self.stdout.write(
+            f"{'payload':<26}{'format':<9}{'size':>9}{'gzip':>9}"
+            f"{'encode':>11}{'decode':>11}"
+        )
+        for name, data in payloads.items():
+            for format_name, renderer, parser in formats:
+                body = renderer.render(data)
+                encode = measure(lambda: renderer.render(data), number)
+                decode = measure(lambda: parser.parse(io.BytesIO(body)), number)
+                self.stdout.write(
+                    f"{name:<26}{format_name:<9}{len(body):>8}B"
+                    f"{len(gzip.compress(body)):>8}B"
+                    f"{encode:>9.3f}ms{decode:>9.3f}ms"
+                )
@@ -0,0 +1,139 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from core.benchmarks import measure
+from core.fast_serializers import (
+    ingredient_rows,
+    serialize_ingredients,
+    recipe_rows,
+    serialize_recipes,
+    meal_plan_rows,
+    serialize_meal_plans,
+    shopping_list_rows,
+    serialize_shopping_lists,
+)
+from core.models import Ingredient, Recipe, MealPlan, ShoppingList, UserPurchase
+from core.serializers import (
+    IngredientSerializer,
+    RecipeSerializer,
+    MealPlanSerializer,
+    ShoppingListSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time fast list serializers against the ModelSerializers "
+        "(output equality is covered by core.tests)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=20, help="Calls per timing round"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Rows per list (page size)"
+        )
+
+    def get_cases(self, limit):
+        factory = APIRequestFactory()
+        anonymous = factory.get("/api/recipes/")
+        anonymous.user = AnonymousUser()
+
+        cases = [
+            (
+                "ingredients",
+                lambda: IngredientSerializer(
+                    Ingredient.objects.select_related("category")[: limit * 5],
+                    many=True,
+                ).data,
+                lambda: serialize_ingredients(
+                    ingredient_rows(Ingredient.objects.all())[: limit * 5]
+                ),
+            ),
+            (
+                "recipes (anonymous)",
+                lambda: RecipeSerializer(
+                    Recipe.objects.prefetch_related(
+                        "ingredients__ingredient", "tags", "cooking_method"
+                    ).order_by("name")[:limit],
+                    many=True,
+                    context={"request": anonymous},
+                ).data,
+                lambda: serialize_recipes(
+                    recipe_rows(Recipe.objects.order_by("name"))[:limit], anonymous
+                ),
+            ),
+        ]
+
+        purchase = UserPurchase.objects.select_related("user").first()
+        if purchase:
+            buyer = factory.get("/api/recipes/")
+            buyer.user = purchase.user
+            premium = Recipe.objects.order_by("-is_premium", "name")
+            cases.append(
+                (
+                    "recipes (premium buyer)",
+                    lambda: RecipeSerializer(
+                        premium.prefetch_related(
+                            "ingredients__ingredient", "tags", "cooking_method"
+                        )[:limit],
+                        many=True,
+                        context={"request": buyer},
+                    ).data,
+                    lambda: serialize_recipes(recipe_rows(premium)[:limit], buyer),
+                )
+            )
+
+        planner = (
+            User.objects.annotate(plans=Count("mealplan"))
+            .order_by("-plans")
+            .values_list("id", flat=True)
+            .first()
+        )
+        meal_plans = MealPlan.objects.filter(user_id=planner)
+        cases.append(
+            (
+                "meal plans",
+                lambda: MealPlanSerializer(
+                    meal_plans.prefetch_related("recipes__recipe")[: limit * 3],
+                    many=True,
+                ).data,
+                lambda: serialize_meal_plans(meal_plan_rows(meal_plans)[: limit * 3]),
+            )
+        )
+
+        cases.append(
+            (
+                "shopping lists",
+                lambda: ShoppingListSerializer(
+                    ShoppingList.objects.prefetch_related("items__ingredient")[:limit],
+                    many=True,
+                ).data,
+                lambda: serialize_shopping_lists(
+                    shopping_list_rows(ShoppingList.objects.all())[:limit]
+                ),
+            )
+        )
+        return cases
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'list':<26}{'rows':>6}{'queries':>12}{'time':>20}")
+
+        for name, slow, fast in self.get_cases(options["limit"]):
+            with CaptureQueriesContext(connection) as slow_queries:
+                rows = len(slow())
+            slow_count = len(slow_queries)
+            with CaptureQueriesContext(connection) as fast_queries:
+                fast()
+            fast_count = len(fast_queries)
+            slow_time = measure(slow, options["number"])
+            fast_time = measure(fast, options["number"])
+            self.stdout.write(
+                f"{name:<26}{rows:>6}"
+                f"{slow_count:>6}→{fast_count:<5}"
+                f"{slow_time:>9.2f}→{fast_time:.2f}ms"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from core.models import Recipe
+from core.thumbnails import update_recipe_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Create missing recipe image thumbnails for week cards"
+
+    def handle(self, *args, **options):
+        names = (
+            Recipe.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", flat=True)
+            .distinct()
+        )
+        created = failed = 0
+        for name in names.iterator():
+            if update_recipe_thumbnails(name):
+                created += 1
+            else:
+                failed += 1
+        message = f"Thumbnails ready for {created} images"
+        if failed:
+            message += f", {failed} images could not be read"
+        self.stdout.write(self.style.SUCCESS(message))
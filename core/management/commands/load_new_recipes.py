@@ -3,9 +3,10 @@ import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from core.models import (
-    Ingredient, IngredientCategory, CookingMethod, Tag,
+    Ingredient, CookingMethod, Tag,
     Recipe, RecipeIngredient
 )
+from core.reference import reference
 
 class Command(BaseCommand):
     help = 'Load new premium recipes from JSON file'
@@ -38,9 +39,9 @@ class Command(BaseCommand):
 
         # Load existing data into memory
         ingredients = {ing.name.lower(): ing for ing in Ingredient.objects.all()}
-        categories = {cat.name: cat for cat in IngredientCategory.objects.all()}
-        cooking_methods = {cm.name.lower(): cm for cm in CookingMethod.objects.all()}
-        tags = {tag.name.lower(): tag for tag in Tag.objects.all()}
+        categories = {cat.name: cat for cat in reference.categories().all}
+        cooking_methods = dict(reference.cooking_methods().by_name)
+        tags = dict(reference.tags().by_name)
 
         created_recipes_count = 0
         created_ingredients_count = 0
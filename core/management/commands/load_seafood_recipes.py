@@ -5,9 +5,10 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.core.files.base import ContentFile
 from core.models import (
-    Ingredient, IngredientCategory, CookingMethod, Tag,
+    Ingredient, CookingMethod, Tag,
     Recipe, RecipeIngredient
 )
+from core.reference import reference
 
 
 class Command(BaseCommand):
@@ -54,17 +55,10 @@ class Command(BaseCommand):
         for ingredient in Ingredient.objects.all():
             existing_data['ingredients'][ingredient.name.lower()] = ingredient
 
-        # Категории
-        for category in IngredientCategory.objects.all():
-            existing_data['categories'][category.name.lower()] = category
-
-        # Способы приготовления
-        for method in CookingMethod.objects.all():
-            existing_data['cooking_methods'][method.name.lower()] = method
-
-        # Теги
-        for tag in Tag.objects.all():
-            existing_data['tags'][tag.name.lower()] = tag
+        # Категории, способы приготовления и теги - из реестра справочников
+        existing_data['categories'].update(reference.categories().by_name)
+        existing_data['cooking_methods'].update(reference.cooking_methods().by_name)
+        existing_data['tags'].update(reference.tags().by_name)
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -104,30 +98,30 @@ class Command(BaseCommand):
 
         # Рыба и морепродукты
         if any(word in ingredient_lower for word in ['лосось', 'тунец', 'треска', 'скумбрия', 'сельдь', 'судак', 'щука']):
-            category = IngredientCategory.objects.get(name="Рыба и морепродукты")
+            category = reference.category("Рыба и морепродукты")
             unit = 'g'
         elif any(word in ingredient_lower for word in ['креветк', 'миди', 'кальмар', 'гребешок', 'осьминог']):
-            category = IngredientCategory.objects.get(name="Рыба и морепродукты")
+            category = reference.category("Рыба и морепродукты")
             unit = 'g'
         # Овощи
         elif any(word in ingredient_lower for word in ['картофель', 'морковь', 'лук', 'помидор', 'авокадо', 'перец', 'брокколи']):
-            category = IngredientCategory.objects.get(name="Овощи и зелень")
+            category = reference.category("Овощи и зелень")
             unit = 'kg' if any(word in ingredient_lower for word in ['картофель', 'морковь', 'лук']) else 'g'
         # Фрукты
         elif any(word in ingredient_lower for word in ['лимон', 'лайм', 'апельсин']):
-            category = IngredientCategory.objects.get(name="Фрукты и ягоды")
+            category = reference.category("Фрукты и ягоды")
             unit = 'kg'
         # Зелень
         elif any(word in ingredient_lower for word in ['укроп', 'петрушка', 'кинза', 'розмарин', 'базилик']):
-            category = IngredientCategory.objects.get(name="Овощи и зелень")
+            category = reference.category("Овощи и зелень")
             unit = 'g'
         # Молочные продукты
         elif any(word in ingredient_lower for word in ['сыр', 'сметан', 'сливки', 'молоко']):
-            category = IngredientCategory.objects.get(name="Молочные продукты")
+            category = reference.category("Молочные продукты")
             unit = 'g' if any(word in ingredient_lower for word in ['сыр', 'сметан']) else 'ml'
         # По умолчанию
         else:
-            category = IngredientCategory.objects.get(name="Прочее")
+            category = reference.category("Прочее")
             unit = 'g'
 
         return category, unit
@@ -4,9 +4,10 @@ import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from core.models import (
-    Ingredient, IngredientCategory, CookingMethod, Tag,
+    Ingredient, CookingMethod, Tag,
     Recipe, RecipeIngredient
 )
+from core.reference import reference
 
 
 class Command(BaseCommand):
@@ -53,17 +54,10 @@ class Command(BaseCommand):
         for ingredient in Ingredient.objects.all():
             existing_data['ingredients'][ingredient.name.lower()] = ingredient
 
-        # Категории
-        for category in IngredientCategory.objects.all():
-            existing_data['categories'][category.name.lower()] = category
-
-        # Способы приготовления
-        for method in CookingMethod.objects.all():
-            existing_data['cooking_methods'][method.name.lower()] = method
-
-        # Теги
-        for tag in Tag.objects.all():
-            existing_data['tags'][tag.name.lower()] = tag
+        # Категории, способы приготовления и теги - из реестра справочников
+        existing_data['categories'].update(reference.categories().by_name)
+        existing_data['cooking_methods'].update(reference.cooking_methods().by_name)
+        existing_data['tags'].update(reference.tags().by_name)
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -103,59 +97,59 @@ class Command(BaseCommand):
 
         # Овощи
         if any(word in ingredient_lower for word in ['помидор', 'огурец', 'брокколи', 'салат', 'лук', 'морковь', 'картофель', 'авокадо']):
-            category = IngredientCategory.objects.get(name="Овощи и зелень")
+            category = reference.category("Овощи и зелень")
             unit = 'kg' if any(word in ingredient_lower for word in ['картофель', 'морковь', 'лук']) else 'g'
         # Фрукты/ягоды
         elif any(word in ingredient_lower for word in ['лимон', 'банан', 'клубника', 'малина', 'ягоды']):
-            category = IngredientCategory.objects.get(name="Фрукты и ягоды")
+            category = reference.category("Фрукты и ягоды")
             unit = 'kg' if any(word in ingredient_lower for word in ['банан', 'лимон']) else 'g'
         # Мясо/птица
         elif any(word in ingredient_lower for word in ['куриная', 'говядина']):
-            category = IngredientCategory.objects.get(name="Мясо и птица")
+            category = reference.category("Мясо и птица")
             unit = 'g'
         # Рыба
         elif any(word in ingredient_lower for word in ['лосось', 'креветки']):
-            category = IngredientCategory.objects.get(name="Рыба и морепродукты")
+            category = reference.category("Рыба и морепродукты")
             unit = 'g'
         # Молочные продукты
         elif any(word in ingredient_lower for word in ['молоко', 'творог', 'йогурт', 'сметана', 'сливки', 'сыр']):
-            category = IngredientCategory.objects.get(name="Молочные продукты")
+            category = reference.category("Молочные продукты")
             unit = 'g' if any(word in ingredient_lower for word in ['творог', 'йогурт', 'сметана', 'сыр']) else 'ml'
         # Крупы
         elif any(word in ingredient_lower for word in ['овсяные', 'гречка', 'рис', 'спагетти']):
-            category = IngredientCategory.objects.get(name="Крупы и макароны")
+            category = reference.category("Крупы и макароны")
             unit = 'g'
         # Орехи/семена
         elif any(word in ingredient_lower for word in ['орехи', 'миндаль', 'семена']):
-            category = IngredientCategory.objects.get(name="Орехи и сухофрукты")
+            category = reference.category("Орехи и сухофрукты")
             unit = 'g'
         # Сладости
         elif any(word in ingredient_lower for word in ['мед', 'сахар']):
-            category = IngredientCategory.objects.get(name="Сладости")
+            category = reference.category("Сладости")
             unit = 'g'
         # Соусы/приправы
         elif any(word in ingredient_lower for word in ['соус', 'горчица', 'уксус']):
-            category = IngredientCategory.objects.get(name="Соусы и приправы")
+            category = reference.category("Соусы и приправы")
             unit = 'ml' if any(word in ingredient_lower for word in ['уксус', 'соус']) else 'g'
         # Специи
         elif any(word in ingredient_lower for word in ['соль', 'перец', 'лавровый', 'чеснок', 'имбирь']):
-            category = IngredientCategory.objects.get(name="Специи и травы")
+            category = reference.category("Специи и травы")
             unit = 'g'
         # Масла
         elif any(word in ingredient_lower for word in ['масло']):
-            category = IngredientCategory.objects.get(name="Масла и жиры")
+            category = reference.category("Масла и жиры")
             unit = 'ml' if any(word in ingredient_lower for word in ['оливковое', 'растительное']) else 'g'
         # Хлеб
         elif any(word in ingredient_lower for word in ['хлеб']):
-            category = IngredientCategory.objects.get(name="Хлеб и выпечка")
+            category = reference.category("Хлеб и выпечка")
             unit = 'pcs'
         # Напитки
         elif any(word in ingredient_lower for word in ['вино']):
-            category = IngredientCategory.objects.get(name="Напитки")
+            category = reference.category("Напитки")
             unit = 'ml'
         # По умолчанию
         else:
-            category = IngredientCategory.objects.get(name="Прочее")
+            category = reference.category("Прочее")
             unit = 'g'
 
         return category, unit
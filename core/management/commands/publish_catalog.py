@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.catalog import publish_catalog
+
+
+class Command(BaseCommand):
+    help = "Render anonymous catalog pages into static JSON files (with .gz/.br)"
+
+    def handle(self, *args, **options):
+        manifest = publish_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Published catalog snapshot {manifest['version']} "
+                f"for {manifest['host']}: {len(manifest['files'])} pages"
+            )
+        )
@@ -0,0 +1,409 @@
+"""
+Пакетное редактирование (/api/meal-plans/bulk/), копирование
+(/api/meal-plans/copy/) и раскладка по дням (премиум меню, шаблоны
+пользователя) планов питания.
+
+Упорядоченный список операций применяется в одной транзакции:
+
+    add       - рецепт в слот (date, meal_type)
+    remove    - удалить рецепт из плана
+    move      - перенести рецепт в другой слот
+    portions  - изменить число порций
+    reorder   - задать порядок рецептов в слоте
+
+Недостающие слоты MealPlan создаются одним bulk_create по ключу
+unique_together (user, date, meal_type), записи RecipeMealPlan
+загружаются одним запросом, операции применяются в памяти и сохраняются
+пачками. bulk-методы не отправляют сигналы, поэтому журнал синхронизации
+и версии данных обновляются здесь (record_changes); удаления идут через
+QuerySet.delete() и фиксируются сигналами.
+"""
+
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from .models import (
+    MealPlan,
+    MealPlanTemplate,
+    MealPlanTemplateRecipe,
+    Recipe,
+    RecipeMealPlan,
+)
+from .sync import record_changes
+
+# Операции, которые задают слот
+SLOT_OPERATIONS = ("add", "move", "reorder")
+
+
+class BulkEditError(Exception):
+    """Операция не может быть применена; вся пачка откатывается"""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+        self.message = message
+
+
+def ensure_slots(user, keys):
+    """
+    Слоты пользователя {(date, meal_type): MealPlan} для ключей keys и
+    множество id созданных слотов. Недостающие создаются одним bulk_create.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}, set()
+    dates = {date for date, _ in keys}
+
+    def load():
+        return {
+            (meal_plan.date, meal_plan.meal_type): meal_plan
+            for meal_plan in MealPlan.objects.filter(user=user, date__in=dates)
+            if (meal_plan.date, meal_plan.meal_type) in keys
+        }
+
+    slots = load()
+    created = set()
+    missing = [
+        MealPlan(user=user, date=date, meal_type=meal_type)
+        for date, meal_type in keys - slots.keys()
+    ]
+    if missing:
+        MealPlan.objects.bulk_create(missing, ignore_conflicts=True)
+        # Слот, параллельно созданный другим запросом, не сохранен из-за
+        # конфликта - берем его из БД
+        slots = load()
+        created = {meal_plan.id for meal_plan in missing} & {
+            meal_plan.id for meal_plan in slots.values()
+        }
+        record_changes(MealPlan, [(user.id, meal_plan_id) for meal_plan_id in created])
+    return slots, created
+
+
+class BulkEdit:
+    def __init__(self, user, operations):
+        self.user = user
+        self.operations = operations
+        self.slots, _ = ensure_slots(
+            user,
+            [
+                (operation["date"], operation["meal_type"])
+                for operation in operations
+                if operation["op"] in SLOT_OPERATIONS
+            ],
+        )
+        slot_ids = [meal_plan.id for meal_plan in self.slots.values()]
+        referenced = set()
+        for operation in operations:
+            if "recipe_meal_plan_id" in operation:
+                referenced.add(operation["recipe_meal_plan_id"])
+            referenced.update(operation.get("recipe_meal_plan_ids", []))
+        self.entries = {
+            entry.id: entry
+            for entry in RecipeMealPlan.objects.select_for_update(of=("self",))
+            .filter(meal_plan__user=user)
+            .filter(Q(id__in=referenced) | Q(meal_plan_id__in=slot_ids))
+        }
+        self.recipes = set(
+            Recipe.objects.filter(
+                id__in={
+                    operation["recipe_id"]
+                    for operation in operations
+                    if operation["op"] == "add"
+                }
+            ).values_list("id", flat=True)
+        )
+        self.created = set()
+        self.changed = set()
+        self.removed = set()
+        self.affected_slots = set(slot_ids)
+
+    def slot(self, operation):
+        return self.slots[(operation["date"], operation["meal_type"])]
+
+    def entry(self, index, entry_id):
+        entry = self.entries.get(entry_id)
+        if entry is None or entry_id in self.removed:
+            raise BulkEditError(index, "Рецепт не найден в плане питания")
+        return entry
+
+    def slot_entries(self, meal_plan_id):
+        return sorted(
+            (
+                entry
+                for entry in self.entries.values()
+                if entry.meal_plan_id == meal_plan_id and entry.id not in self.removed
+            ),
+            key=lambda entry: entry.order,
+        )
+
+    def place(self, entry, meal_plan_id, position=None):
+        """Ставит рецепт в слот: на позицию position или в конец"""
+        siblings = [
+            other for other in self.slot_entries(meal_plan_id) if other is not entry
+        ]
+        entry.meal_plan_id = meal_plan_id
+        self.changed.add(entry.id)
+        if position is None:
+            entry.order = siblings[-1].order + 1 if siblings else 0
+            return
+        siblings.insert(position, entry)
+        self.renumber(siblings)
+
+    def renumber(self, entries):
+        for order, entry in enumerate(entries):
+            if entry.order != order:
+                entry.order = order
+                self.changed.add(entry.id)
+
+    # Операции
+
+    def add(self, index, operation):
+        if operation["recipe_id"] not in self.recipes:
+            raise BulkEditError(index, "Рецепт не найден")
+        entry = RecipeMealPlan(
+            recipe_id=operation["recipe_id"], portions=operation.get("portions", 2)
+        )
+        self.entries[entry.id] = entry
+        self.created.add(entry.id)
+        self.place(entry, self.slot(operation).id, operation.get("order"))
+
+    def remove(self, index, operation):
+        entry = self.entry(index, operation["recipe_meal_plan_id"])
+        self.removed.add(entry.id)
+        self.affected_slots.add(entry.meal_plan_id)
+
+    def move(self, index, operation):
+        entry = self.entry(index, operation["recipe_meal_plan_id"])
+        self.affected_slots.add(entry.meal_plan_id)
+        self.place(entry, self.slot(operation).id, operation.get("order"))
+
+    def portions(self, index, operation):
+        entry = self.entry(index, operation["recipe_meal_plan_id"])
+        entry.portions = operation["portions"]
+        self.changed.add(entry.id)
+
+    def reorder(self, index, operation):
+        meal_plan_id = self.slot(operation).id
+        listed = [
+            self.entry(index, entry_id)
+            for entry_id in dict.fromkeys(operation["recipe_meal_plan_ids"])
+        ]
+        if any(entry.meal_plan_id != meal_plan_id for entry in listed):
+            raise BulkEditError(index, "Рецепт не из этого слота")
+        rest = [
+            entry for entry in self.slot_entries(meal_plan_id) if entry not in listed
+        ]
+        self.renumber(listed + rest)
+
+    def apply(self):
+        for index, operation in enumerate(self.operations):
+            getattr(self, operation["op"])(index, operation)
+        self.save()
+        return self.affected_slots
+
+    def save(self):
+        now = timezone.now()
+        created = [
+            self.entries[entry_id]
+            for entry_id in self.created
+            if entry_id not in self.removed
+        ]
+        updated = [
+            self.entries[entry_id]
+            for entry_id in self.changed
+            if entry_id not in self.removed and entry_id not in self.created
+        ]
+        for entry in updated:
+            entry.updated_at = now
+
+        RecipeMealPlan.objects.bulk_create(created)
+        RecipeMealPlan.objects.bulk_update(
+            updated, ["meal_plan", "portions", "order", "updated_at"]
+        )
+        removed = self.removed - self.created
+        if removed:
+            # select_related: сигналам удаления нужен владелец слота
+            RecipeMealPlan.objects.filter(id__in=removed).select_related(
+                "meal_plan"
+            ).delete()
+        record_changes(
+            RecipeMealPlan, [(self.user.id, entry.id) for entry in created + updated]
+        )
+
+
+def apply_operations(user, operations):
+    """
+    Применяет операции по порядку в одной транзакции.
+    Возвращает id затронутых слотов; при ошибке - BulkEditError.
+    """
+    with transaction.atomic():
+        return BulkEdit(user, operations).apply()
+
+
+# Копирование периодов
+
+MAX_COPY_DAYS = 31
+MAX_COPY_TARGETS = 12
+
+
+def copy_meal_plans(user, source_start, source_end, target_starts, on_conflict):
+    """
+    Копирует планы питания периода source_start..source_end в периоды,
+    начинающиеся с target_starts. Слоты, которые уже есть в целевом
+    периоде: on_conflict="skip" - остаются как есть, "merge" - рецепты
+    добавляются после уже имеющихся.
+
+    Число запросов не зависит от размера периода и числа копий: чтение
+    источника, bulk_create слотов и пачки bulk_create рецептов.
+    """
+    with transaction.atomic():
+        source = list(
+            MealPlan.objects.filter(
+                user=user, date__gte=source_start, date__lte=source_end
+            ).values("id", "date", "meal_type")
+        )
+        source_entries = {row["id"]: [] for row in source}
+        for row in (
+            RecipeMealPlan.objects.filter(meal_plan_id__in=list(source_entries))
+            .order_by("order")
+            .values("meal_plan_id", "recipe_id", "portions", "order")
+        ):
+            source_entries[row["meal_plan_id"]].append(row)
+
+        targets = {}
+        for target_start in target_starts:
+            shift = target_start - source_start
+            for row in source:
+                targets[(row["date"] + shift, row["meal_type"])] = row["id"]
+
+        slots, created_slots = ensure_slots(user, targets)
+        if on_conflict == "skip":
+            copy_to = {
+                key: meal_plan
+                for key, meal_plan in slots.items()
+                if meal_plan.id in created_slots
+            }
+        else:
+            copy_to = slots
+
+        # Рецепты идут после уже имеющихся в слоте (при merge)
+        next_order = {}
+        existing = [
+            meal_plan.id
+            for meal_plan in copy_to.values()
+            if meal_plan.id not in created_slots
+        ]
+        if existing:
+            for meal_plan_id, order in (
+                RecipeMealPlan.objects.filter(meal_plan_id__in=existing)
+                .values("meal_plan_id")
+                .annotate(max_order=Max("order"))
+                .values_list("meal_plan_id", "max_order")
+            ):
+                next_order[meal_plan_id] = order + 1
+
+        entries = [
+            RecipeMealPlan(
+                meal_plan_id=meal_plan.id,
+                recipe_id=row["recipe_id"],
+                portions=row["portions"],
+                order=next_order.get(meal_plan.id, 0) + row["order"],
+            )
+            for key, meal_plan in copy_to.items()
+            for row in source_entries[targets[key]]
+        ]
+        RecipeMealPlan.objects.bulk_create(entries, batch_size=500)
+        record_changes(RecipeMealPlan, [(user.id, entry.id) for entry in entries])
+
+    return {
+        "created_meal_plans": len(created_slots),
+        "skipped_meal_plans": len(slots) - len(copy_to),
+        "created_recipes": len(entries),
+    }
+
+
+# Раскладка по дням: премиум меню и шаблоны пользователя
+
+
+def lay_out_days(user, start_date, rows):
+    """
+    Раскладывает строки {"day_number", "meal_type", "recipe_id", "portions",
+    "order"} на даты начиная с start_date (день 1). Рецепт, который уже есть
+    в слоте, повторно не добавляется. Возвращает созданные RecipeMealPlan.
+    """
+
+    def slot_key(row):
+        return start_date + timedelta(days=row["day_number"] - 1), row["meal_type"]
+
+    with transaction.atomic():
+        rows = list(rows)
+        slots, created_slots = ensure_slots(user, [slot_key(row) for row in rows])
+        existing = set(
+            RecipeMealPlan.objects.filter(
+                meal_plan_id__in=[
+                    meal_plan.id
+                    for meal_plan in slots.values()
+                    if meal_plan.id not in created_slots
+                ]
+            ).values_list("meal_plan_id", "recipe_id")
+        )
+
+        entries = []
+        for row in rows:
+            meal_plan = slots[slot_key(row)]
+            if (meal_plan.id, row["recipe_id"]) in existing:
+                continue
+            existing.add((meal_plan.id, row["recipe_id"]))
+            entries.append(
+                RecipeMealPlan(
+                    meal_plan=meal_plan,
+                    recipe_id=row["recipe_id"],
+                    portions=row["portions"],
+                    order=row["order"],
+                )
+            )
+        RecipeMealPlan.objects.bulk_create(entries, batch_size=500)
+        record_changes(RecipeMealPlan, [(user.id, entry.id) for entry in entries])
+    return entries
+
+
+def create_template(user, start_date, end_date, **fields):
+    """Шаблон из планов питания пользователя за период"""
+    rows = RecipeMealPlan.objects.filter(
+        meal_plan__user=user,
+        meal_plan__date__gte=start_date,
+        meal_plan__date__lte=end_date,
+    ).values(
+        "meal_plan__date", "meal_plan__meal_type", "recipe_id", "portions", "order"
+    )
+    with transaction.atomic():
+        template = MealPlanTemplate.objects.create(
+            user=user, duration_days=(end_date - start_date).days + 1, **fields
+        )
+        MealPlanTemplateRecipe.objects.bulk_create(
+            [
+                MealPlanTemplateRecipe(
+                    template=template,
+                    day_number=(row["meal_plan__date"] - start_date).days + 1,
+                    meal_type=row["meal_plan__meal_type"],
+                    recipe_id=row["recipe_id"],
+                    portions=row["portions"],
+                    order=row["order"],
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+    return template
+
+
+def apply_template(user, template, start_date):
+    """Раскладывает шаблон на даты с start_date; число запросов постоянное"""
+    return lay_out_days(
+        user,
+        start_date,
+        template.recipes.values(
+            "day_number", "meal_type", "recipe_id", "portions", "order"
+        ),
+    )
@@ -0,0 +1,53 @@
+"""
+Сводки планов питания по дням для календаря (/api/meal-plans/summary/).
+
+Число рецептов, суммарное время готовки и заполненные приемы пищи
+считаются в БД одним GROUP BY по (date, meal_type) через
+MealPlan → RecipeMealPlan → Recipe; в ответе только дни, где есть планы.
+"""
+
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from .models import MealPlan
+
+MAX_SUMMARY_DAYS = 366
+
+# Порядок приемов пищи в дне, как в MealPlan.MEAL_TYPES
+MEAL_TYPE_ORDER = {
+    meal_type: index for index, (meal_type, _) in enumerate(MealPlan.MEAL_TYPES)
+}
+
+
+def meal_slot_rows(user, start, end):
+    """Приемы пищи за период с числом рецептов и временем готовки"""
+    return (
+        MealPlan.objects.filter(user=user, date__gte=start, date__lte=end)
+        .values("date", "meal_type")
+        .annotate(
+            recipes_count=Count("recipes"),
+            cooking_time=Coalesce(Sum("recipes__recipe__cooking_time"), 0),
+        )
+        .order_by("date")
+    )
+
+
+def day_summaries(user, start, end):
+    days = {}
+    for row in meal_slot_rows(user, start, end):
+        day = days.setdefault(
+            row["date"],
+            {
+                "date": row["date"].isoformat(),
+                "recipes_count": 0,
+                "cooking_time": 0,
+                "meal_types": [],
+            },
+        )
+        day["recipes_count"] += row["recipes_count"]
+        day["cooking_time"] += row["cooking_time"]
+        if row["recipes_count"]:
+            day["meal_types"].append(row["meal_type"])
+
+    for day in days.values():
+        day["meal_types"].sort(key=MEAL_TYPE_ORDER.get)
+    return list(days.values())
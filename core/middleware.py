@@ -0,0 +1,297 @@
+"""
+Сжатие ответов API (gzip/brotli) и отдача статического снимка каталога.
+
+Кодировка выбирается по Accept-Encoding клиента, сжимаются только ответы
+больше порога (settings.MEALTIME_COMPRESSION["MIN_SIZE"]). Потоковые ответы
+(SSE и т.п.) не трогаются.
+
+Сжимаются только ответы API (JSON и MessagePack с LEAN_PATHS): HTML
+админки содержит CSRF-токен рядом с данными из запроса, и его сжатие
+открывало бы атаку BREACH.
+
+Сжатые байты горячих ответов каталога кэшируются по хэшу содержимого:
+одинаковый ответ сжимается один раз, а не на каждый запрос. Слой кэша
+ответов может сам положить готовые варианты в response.precompressed
+(см. precompress) - тогда middleware их просто отдаст.
+
+Запросы JWT API (settings.MEALTIME_MIDDLEWARE["LEAN_PATHS"]) проходят
+сокращенную цепочку: сессии, CSRF, auth, messages и X-Frame-Options нужны
+только админке, и их обертки ниже для этих путей ничего не делают.
+"""
+
+import gzip
+import hashlib
+import os
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.cache import caches
+from django.middleware import clickjacking, csrf
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.module_loading import import_string
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен - остается только gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack")
+
+DEFAULTS = {
+    "MIN_SIZE": 1024,
+    "ENCODINGS": ["br", "gzip"],
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    # Ответы с этих путей кэшируются в сжатом виде
+    "CACHE_PATHS": [],
+    "CACHE": "default",
+    "CACHE_TIMEOUT": 3600,
+}
+
+accept_encoding_re = _lazy_re_compile(r"\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?")
+
+
+def get_compression_config():
+    return {**DEFAULTS, **getattr(settings, "MEALTIME_COMPRESSION", {})}
+
+
+def available_encodings(config=None):
+    config = config or get_compression_config()
+    return [
+        encoding
+        for encoding in config["ENCODINGS"]
+        if encoding == "gzip" or (encoding == "br" and brotli is not None)
+    ]
+
+
+def choose_encoding(accept_encoding, config=None):
+    """Первая из поддерживаемых кодировок, которую принимает клиент (q > 0)"""
+    accepted = {}
+    for name, quality in accept_encoding_re.findall(accept_encoding or ""):
+        try:
+            accepted[name.lower()] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+    for encoding in available_encodings(config):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding, config=None):
+    config = config or get_compression_config()
+    if encoding == "br":
+        return brotli.compress(content, quality=config["BROTLI_QUALITY"])
+    return gzip.compress(content, compresslevel=config["GZIP_LEVEL"], mtime=0)
+
+
+def precompress(content, config=None):
+    """
+    Все поддерживаемые сжатые варианты содержимого - для слоев кэша,
+    которые хранят ответы и хотят отдавать их без повторного сжатия.
+    """
+    config = config or get_compression_config()
+    return {
+        encoding: compress(content, encoding, config)
+        for encoding in available_encodings(config)
+    }
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def is_compressible(self, request, response, config):
+        if not is_lean_request(request):
+            return False
+        if response.streaming or response.has_header("Content-Encoding"):
+            return False
+        if response.status_code != 200 or len(response.content) < config["MIN_SIZE"]:
+            return False
+        content_type = response.get("Content-Type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def process_response(self, request, response):
+        config = get_compression_config()
+        if not self.is_compressible(request, response, config):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"), config)
+        if encoding is None:
+            return response
+
+        compressed = getattr(response, "precompressed", {}).get(encoding)
+        if compressed is None:
+            if any(request.path.startswith(p) for p in config["CACHE_PATHS"]):
+                compressed = self.get_cached(response.content, encoding, config)
+            else:
+                compressed = compress(response.content, encoding, config)
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # Как в GZipMiddleware: сильный ETag относится к несжатому телу
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    def get_cached(self, content, encoding, config):
+        cache = caches[config["CACHE"]]
+        key = f"compressed:{encoding}:{hashlib.sha1(content).hexdigest()}"
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(content, encoding, config)
+            cache.set(key, compressed, config["CACHE_TIMEOUT"])
+        return compressed
+
+
+class CatalogSnapshotMiddleware:
+    """
+    Отдает анонимные GET-запросы каталога из статического снимка
+    (core/catalog.py) без view и ORM. Запросы с Authorization, другими
+    параметрами или другим форматом идут в приложение как обычно.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.serve_snapshot(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def serve_snapshot(self, request):
+        from .catalog import snapshot_filename, snapshot_store
+
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if "HTTP_AUTHORIZATION" in request.META or set(request.GET) - {"page"}:
+            return None
+        accept = request.META.get("HTTP_ACCEPT", "")
+        if "msgpack" in accept or "text/html" in accept:
+            return None
+
+        manifest, root = snapshot_store.get_manifest()
+        if manifest is None or request.get_host() != manifest["host"]:
+            return None
+        page = request.GET.get("page", "")
+        filename = snapshot_filename(request.path, "" if page == "1" else page)
+        digest = manifest["files"].get(filename)
+        if digest is None:
+            return None
+
+        etag = f'"{digest}"'
+        # Для сжатых ответов клиент присылает слабый ETag (W/"...")
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in [tag.removeprefix("W/") for tag in if_none_match]:
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        path = os.path.join(root, filename)
+        try:
+            with open(path, "rb") as file:
+                response = HttpResponse(file.read(), content_type="application/json")
+        except FileNotFoundError:
+            # Снимок заменили между чтением манифеста и файла
+            return None
+
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        suffix = {"gzip": ".gz", "br": ".br"}.get(encoding)
+        if suffix and os.path.exists(path + suffix):
+            with open(path + suffix, "rb") as file:
+                response.precompressed = {encoding: file.read()}
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+# Сокращенная цепочка для JWT API
+
+MIDDLEWARE_DEFAULTS = {
+    # Пути, которые не используют сессии, CSRF-cookie и messages
+    "LEAN_PATHS": ["/api/"],
+}
+
+
+def get_middleware_config():
+    return {**MIDDLEWARE_DEFAULTS, **getattr(settings, "MEALTIME_MIDDLEWARE", {})}
+
+
+def is_lean_request(request):
+    lean = getattr(request, "_lean_middleware", None)
+    if lean is None:
+        paths = tuple(get_middleware_config()["LEAN_PATHS"])
+        lean = request.path_info.startswith(paths)
+        request._lean_middleware = lean
+    return lean
+
+
+class FullStackOnly:
+    """
+    Примесь к middleware Django: для запросов к LEAN_PATHS middleware сразу
+    передает запрос дальше. Подклассы остаются подклассами оригиналов, так
+    что проверки админки (admin.E408-E410) их находят.
+    """
+
+    sync_capable = True
+    async_capable = False
+
+    def __call__(self, request):
+        if is_lean_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(FullStackOnly, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(FullStackOnly, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # process_view вызывает обработчик Django, а не __call__
+        if is_lean_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(FullStackOnly, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(FullStackOnly, messages_middleware.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(FullStackOnly, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+def full_stack_middleware():
+    """
+    settings.MIDDLEWARE с оригинальными middleware Django вместо оберток
+    FullStackOnly - для сравнения поведения и замеров
+    """
+    middleware = []
+    for path in settings.MIDDLEWARE:
+        cls = import_string(path)
+        if issubclass(cls, FullStackOnly):
+            base = next(base for base in cls.__bases__ if base is not FullStackOnly)
+            path = f"{base.__module__}.{base.__qualname__}"
+        middleware.append(path)
+    return middleware
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_alter_userpurchase_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglistitem",
+            name="checked_changed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Статус изменен"
+            ),
+        ),
+    ]
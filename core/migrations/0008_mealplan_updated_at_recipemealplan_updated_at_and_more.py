@@ -0,0 +1,73 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_shoppinglistitem_checked_changed_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mealplan",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Обновлен"),
+        ),
+        migrations.AddField(
+            model_name="recipemealplan",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Обновлен"),
+        ),
+        migrations.AddField(
+            model_name="shoppinglistitem",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Обновлен"),
+        ),
+        migrations.CreateModel(
+            name="SyncChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[
+                            ("meal_plan", "План питания"),
+                            ("recipe_meal_plan", "Рецепт в плане питания"),
+                            ("shopping_list", "Список покупок"),
+                            ("shopping_list_item", "Элемент списка покупок"),
+                        ],
+                        max_length=30,
+                        verbose_name="Модель",
+                    ),
+                ),
+                ("object_id", models.UUIDField(verbose_name="ID объекта")),
+                ("deleted", models.BooleanField(default=False, verbose_name="Удален")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Изменение для синхронизации",
+                "verbose_name_plural": "Изменения для синхронизации",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "id"], name="core_syncch_user_id_921deb_idx"
+                    )
+                ],
+            },
+        ),
+    ]
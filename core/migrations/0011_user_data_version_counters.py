@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userdataversion",
+            name="meal_plans",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Версия планов питания"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userdataversion",
+            name="shopping_lists",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Версия списков покупок"
+            ),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_user_data_version_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MealPlanTemplate",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, verbose_name="Название шаблона"),
+                ),
+                ("description", models.TextField(blank=True, verbose_name="Описание")),
+                (
+                    "duration_days",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="Продолжительность (дней)"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Шаблон плана питания",
+                "verbose_name_plural": "Шаблоны планов питания",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="MealPlanTemplateRecipe",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day_number",
+                    models.PositiveSmallIntegerField(verbose_name="День шаблона"),
+                ),
+                (
+                    "meal_type",
+                    models.CharField(
+                        choices=[
+                            ("breakfast", "Завтрак"),
+                            ("lunch", "Обед"),
+                            ("dinner", "Ужин"),
+                            ("snack", "Перекус"),
+                            ("supper", "Поздний ужин"),
+                        ],
+                        max_length=50,
+                        verbose_name="Прием пищи",
+                    ),
+                ),
+                (
+                    "portions",
+                    models.PositiveSmallIntegerField(
+                        default=2, verbose_name="Количество порций"
+                    ),
+                ),
+                (
+                    "order",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="Порядок"),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipes",
+                        to="core.mealplantemplate",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рецепт в шаблоне плана питания",
+                "verbose_name_plural": "Рецепты в шаблонах планов питания",
+                "ordering": ["day_number", "meal_type", "order"],
+            },
+        ),
+    ]
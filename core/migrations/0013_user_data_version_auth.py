@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_meal_plan_templates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userdataversion",
+            name="auth",
+            field=models.PositiveIntegerField(default=0, verbose_name="Версия токенов"),
+        ),
+    ]
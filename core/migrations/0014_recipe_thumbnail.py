@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_user_data_version_auth"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="thumbnail",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="Миниатюра"
+            ),
+        ),
+    ]
@@ -160,8 +160,15 @@ class Recipe(models.Model):
     image = models.ImageField(
         upload_to="recipes/", blank=True, null=True, verbose_name="Изображение"
     )
+    # Имя созданной миниатюры (core/thumbnails.py); пусто, пока ее нет
+    thumbnail = models.CharField(
+        max_length=255, blank=True, editable=False, verbose_name="Миниатюра"
+    )
     portions = models.PositiveIntegerField(default=2, verbose_name="Количество порций")
     is_premium = models.BooleanField(default=False, verbose_name="Премиум рецепт")
+    # Меняется и при изменении ингредиентов, тегов и способа приготовления
+    # рецепта (core/signals.py) - по нему инвалидируется кэш фрагментов
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
     available_in_premium_menus = models.ManyToManyField(
         PremiumMealPlan,
         through="PremiumMealPlanRecipe",
@@ -221,6 +228,7 @@ class MealPlan(models.Model):
     meal_type = models.CharField(
         max_length=50, choices=MEAL_TYPES, verbose_name="Прием пищи"
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
 
     class Meta:
         verbose_name = "План питания"
@@ -274,6 +282,7 @@ class RecipeMealPlan(models.Model):
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, verbose_name="Рецепт")
     portions = models.PositiveIntegerField(default=2, verbose_name="Количество порций")
     order = models.PositiveIntegerField(default=0, verbose_name="Порядок")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
 
     class Meta:
         verbose_name = "Рецепт в плане питания"
@@ -284,6 +293,52 @@ class RecipeMealPlan(models.Model):
         return f"{self.meal_plan} - {self.recipe.name} ({self.portions} порц.)"
 
 
+class MealPlanTemplate(models.Model):
+    """
+    Шаблон плана питания пользователя: сохраненный период планов,
+    раскладывается на любые даты (core/meal_plan_bulk.py)
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name="Пользователь"
+    )
+    name = models.CharField(max_length=255, verbose_name="Название шаблона")
+    description = models.TextField(blank=True, verbose_name="Описание")
+    duration_days = models.PositiveSmallIntegerField(
+        verbose_name="Продолжительность (дней)"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Шаблон плана питания"
+        verbose_name_plural = "Шаблоны планов питания"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.name
+
+
+class MealPlanTemplateRecipe(models.Model):
+    template = models.ForeignKey(
+        MealPlanTemplate, on_delete=models.CASCADE, related_name="recipes"
+    )
+    day_number = models.PositiveSmallIntegerField(verbose_name="День шаблона")
+    meal_type = models.CharField(
+        max_length=50, choices=MealPlan.MEAL_TYPES, verbose_name="Прием пищи"
+    )
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, verbose_name="Рецепт")
+    portions = models.PositiveSmallIntegerField(
+        default=2, verbose_name="Количество порций"
+    )
+    order = models.PositiveSmallIntegerField(default=0, verbose_name="Порядок")
+
+    class Meta:
+        verbose_name = "Рецепт в шаблоне плана питания"
+        verbose_name_plural = "Рецепты в шаблонах планов питания"
+        ordering = ["day_number", "meal_type", "order"]
+
+
 class ShoppingList(models.Model):
     STATUS_CHOICES = [
         ("draft", "Черновик"),
@@ -378,6 +433,10 @@ class ShoppingListItem(models.Model):
 
     # Статус элемента
     checked = models.BooleanField(default=False, verbose_name="Куплено")
+    # Время последнего изменения checked (по часам клиента) для last-writer-wins
+    checked_changed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Статус изменен"
+    )
     order = models.PositiveIntegerField(default=0, verbose_name="Порядок сортировки")
 
     # Категория для группировки в списке
@@ -393,6 +452,7 @@ class ShoppingListItem(models.Model):
         max_length=255, blank=True, verbose_name="Пользовательское название"
     )
     notes = models.TextField(blank=True, verbose_name="Заметки")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
 
     class Meta:
         verbose_name = "Элемент списка покупок"
@@ -404,6 +464,72 @@ class ShoppingListItem(models.Model):
         return f"{display_name} - {self.quantity} {self.unit}"
 
 
+class SyncChange(models.Model):
+    """Журнал изменений приватных данных пользователя для дельта-синхронизации"""
+
+    MODEL_CHOICES = [
+        ("meal_plan", "План питания"),
+        ("recipe_meal_plan", "Рецепт в плане питания"),
+        ("shopping_list", "Список покупок"),
+        ("shopping_list_item", "Элемент списка покупок"),
+    ]
+
+    # Автоинкрементный id служит курсором синхронизации
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name="Пользователь"
+    )
+    model = models.CharField(
+        max_length=30, choices=MODEL_CHOICES, verbose_name="Модель"
+    )
+    object_id = models.UUIDField(verbose_name="ID объекта")
+    deleted = models.BooleanField(default=False, verbose_name="Удален")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+
+    class Meta:
+        verbose_name = "Изменение для синхронизации"
+        verbose_name_plural = "Изменения для синхронизации"
+        indexes = [models.Index(fields=["user", "id"])]
+
+    def __str__(self):
+        action = "удален" if self.deleted else "изменен"
+        return f"#{self.id} {self.model} {self.object_id} ({action})"
+
+
+class UserDataVersion(models.Model):
+    """
+    Счетчики версий данных пользователя. Увеличиваются при изменениях
+    и используются как дешевые ключи кэша
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="data_version",
+        verbose_name="Пользователь",
+    )
+    # Версия доступов (покупок премиум меню) - ключ кэша core/entitlements.py
+    purchases = models.PositiveIntegerField(default=0, verbose_name="Версия покупок")
+    # Версии приватных данных для условных запросов (ETag)
+    meal_plans = models.PositiveIntegerField(
+        default=0, verbose_name="Версия планов питания"
+    )
+    shopping_lists = models.PositiveIntegerField(
+        default=0, verbose_name="Версия списков покупок"
+    )
+    # Версия токенов: попадает в JWT как claim, увеличивается при деактивации
+    # пользователя и отзывает выданные токены (core/authentication.py)
+    auth = models.PositiveIntegerField(default=0, verbose_name="Версия токенов")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
+
+    class Meta:
+        verbose_name = "Версия данных пользователя"
+        verbose_name_plural = "Версии данных пользователей"
+
+    def __str__(self):
+        return f"{self.user_id}: покупки v{self.purchases}"
+
+
 class ShoppingListTemplate(models.Model):
     """Шаблоны для часто используемых списков (базовые покупки)"""
 
@@ -0,0 +1,35 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from .renderers import MessagePackRenderer, ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSON-парсер на orjson (тело запроса должно быть в UTF-8)"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read() if stream is not None else b"")
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """Парсер тела запроса application/msgpack (типы значений - как в JSON)"""
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(
+                stream.read() if stream is not None else b"",
+                raw=False,
+            )
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(
+                "MessagePack parse error - %s" % (str(exc) or type(exc).__name__)
+            )
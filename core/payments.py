@@ -4,13 +4,15 @@ import json
 import time
 import urllib.parse
 from django.conf import settings
+from django.db import transaction
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from .models import UserPurchase, PremiumMealPlan
+from .throttling import bucket_throttles, limit_concurrency
 import logging
 
 logger = logging.getLogger(__name__)
@@ -102,9 +104,10 @@ def payment_result(request):
                 if not getattr(settings, 'ROBOKASSA_TEST_MODE', True) and is_test != '1':
                     return HttpResponse('ERROR: Amount mismatch', status=400)
 
-            # Обновляем статус покупки
-            purchase.status = 'paid'
-            purchase.save()
+            # Обновляем статус покупки (вместе с версией покупок пользователя)
+            with transaction.atomic():
+                purchase.status = 'paid'
+                purchase.save()
 
             logger.info(f"Order #{inv_id} successfully marked as paid")
 
@@ -192,8 +195,9 @@ def payment_fail(request):
             purchase = UserPurchase.objects.get(order_number=inv_id_int)
 
             if purchase.status != "paid":
-                purchase.status = "cancelled"
-                purchase.save()
+                with transaction.atomic():
+                    purchase.status = "cancelled"
+                    purchase.save()
 
             return Response(
                 {
@@ -215,6 +219,8 @@ def payment_fail(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes(bucket_throttles("payments.create"))
+@limit_concurrency("payments.create")
 def create_payment(request):
     """
     Создание платежа в Robokassa с фискализацией (чеком)
@@ -0,0 +1,133 @@
+"""
+Кэш JSON-фрагментов рецептов с персональной накладкой.
+
+Весь вывод RecipeSerializer, кроме user_has_access и
+accessible_through_menus, одинаков для всех пользователей. Эта общая часть
+хранится в кэше уже отрендеренной (байты JSON) по ключу из id рецепта и
+его версии (Recipe.updated_at). Персональные поля идут последними, поэтому
+при ответе они просто дописываются к фрагменту по набору доступов
+пользователя (entitlements.py). Страница списка рецептов - это запрос
+id/версий, один get_many в кэш и сборка байтов.
+
+Готовые фрагменты передаются в ORJSONRenderer как orjson.Fragment, вывод
+побайтно совпадает с обычным. Для других форматов (MessagePack, browsable
+API) страница сериализуется быстрыми сериализаторами.
+"""
+
+import hashlib
+import orjson
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from .entitlements import get_entitlements
+from .fast_serializers import (
+    recipe_rows,
+    serialize_recipes,
+    serialize_recipes_shared,
+    recipe_access_fields,
+)
+from .models import Recipe
+from .renderers import ORJSONRenderer
+
+# Увеличить при изменении формата RecipeSerializer
+FRAGMENT_FORMAT = 1
+
+DEFAULTS = {"CACHE": "default", "TIMEOUT": 24 * 3600}
+
+VERSION_FIELDS = ["id", "updated_at", "is_premium"]
+
+
+def get_fragment_config():
+    return {**DEFAULTS, **getattr(settings, "MEALTIME_RECIPE_FRAGMENTS", {})}
+
+
+def recipe_version_rows(queryset):
+    """Для страницы списка достаточно id и версий рецептов"""
+    return queryset.prefetch_related(None).values(*VERSION_FIELDS)
+
+
+def touch_recipes(queryset):
+    """
+    Новая версия рецептов без вызова save(): для изменений связанных
+    объектов (ингредиенты, теги, способ приготовления)
+    """
+    return Recipe.objects.filter(pk__in=queryset.values("pk")).update(
+        updated_at=timezone.now()
+    )
+
+
+def uses_fragments(request):
+    renderer = getattr(request, "accepted_renderer", None)
+    return isinstance(renderer, ORJSONRenderer) and (
+        renderer.get_indent(request.accepted_media_type, {}) is None
+    )
+
+
+def fragment_key(recipe_id, updated_at, base_url):
+    # Ссылка на изображение абсолютная и зависит от хоста запроса
+    host = hashlib.md5(base_url.encode()).hexdigest()[:8]
+    return (
+        f"recipe:fragment:{FRAGMENT_FORMAT}:{recipe_id}:"
+        f"{updated_at.timestamp()}:{host}"
+    )
+
+
+def render_recipe_page(rows, request):
+    """
+    Рецепты страницы (строки recipe_version_rows) в формате RecipeSerializer
+    в том же порядке
+    """
+    return list(render_recipes_by_id(rows, request).values())
+
+
+def render_recipes_by_id(rows, request):
+    """Как render_recipe_page, но {id рецепта: данные} в порядке rows"""
+    rows = list(rows)
+    if not uses_fragments(request):
+        by_id = {
+            row["id"]: row
+            for row in recipe_rows(
+                Recipe.objects.filter(id__in=[row["id"] for row in rows])
+            )
+        }
+        found = [by_id[row["id"]] for row in rows if row["id"] in by_id]
+        return {
+            row["id"]: item
+            for row, item in zip(found, serialize_recipes(found, request))
+        }
+
+    config = get_fragment_config()
+    cache = caches[config["CACHE"]]
+    renderer = ORJSONRenderer()
+    base_url = request.build_absolute_uri("/")
+
+    keys = {
+        row["id"]: fragment_key(row["id"], row["updated_at"], base_url) for row in rows
+    }
+    fragments = cache.get_many(list(keys.values()))
+
+    missing = [recipe_id for recipe_id, key in keys.items() if key not in fragments]
+    if missing:
+        fresh_rows = list(recipe_rows(Recipe.objects.filter(id__in=missing)))
+        rendered = {}
+        for row, item in zip(fresh_rows, serialize_recipes_shared(fresh_rows, request)):
+            # Без закрывающей скобки: персональные поля дописываются следом
+            fragment = renderer.render(item)[:-1]
+            key = fragment_key(row["id"], row["updated_at"], base_url)
+            rendered[key] = fragment
+            keys[row["id"]] = key
+        cache.set_many(rendered, config["TIMEOUT"])
+        fragments.update(rendered)
+
+    entitlements = get_entitlements(request.user)
+    data = {}
+    for row in rows:
+        fragment = fragments.get(keys[row["id"]])
+        if fragment is None:
+            # Рецепт удален между запросами страницы и данных
+            continue
+        access = renderer.render(
+            recipe_access_fields(row["id"], row["is_premium"], request, entitlements)
+        )
+        data[row["id"]] = orjson.Fragment(fragment + b"," + access[1:])
+    return data
@@ -0,0 +1,101 @@
+"""
+Реестр маленьких справочников процесса: категории ингредиентов, способы
+приготовления, теги.
+
+Таблица загружается один раз на процесс в неизменяемые словари (по id и по
+имени в нижнем регистре) и перезагружается, когда меняется ее версия.
+Версии хранятся в двухуровневом кэше (core/tiered_cache.py): проверка
+версии - чтение из памяти воркера, а изменение справочника в админке
+(signals.py) рассылает новую версию всем воркерам. Поиск по справочникам
+в циклах загрузчиков и на каждый запрос не делает запросов к БД.
+
+Объекты моделей в реестре общие для всех потоков - их нельзя изменять.
+"""
+
+import threading
+import uuid
+from types import MappingProxyType
+from .models import CookingMethod, IngredientCategory, Tag
+from .tiered_cache import reference_cache
+
+TABLES = {
+    "categories": IngredientCategory,
+    "cooking_methods": CookingMethod,
+    "tags": Tag,
+}
+
+
+def version_key(table):
+    return f"reference:version:{table}"
+
+
+def bump_reference_version(*tables):
+    """Новая версия таблиц: все процессы перезагрузят их при обращении"""
+    reference_cache().set_many(
+        {version_key(table): uuid.uuid4().hex for table in tables}
+    )
+
+
+def reference_version(table):
+    """Текущая версия таблицы (создается при первом обращении)"""
+    cache = reference_cache()
+    version = cache.get(version_key(table))
+    if version is None:
+        cache.add(version_key(table), uuid.uuid4().hex)
+        version = cache.get(version_key(table))
+    return version
+
+
+class ReferenceTable:
+    def __init__(self, objects, version):
+        self.version = version
+        self.all = tuple(objects)
+        self.by_id = MappingProxyType({obj.pk: obj for obj in self.all})
+        self.by_name = MappingProxyType({obj.name.lower(): obj for obj in self.all})
+
+    def get(self, name):
+        """Объект по имени без учета регистра; None, если такого нет"""
+        return self.by_name.get(name.lower())
+
+
+class ReferenceRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def table(self, name):
+        version = reference_version(name)
+        table = self._tables.get(name)
+        if table is not None and table.version == version:
+            return table
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None or table.version != version:
+                table = ReferenceTable(TABLES[name].objects.all(), version)
+                self._tables[name] = table
+        return table
+
+    def categories(self):
+        return self.table("categories")
+
+    def cooking_methods(self):
+        return self.table("cooking_methods")
+
+    def tags(self):
+        return self.table("tags")
+
+    def category(self, name):
+        """Как IngredientCategory.objects.get(name=...), но без запроса"""
+        category = self.categories().get(name)
+        if category is None:
+            raise IngredientCategory.DoesNotExist(f"Категория {name!r} не найдена")
+        return category
+
+    def cooking_method(self, name):
+        return self.cooking_methods().get(name)
+
+    def tag(self, name):
+        return self.tags().get(name)
+
+
+reference = ReferenceRegistry()
@@ -0,0 +1,89 @@
+import json
+from decimal import Decimal
+import msgpack
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def orjson_default(obj):
+    """
+    Типы, которые orjson не сериализует сам (Decimal, ленивые строки и т.д.),
+    приводятся так же, как в стандартном JSONRenderer DRF
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson. UUID, date и datetime сериализуются нативно,
+    Decimal - через orjson_default. Вывод побайтно совпадает с JSONRenderer
+    (компактный UTF-8); для отступов (indent) используется стандартный путь.
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=orjson_default, option=self.options)
+        # Как и JSONRenderer, экранируем U+2028/U+2029 для совместимости с JS
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+def msgpack_default(obj):
+    """
+    Типы вне формата MessagePack приводятся как в JSONRenderer: UUID и
+    Decimal из сериализаторов и так приходят строками, поэтому ExtType
+    не используются - клиент получает одинаковые типы в JSON и MessagePack
+    """
+    return _drf_encoder.default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Рендерер application/msgpack для мобильного клиента.
+    Выбирается только по заголовку Accept, JSON остается по умолчанию.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=msgpack_default, use_bin_type=True)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Рендерер для SSE-эндпоинтов. Сам поток отдается через
+    StreamingHttpResponse, а этот класс нужен для согласования
+    Accept: text/event-stream и для ответов с ошибками.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+        return f"event: error\ndata: {payload}\n\n".encode(self.charset)
@@ -7,6 +7,8 @@ from .models import (
     RecipeIngredient,
     MealPlan,
     RecipeMealPlan,
+    MealPlanTemplate,
+    MealPlanTemplateRecipe,
     ShoppingList,
     ShoppingListItem,
     ShoppingListTemplate,
@@ -18,6 +20,8 @@ from .models import (
 )
 from django.contrib.auth.models import User
 from decimal import Decimal
+from datetime import timedelta
+from .meal_plan_bulk import MAX_COPY_DAYS, MAX_COPY_TARGETS, create_template
 
 
 class FormattedDecimalField(serializers.DecimalField):
@@ -193,6 +197,212 @@ class ShoppingListSerializer(serializers.ModelSerializer):
         return obj.get_progress()
 
 
+# Синхронизация: плоские представления без вложенных коллекций
+class SyncMealPlanSerializer(serializers.ModelSerializer):
+    meal_type_display = serializers.CharField(
+        source="get_meal_type_display", read_only=True
+    )
+
+    class Meta:
+        model = MealPlan
+        fields = ["id", "date", "meal_type", "meal_type_display", "updated_at"]
+
+
+class SyncRecipeMealPlanSerializer(RecipeMealPlanSerializer):
+    class Meta(RecipeMealPlanSerializer.Meta):
+        fields = RecipeMealPlanSerializer.Meta.fields + ["meal_plan", "updated_at"]
+
+
+class SyncShoppingListSerializer(ShoppingListSerializer):
+    items = None
+
+    class Meta(ShoppingListSerializer.Meta):
+        fields = [
+            field for field in ShoppingListSerializer.Meta.fields if field != "items"
+        ]
+
+
+class SyncShoppingListItemSerializer(ShoppingListItemSerializer):
+    class Meta(ShoppingListItemSerializer.Meta):
+        fields = ShoppingListItemSerializer.Meta.fields + [
+            "shopping_list",
+            "checked_changed_at",
+            "updated_at",
+        ]
+
+
+class ShoppingListItemCheckOperationSerializer(serializers.Serializer):
+    item_id = serializers.UUIDField()
+    checked = serializers.BooleanField()
+    client_timestamp = serializers.DateTimeField()
+
+
+class ShoppingListItemBatchCheckSerializer(serializers.Serializer):
+    """Пакет отметок, накопленных клиентом в офлайне"""
+
+    operations = ShoppingListItemCheckOperationSerializer(
+        many=True, allow_empty=False, max_length=500
+    )
+
+
+class MealPlanBulkOperationSerializer(serializers.Serializer):
+    """
+    Операция пакетного редактирования планов питания (meal_plan_bulk.py).
+    Слот задается парой date + meal_type и создается, если его еще нет.
+    """
+
+    OPERATIONS = ["add", "remove", "move", "portions", "reorder"]
+    REQUIRED_FIELDS = {
+        "add": ["date", "meal_type", "recipe_id"],
+        "remove": ["recipe_meal_plan_id"],
+        "move": ["recipe_meal_plan_id", "date", "meal_type"],
+        "portions": ["recipe_meal_plan_id", "portions"],
+        "reorder": ["date", "meal_type", "recipe_meal_plan_ids"],
+    }
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    date = serializers.DateField(required=False)
+    meal_type = serializers.ChoiceField(choices=MealPlan.MEAL_TYPES, required=False)
+    recipe_id = serializers.UUIDField(required=False)
+    recipe_meal_plan_id = serializers.UUIDField(required=False)
+    recipe_meal_plan_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False
+    )
+    portions = serializers.IntegerField(required=False, min_value=1)
+    # Позиция в слоте для add и move; по умолчанию - в конец
+    order = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        missing = [
+            name for name in self.REQUIRED_FIELDS[attrs["op"]] if name not in attrs
+        ]
+        if missing:
+            raise serializers.ValidationError(
+                {name: "Обязательное поле для этой операции." for name in missing}
+            )
+        return attrs
+
+
+class MealPlanBulkSerializer(serializers.Serializer):
+    """Упорядоченный список операций, применяется в одной транзакции"""
+
+    operations = MealPlanBulkOperationSerializer(
+        many=True, allow_empty=False, max_length=200
+    )
+
+
+class MealPlanCopySerializer(serializers.Serializer):
+    """
+    Копирование периода планов питания: в периоды с началом target_starts
+    или repeat раз подряд сразу после исходного периода
+    """
+
+    source_start = serializers.DateField()
+    source_end = serializers.DateField()
+    target_starts = serializers.ListField(
+        child=serializers.DateField(), required=False, allow_empty=False
+    )
+    repeat = serializers.IntegerField(
+        required=False, min_value=1, max_value=MAX_COPY_TARGETS
+    )
+    on_conflict = serializers.ChoiceField(choices=["skip", "merge"], default="skip")
+
+    def validate(self, attrs):
+        start, end = attrs["source_start"], attrs["source_end"]
+        days = (end - start).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                {"source_end": "Конец периода раньше начала."}
+            )
+        if days > MAX_COPY_DAYS:
+            raise serializers.ValidationError(
+                {"source_end": f"Период не длиннее {MAX_COPY_DAYS} дней."}
+            )
+
+        if ("target_starts" in attrs) == ("repeat" in attrs):
+            raise serializers.ValidationError("Укажите target_starts или repeat.")
+        if "repeat" in attrs:
+            targets = [
+                start + timedelta(days=days * (number + 1))
+                for number in range(attrs.pop("repeat"))
+            ]
+        else:
+            targets = sorted(set(attrs["target_starts"]))
+        if len(targets) > MAX_COPY_TARGETS:
+            raise serializers.ValidationError(
+                {"target_starts": f"Не больше {MAX_COPY_TARGETS} копий."}
+            )
+
+        # Периоды не пересекаются между собой и с исходным
+        for previous, current in zip(targets, targets[1:]):
+            if (current - previous).days < days:
+                raise serializers.ValidationError(
+                    {"target_starts": "Периоды копий пересекаются."}
+                )
+        if any(abs((target - start).days) < days for target in targets):
+            raise serializers.ValidationError(
+                {"target_starts": "Период копии пересекается с исходным."}
+            )
+
+        attrs["target_starts"] = targets
+        return attrs
+
+
+class MealPlanTemplateRecipeSerializer(serializers.ModelSerializer):
+    recipe_name = serializers.CharField(source="recipe.name", read_only=True)
+
+    class Meta:
+        model = MealPlanTemplateRecipe
+        fields = [
+            "id",
+            "day_number",
+            "meal_type",
+            "recipe",
+            "recipe_name",
+            "portions",
+            "order",
+        ]
+
+
+class MealPlanTemplateSerializer(serializers.ModelSerializer):
+    recipes = MealPlanTemplateRecipeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MealPlanTemplate
+        fields = ["id", "name", "description", "duration_days", "created_at", "recipes"]
+        read_only_fields = ["duration_days", "created_at"]
+
+
+class MealPlanTemplateCreateSerializer(serializers.ModelSerializer):
+    """Шаблон из планов питания пользователя за период start_date..end_date"""
+
+    start_date = serializers.DateField(write_only=True)
+    end_date = serializers.DateField(write_only=True)
+
+    class Meta:
+        model = MealPlanTemplate
+        fields = ["name", "description", "start_date", "end_date"]
+
+    def validate(self, attrs):
+        days = (attrs["end_date"] - attrs["start_date"]).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                {"end_date": "Конец периода раньше начала."}
+            )
+        if days > MAX_COPY_DAYS:
+            raise serializers.ValidationError(
+                {"end_date": f"Период не длиннее {MAX_COPY_DAYS} дней."}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        return create_template(self.context["request"].user, **validated_data)
+
+
+class ApplyMealPlanTemplateSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=True)
+
+
 class ShoppingListCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingList
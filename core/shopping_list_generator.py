@@ -1,6 +1,7 @@
 from django.db.models import Sum
 from collections import defaultdict
 from .models import MealPlan, RecipeIngredient, ShoppingList, ShoppingListItem
+from .sync import record_changes
 
 
 def generate_shopping_list(user, start_date, end_date, list_name=None):
@@ -85,16 +86,22 @@ def create_shopping_list_from_aggregation(
     # Связываем с планами питания
     shopping_list.base_meal_plans.set(meal_plans)
 
-    # Создаем элементы списка
-    for order, agg_data in enumerate(aggregated_ingredients):
-        ShoppingListItem.objects.create(
-            shopping_list=shopping_list,
-            ingredient=agg_data["ingredient"],
-            quantity=agg_data["quantity"],
-            unit=agg_data["unit"],  # Сохраняем unit для гибкости
-            category=agg_data["category"],
-            order=order,
-        )
+    # Создаем элементы списка одним запросом (bulk_create без сигналов,
+    # изменения записываются в журнал синхронизации явно)
+    items = ShoppingListItem.objects.bulk_create(
+        [
+            ShoppingListItem(
+                shopping_list=shopping_list,
+                ingredient=agg_data["ingredient"],
+                quantity=agg_data["quantity"],
+                unit=agg_data["unit"],  # Сохраняем unit для гибкости
+                category=agg_data["category"],
+                order=order,
+            )
+            for order, agg_data in enumerate(aggregated_ingredients)
+        ]
+    )
+    record_changes(ShoppingListItem, [(user.id, item.id) for item in items])
 
     # Обновляем счетчики
     shopping_list.save()
@@ -1,12 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from .models import ShoppingList, ShoppingListItem, MealPlan
+from .sync import record_changes, record_queryset_changes
+from .events import (
+    publish_shopping_list_events,
+    item_added_event,
+    item_removed_event,
+)
 from .shopping_list_generator import (
     generate_shopping_list,
     create_shopping_list_from_aggregation,
 )
 
 
+@transaction.atomic
 def get_or_create_shopping_list(user, start_date, end_date, list_name=None):
     """
     Умное создание/обновление списка покупок:
@@ -101,7 +108,16 @@ def update_shopping_list(shopping_list, aggregated_ingredients, meal_plans):
     Обновляет существующий список покупок новыми данными
     """
     # 1. Помечаем старые элементы как удаленные (soft delete) или удаляем физически
-    shopping_list.items.all().delete()
+    # Удаляем без сигналов на каждую строку (на элементы списка никто не
+    # ссылается, каскад не нужен): журнал пишется одной пачкой
+    removed_items = shopping_list.items.all()
+    removed_item_ids = list(removed_items.values_list("id", flat=True))
+    removed_items._raw_delete(removed_items.db)
+    record_changes(
+        ShoppingListItem,
+        [(shopping_list.user_id, item_id) for item_id in removed_item_ids],
+        deleted=True,
+    )
 
     # 2. Обновляем базовую информацию
     shopping_list.name = f"{shopping_list.name}"
@@ -111,23 +127,39 @@ def update_shopping_list(shopping_list, aggregated_ingredients, meal_plans):
     # 3. Обновляем привязку к планам питания
     shopping_list.base_meal_plans.set(meal_plans)
 
-    # 4. Создаем новые элементы
-    for order, agg_data in enumerate(aggregated_ingredients):
-        ShoppingListItem.objects.create(
-            shopping_list=shopping_list,
-            ingredient=agg_data["ingredient"],
-            quantity=agg_data["quantity"],
-            unit=agg_data["unit"],
-            category=agg_data["category"],
-            order=order,
-        )
+    # 4. Создаем новые элементы одним запросом: bulk_create не отправляет
+    # сигналы, поэтому журнал синхронизации и версия обновляются один раз
+    new_items = ShoppingListItem.objects.bulk_create(
+        [
+            ShoppingListItem(
+                shopping_list=shopping_list,
+                ingredient=agg_data["ingredient"],
+                quantity=agg_data["quantity"],
+                unit=agg_data["unit"],
+                category=agg_data["category"],
+                order=order,
+            )
+            for order, agg_data in enumerate(aggregated_ingredients)
+        ]
+    )
+    record_changes(
+        ShoppingListItem, [(shopping_list.user_id, item.id) for item in new_items]
+    )
 
     # 5. Сохраняем изменения
     shopping_list.save()
 
+    # 6. Оповещаем подписчиков live-обновлений
+    publish_shopping_list_events(
+        shopping_list.id,
+        [item_removed_event(item_id) for item_id in removed_item_ids]
+        + [item_added_event(item) for item in new_items],
+    )
+
     return shopping_list
 
 
+@transaction.atomic
 def archive_old_shopping_lists(user, start_date, end_date):
     """
     Архивирует старые списки за тот же период (кроме самого нового)
@@ -143,9 +175,15 @@ def archive_old_shopping_lists(user, start_date, end_date):
 
     if latest_list:
         # Архивируем все остальные списки за этот период
-        ShoppingList.objects.filter(
-            user=user, period_start=start_date, period_end=end_date
-        ).exclude(id=latest_list.id).update(status="archived", is_outdated=True)
+        old_lists = (
+            ShoppingList.objects.filter(
+                user=user, period_start=start_date, period_end=end_date
+            )
+            .exclude(id=latest_list.id)
+            .exclude(status="archived", is_outdated=True)
+        )
+        record_queryset_changes(old_lists)
+        old_lists.update(status="archived", is_outdated=True, updated_at=timezone.now())
 
 
 def get_shopping_list_history(user, days=30):
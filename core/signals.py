@@ -0,0 +1,243 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .catalog import catalog_changed
+from .models import (
+    CookingMethod,
+    Ingredient,
+    IngredientCategory,
+    PremiumMealPlan,
+    PremiumMealPlanRecipe,
+    Recipe,
+    RecipeIngredient,
+    Tag,
+    UserPurchase,
+)
+from .recipe_fragments import touch_recipes
+from .reference import TABLES, bump_reference_version
+from .sync import SYNC_MODELS, get_owner_id, is_owner_deletion, record_change
+from .thumbnails import update_recipe_thumbnails
+from .tiered_cache import invalidate_reference
+from .versions import bump_user_version
+
+
+def record_sync_save(sender, instance, raw=False, **kwargs):
+    """Фиксирует создание/изменение объекта в журнале синхронизации"""
+    if raw:
+        return
+    record_change(instance)
+
+
+def remember_sync_owner(sender, instance, origin=None, **kwargs):
+    """
+    Запоминает владельца до удаления: после каскадного удаления
+    родительской записи владельца уже не получить
+    """
+    if is_owner_deletion(origin):
+        return
+    instance._sync_owner_id = get_owner_id(instance)
+
+
+def record_sync_delete(sender, instance, origin=None, **kwargs):
+    """Фиксирует удаление объекта (tombstone) в журнале синхронизации"""
+    if is_owner_deletion(origin):
+        return
+    record_change(
+        instance, deleted=True, owner_id=getattr(instance, "_sync_owner_id", None)
+    )
+
+
+for sync_model in SYNC_MODELS:
+    post_save.connect(
+        record_sync_save, sender=sync_model, dispatch_uid=f"sync_save_{sync_model}"
+    )
+    pre_delete.connect(
+        remember_sync_owner, sender=sync_model, dispatch_uid=f"sync_owner_{sync_model}"
+    )
+    post_delete.connect(
+        record_sync_delete, sender=sync_model, dispatch_uid=f"sync_delete_{sync_model}"
+    )
+
+
+@receiver(post_save, sender=UserPurchase, dispatch_uid="purchase_version_save")
+@receiver(post_delete, sender=UserPurchase, dispatch_uid="purchase_version_delete")
+def bump_purchases_version(sender, instance, raw=False, origin=None, **kwargs):
+    """Любое изменение покупок меняет версию доступов пользователя"""
+    if raw or is_owner_deletion(origin):
+        return
+    bump_user_version(instance.user_id, "purchases")
+
+
+# Отзыв JWT для чтения без запроса к таблице пользователей
+# (core/authentication.py). При удалении пользователя строка версий
+# удаляется каскадом
+
+
+@receiver(post_save, sender=User, dispatch_uid="auth_user_active")
+def revoke_inactive_user_tokens(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if raw or (update_fields is not None and "is_active" not in update_fields):
+        return
+    if not instance.is_active:
+        bump_user_version(instance.pk, "auth")
+
+
+# Версия рецепта (Recipe.updated_at) для кэша фрагментов: меняется и при
+# изменении данных, которые попадают в вывод рецепта
+
+
+@receiver(post_save, sender=RecipeIngredient, dispatch_uid="recipe_touch_ri_save")
+@receiver(post_delete, sender=RecipeIngredient, dispatch_uid="recipe_touch_ri_delete")
+def touch_recipe_ingredients(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, Recipe):
+        return
+    touch_recipes(Recipe.objects.filter(id=instance.recipe_id))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through, dispatch_uid="recipe_touch_tags")
+def touch_recipe_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            touch_recipes(Recipe.objects.filter(id=instance.pk))
+    elif action in ("post_add", "post_remove"):
+        touch_recipes(Recipe.objects.filter(id__in=pk_set))
+    elif action == "pre_clear":
+        touch_recipes(Recipe.objects.filter(tags=instance))
+
+
+@receiver(post_save, sender=Ingredient, dispatch_uid="recipe_touch_ingredient")
+def touch_ingredient_recipes(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    touch_recipes(Recipe.objects.filter(ingredients__ingredient=instance))
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="recipe_touch_tag_save")
+@receiver(pre_delete, sender=Tag, dispatch_uid="recipe_touch_tag_delete")
+def touch_tag_recipes(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    touch_recipes(Recipe.objects.filter(tags=instance))
+
+
+@receiver(post_save, sender=CookingMethod, dispatch_uid="recipe_touch_method_save")
+@receiver(pre_delete, sender=CookingMethod, dispatch_uid="recipe_touch_method_delete")
+def touch_cooking_method_recipes(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    touch_recipes(Recipe.objects.filter(cooking_method=instance))
+
+
+# Миниатюры для карточек недели создаются при записи, а не при чтении
+# (core/thumbnails.py)
+
+
+@receiver(post_save, sender=Recipe, dispatch_uid="recipe_thumbnail")
+def create_recipe_thumbnail(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    name = instance.image.name
+    transaction.on_commit(lambda: update_recipe_thumbnails(name))
+
+
+# Статический снимок каталога (core/catalog.py) устаревает при любом
+# изменении данных каталога
+CATALOG_MODELS = [
+    Recipe,
+    RecipeIngredient,
+    Ingredient,
+    IngredientCategory,
+    CookingMethod,
+    Tag,
+    PremiumMealPlan,
+    PremiumMealPlanRecipe,
+]
+
+
+def republish_catalog(sender, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(catalog_changed)
+
+
+for catalog_model in CATALOG_MODELS:
+    post_save.connect(
+        republish_catalog,
+        sender=catalog_model,
+        dispatch_uid=f"catalog_save_{catalog_model.__name__}",
+    )
+    post_delete.connect(
+        republish_catalog,
+        sender=catalog_model,
+        dispatch_uid=f"catalog_delete_{catalog_model.__name__}",
+    )
+for through in (Recipe.tags.through, PremiumMealPlan.tags.through):
+    m2m_changed.connect(
+        republish_catalog, sender=through, dispatch_uid=f"catalog_m2m_{through}"
+    )
+
+
+# Справочные данные в двухуровневом кэше (core/tiered_cache.py). Загрузка
+# фикстур (raw) тоже меняет справочники, поэтому здесь она не пропускается
+REFERENCE_DATA = {
+    IngredientCategory: ["ingredient_categories", "ingredients"],
+    CookingMethod: ["cooking_methods"],
+    Tag: ["tags", "popular_tags"],
+    Ingredient: ["ingredients"],
+    # Удаление рецепта меняет число рецептов у тегов
+    Recipe: ["popular_tags"],
+}
+
+
+def invalidate_reference_data(sender, **kwargs):
+    names = REFERENCE_DATA[sender]
+    transaction.on_commit(lambda: invalidate_reference(*names))
+
+
+for reference_model in REFERENCE_DATA:
+    post_save.connect(
+        invalidate_reference_data,
+        sender=reference_model,
+        dispatch_uid=f"reference_save_{reference_model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_reference_data,
+        sender=reference_model,
+        dispatch_uid=f"reference_delete_{reference_model.__name__}",
+    )
+
+
+# Версии общих данных (core/reference.py): таблицы реестра справочников и
+# данные, которые попадают в ETag ответов с личными данными (versions.py)
+REFERENCE_TABLES = {
+    **{model: table for table, model in TABLES.items()},
+    Recipe: "recipes",
+    Ingredient: "ingredients",
+    PremiumMealPlan: "premium_meal_plans",
+}
+
+
+def bump_reference_table(sender, **kwargs):
+    table = REFERENCE_TABLES[sender]
+    transaction.on_commit(lambda: bump_reference_version(table))
+
+
+for reference_model in REFERENCE_TABLES:
+    post_save.connect(
+        bump_reference_table,
+        sender=reference_model,
+        dispatch_uid=f"reference_version_save_{reference_model.__name__}",
+    )
+    post_delete.connect(
+        bump_reference_table,
+        sender=reference_model,
+        dispatch_uid=f"reference_version_delete_{reference_model.__name__}",
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through, dispatch_uid="reference_recipe_tags")
+def invalidate_popular_tags(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(lambda: invalidate_reference("popular_tags"))
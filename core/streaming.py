@@ -0,0 +1,108 @@
+"""
+Потоковые JSON-ответы для больших коллекций без пагинации.
+
+Строки читаются серверным курсором (.iterator(chunk_size=...)) пачками,
+каждая пачка сериализуется быстрыми сериализаторами (fast_serializers.py)
+и сразу уходит клиенту. Память на запрос не зависит от числа строк.
+
+Использование:
+    return streaming_json_response(
+        request,
+        {
+            "period_days": days,
+            "lists": StreamedRows(shopping_list_rows(qs), serialize_shopping_lists),
+        },
+    )
+
+Вывод совпадает с ORJSONRenderer побайтно. Если клиент запросил другой
+формат (MessagePack, browsable API), ответ собирается целиком и отдается
+обычным Response.
+"""
+
+from itertools import islice
+from django.http import StreamingHttpResponse
+from rest_framework.response import Response
+from .renderers import ORJSONRenderer
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Размер куска, который отдается серверу приложения за один раз
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class StreamedRows:
+    """
+    Ленивый JSON-массив: строки queryset (.values()) читаются серверным
+    курсором и сериализуются пачками по chunk_size функцией serialize
+    """
+
+    def __init__(self, queryset, serialize, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.queryset = queryset
+        self.serialize = serialize
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        rows = self.queryset.iterator(chunk_size=self.chunk_size)
+        while True:
+            batch = list(islice(rows, self.chunk_size))
+            if not batch:
+                return
+            yield from self.serialize(batch)
+
+
+def _iter_json(data, renderer):
+    if isinstance(data, StreamedRows):
+        yield b"["
+        first = True
+        for item in data:
+            if not first:
+                yield b","
+            first = False
+            yield renderer.render(item)
+        yield b"]"
+    elif isinstance(data, dict) and any(
+        isinstance(value, StreamedRows) for value in data.values()
+    ):
+        yield b"{"
+        for index, (key, value) in enumerate(data.items()):
+            if index:
+                yield b","
+            yield renderer.render(key)
+            yield b":"
+            yield from _iter_json(value, renderer)
+        yield b"}"
+    else:
+        yield renderer.render(data)
+
+
+def _buffered(chunks):
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _materialize(data):
+    if isinstance(data, StreamedRows):
+        return list(data)
+    if isinstance(data, dict):
+        return {key: _materialize(value) for key, value in data.items()}
+    return data
+
+
+def streaming_json_response(request, data):
+    """
+    data - StreamedRows или dict, значения которого могут быть StreamedRows
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is not None and not isinstance(renderer, ORJSONRenderer):
+        return Response(_materialize(data))
+
+    return StreamingHttpResponse(
+        _buffered(_iter_json(data, ORJSONRenderer())),
+        content_type="application/json",
+    )
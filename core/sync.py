@@ -0,0 +1,218 @@
+"""
+Дельта-синхронизация приватных данных пользователя:
+планов питания и списков покупок.
+
+Каждое изменение записывается в компактный журнал SyncChange
+(пользователь, модель, id объекта, признак удаления). Клиент хранит курсор -
+id последней полученной записи журнала - и запрашивает только то,
+что изменилось после него.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from .models import (
+    MealPlan,
+    RecipeMealPlan,
+    ShoppingList,
+    ShoppingListItem,
+    SyncChange,
+)
+from .versions import bump_user_version
+
+# Модель -> (ключ в журнале, путь до владельца в запросах)
+SYNC_MODELS = {
+    MealPlan: ("meal_plan", "user_id"),
+    RecipeMealPlan: ("recipe_meal_plan", "meal_plan__user_id"),
+    ShoppingList: ("shopping_list", "user_id"),
+    ShoppingListItem: ("shopping_list_item", "shopping_list__user_id"),
+}
+
+# Модель -> счетчик UserDataVersion: каждое изменение, попавшее в журнал,
+# в той же транзакции меняет версию данных для ETag (versions.py)
+VERSION_COUNTERS = {
+    MealPlan: "meal_plans",
+    RecipeMealPlan: "meal_plans",
+    ShoppingList: "shopping_lists",
+    ShoppingListItem: "shopping_lists",
+}
+
+SYNC_PAGE_SIZE = 500
+
+
+def get_owner_id(instance):
+    """Возвращает id владельца объекта (без запроса, если связь уже загружена)"""
+    if isinstance(instance, (MealPlan, ShoppingList)):
+        return instance.user_id
+    if isinstance(instance, RecipeMealPlan):
+        return instance.meal_plan.user_id
+    return instance.shopping_list.user_id
+
+
+def record_change(instance, deleted=False, owner_id=None):
+    """Записывает изменение одного объекта в журнал"""
+    model_key, _ = SYNC_MODELS[type(instance)]
+    user_id = owner_id or get_owner_id(instance)
+    SyncChange.objects.create(
+        user_id=user_id,
+        model=model_key,
+        object_id=instance.pk,
+        deleted=deleted,
+    )
+    bump_user_version(user_id, VERSION_COUNTERS[type(instance)])
+
+
+def record_changes(model, changes, deleted=False):
+    """
+    Записывает пачку изменений одним запросом.
+    changes - итерируемое пар (user_id, object_id)
+    """
+    model_key, _ = SYNC_MODELS[model]
+    entries = SyncChange.objects.bulk_create(
+        [
+            SyncChange(
+                user_id=user_id, model=model_key, object_id=object_id, deleted=deleted
+            )
+            for user_id, object_id in changes
+        ]
+    )
+    for user_id in {entry.user_id for entry in entries}:
+        bump_user_version(user_id, VERSION_COUNTERS[model])
+
+
+def record_queryset_changes(queryset, deleted=False):
+    """
+    Записывает изменения для всех объектов queryset.
+    Нужно вызывать рядом с queryset.update(), который не отправляет сигналы.
+    """
+    _, owner_path = SYNC_MODELS[queryset.model]
+    record_changes(
+        queryset.model,
+        [
+            (owner_id, object_id)
+            for object_id, owner_id in queryset.values_list("id", owner_path)
+        ],
+        deleted=deleted,
+    )
+
+
+def is_owner_deletion(origin):
+    """Удаление инициировано удалением самого пользователя - журнал не нужен"""
+    if isinstance(origin, QuerySet):
+        return origin.model is User
+    return isinstance(origin, User)
+
+
+def get_latest_cursor(user):
+    """Текущая позиция пользователя в журнале изменений"""
+    latest = (
+        SyncChange.objects.filter(user=user)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return latest or 0
+
+
+def _sync_querysets(user):
+    from .serializers import (
+        SyncMealPlanSerializer,
+        SyncRecipeMealPlanSerializer,
+        SyncShoppingListSerializer,
+        SyncShoppingListItemSerializer,
+    )
+
+    return {
+        "meal_plan": (
+            "meal_plans",
+            MealPlan.objects.filter(user=user),
+            SyncMealPlanSerializer,
+        ),
+        "recipe_meal_plan": (
+            "recipe_meal_plans",
+            RecipeMealPlan.objects.filter(meal_plan__user=user).select_related(
+                "recipe"
+            ),
+            SyncRecipeMealPlanSerializer,
+        ),
+        "shopping_list": (
+            "shopping_lists",
+            ShoppingList.objects.filter(user=user),
+            SyncShoppingListSerializer,
+        ),
+        "shopping_list_item": (
+            "shopping_list_items",
+            ShoppingListItem.objects.filter(shopping_list__user=user).select_related(
+                "ingredient", "category"
+            ),
+            SyncShoppingListItemSerializer,
+        ),
+    }
+
+
+def _empty_payload(cursor):
+    payload = {"cursor": cursor, "has_more": False, "reset": False, "deleted": {}}
+    for model_key, _ in SYNC_MODELS.values():
+        collection = f"{model_key}s"
+        payload[collection] = []
+        payload["deleted"][collection] = []
+    return payload
+
+
+def build_sync_payload(user, cursor=None, limit=SYNC_PAGE_SIZE):
+    """
+    Формирует ответ синхронизации.
+    Без курсора возвращает полный снимок данных пользователя (reset=True).
+    """
+    querysets = _sync_querysets(user)
+
+    if cursor is None:
+        # Курсор читаем ДО снимка: изменения, пришедшие во время чтения,
+        # будут отправлены повторно, но не потеряются
+        payload = _empty_payload(get_latest_cursor(user))
+        payload["reset"] = True
+        for collection, queryset, serializer_class in querysets.values():
+            payload[collection] = serializer_class(queryset, many=True).data
+        return payload
+
+    entries = list(
+        SyncChange.objects.filter(user=user, id__gt=cursor)
+        .order_by("id")
+        .values_list("id", "model", "object_id", "deleted")[: limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    payload = _empty_payload(entries[-1][0] if entries else cursor)
+    payload["has_more"] = has_more
+    if not entries:
+        return payload
+
+    # Оставляем только последнее состояние каждого объекта
+    latest_state = {}
+    for _, model_key, object_id, deleted in entries:
+        latest_state[(model_key, object_id)] = deleted
+
+    for model_key, (collection, queryset, serializer_class) in querysets.items():
+        changed_ids = [
+            object_id
+            for (key, object_id), deleted in latest_state.items()
+            if key == model_key and not deleted
+        ]
+        deleted_ids = [
+            object_id
+            for (key, object_id), deleted in latest_state.items()
+            if key == model_key and deleted
+        ]
+
+        if changed_ids:
+            objects = list(queryset.filter(id__in=changed_ids))
+            payload[collection] = serializer_class(objects, many=True).data
+            # Объект мог быть удален позже, чем попал в эту страницу журнала
+            found_ids = {obj.id for obj in objects}
+            deleted_ids += [
+                object_id for object_id in changed_ids if object_id not in found_ids
+            ]
+
+        payload["deleted"][collection] = deleted_ids
+
+    return payload
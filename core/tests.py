@@ -1,3 +1,1175 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+import msgpack
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from .authentication import MealtimeTokenObtainPairSerializer
+from .events import get_broker
+from .fast_serializers import (
+    ingredient_rows,
+    meal_plan_rows,
+    purchase_rows,
+    recipe_rows,
+    serialize_ingredients,
+    serialize_meal_plans,
+    serialize_purchases,
+    serialize_recipes,
+    serialize_shopping_lists,
+    shopping_list_rows,
+)
+from .models import (
+    CookingMethod,
+    Ingredient,
+    IngredientCategory,
+    MealPlan,
+    PremiumMealPlan,
+    PremiumMealPlanRecipe,
+    Recipe,
+    RecipeIngredient,
+    RecipeMealPlan,
+    ShoppingList,
+    ShoppingListItem,
+    SyncChange,
+    Tag,
+    UserPurchase,
+)
+from .middleware import full_stack_middleware
+from .renderers import MessagePackRenderer
+from .shopping_list_manager import update_shopping_list
+from .sync import build_sync_payload
+from .serializers import (
+    IngredientSerializer,
+    MealPlanSerializer,
+    RecipeSerializer,
+    ShoppingListSerializer,
+    UserPurchaseSerializer,
+)
+from .tiered_cache import (
+    LocalTier,
+    TieredCache,
+    invalidate_reference,
+    reference_cache,
+    reference_data,
+)
 
-# Create your tests here.
+
+class TokenRevocationTests(TestCase):
+    """Чтение с JWT без запроса к auth_user учитывает деактивацию и удаление"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("reader", password="password")
+        self.client = self.token_client()
+
+    def token_client(self):
+        token = MealtimeTokenObtainPairSerializer.get_token(self.user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def save_user(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        self.user.save()
+
+    def test_read_does_not_query_users(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/meal-plans/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("auth_user" in query["sql"] for query in queries))
+
+    def test_deactivated_user_is_rejected(self):
+        self.save_user(is_active=False)
+        response = self.client.get("/api/meal-plans/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["detail"].code, "user_inactive")
+
+        # После повторной активации старые токены остаются отозванными
+        self.save_user(is_active=True)
+        self.assertEqual(self.client.get("/api/meal-plans/").status_code, 401)
+        self.assertEqual(self.token_client().get("/api/meal-plans/").status_code, 200)
+
+    def test_revocation_survives_cache_clear(self):
+        self.save_user(is_active=False)
+        cache.clear()
+        self.assertEqual(self.client.get("/api/meal-plans/").status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+        response = self.client.get("/api/meal-plans/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["detail"].code, "user_not_found")
+
+    def test_batch_loads_user(self):
+        self.save_user(is_active=False)
+        response = self.client.post(
+            "/api/batch/",
+            {"requests": [{"method": "GET", "url": "/api/meal-plans/"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class FastSerializerGoldenTests(TestCase):
+    """
+    Быстрые сериализаторы списков (fast_serializers.py) дают те же байты,
+    что и ModelSerializers, в JSON и MessagePack
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        vegetables = IngredientCategory.objects.create(name="Овощи", order=1)
+        boiling = CookingMethod.objects.create(name="Варка")
+        quick = Tag.objects.create(name="Быстро")
+        soup = Tag.objects.create(name="Суп")
+        carrot = Ingredient.objects.create(
+            name="Морковь", category=vegetables, default_unit="g"
+        )
+        salt = Ingredient.objects.create(name="Соль", default_unit="pinch")
+
+        free = Recipe.objects.create(
+            name="Борщ",
+            description="Классический",
+            cooking_time=90,
+            difficulty="hard",
+            cooking_method=boiling,
+            instructions="Сварить",
+            image="recipes/borsch.jpg",
+        )
+        free.tags.add(quick, soup)
+        plain = Recipe.objects.create(name="Бутерброд", instructions="Собрать")
+        premium = Recipe.objects.create(
+            name="Уха",
+            cooking_time=40,
+            cooking_method=boiling,
+            instructions="Сварить",
+            is_premium=True,
+        )
+        premium.tags.add(soup)
+        locked = Recipe.objects.create(
+            name="Паштет", instructions="Смешать", is_premium=True, portions=4
+        )
+        for recipe in (free, premium, locked):
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=carrot, quantity=Decimal("150.5")
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=salt, quantity=Decimal("1")
+            )
+
+        menu = PremiumMealPlan.objects.create(
+            name="Рыбная неделя", description="Меню", price=Decimal("299")
+        )
+        PremiumMealPlanRecipe.objects.create(
+            premium_meal_plan=menu, recipe=premium, day_number=1, meal_type="lunch"
+        )
+        free_menu = PremiumMealPlan.objects.create(name="Пробное", description="Меню")
+
+        cls.buyer = User.objects.create_user("buyer")
+        UserPurchase.objects.create(
+            user=cls.buyer,
+            premium_meal_plan=menu,
+            price_paid=Decimal("299"),
+            status="paid",
+        )
+        UserPurchase.objects.create(user=cls.buyer, premium_meal_plan=free_menu)
+
+        today = date(2026, 3, 2)
+        for day, (meal_type, recipes) in enumerate(
+            [("breakfast", [plain]), ("lunch", [free, premium]), ("dinner", [])]
+        ):
+            meal_plan = MealPlan.objects.create(
+                user=cls.buyer, date=today + timedelta(days=day), meal_type=meal_type
+            )
+            for order, recipe in enumerate(recipes):
+                RecipeMealPlan.objects.create(
+                    meal_plan=meal_plan, recipe=recipe, portions=order + 1, order=order
+                )
+
+        shopping_list = ShoppingList.objects.create(
+            user=cls.buyer, period_start=today, period_end=today + timedelta(days=6)
+        )
+        ShoppingListItem.objects.create(
+            shopping_list=shopping_list,
+            ingredient=carrot,
+            quantity=Decimal("301"),
+            unit="g",
+            category=vegetables,
+        )
+        ShoppingListItem.objects.create(
+            shopping_list=shopping_list,
+            ingredient=salt,
+            quantity=Decimal("2"),
+            unit="pinch",
+            checked=True,
+            custom_name="Соль крупная",
+            order=1,
+        )
+        ShoppingList.objects.create(
+            user=cls.buyer,
+            name="Пустой",
+            period_start=today,
+            period_end=today,
+            status="archived",
+        )
+
+    def assertSameOutput(self, expected, actual):
+        self.assertTrue(expected)
+        for renderer in (JSONRenderer(), MessagePackRenderer()):
+            with self.subTest(renderer=renderer.format):
+                self.assertEqual(renderer.render(expected), renderer.render(actual))
+
+    def recipe_request(self, user):
+        request = APIRequestFactory().get("/api/recipes/")
+        request.user = user
+        return request
+
+    def test_ingredients(self):
+        self.assertSameOutput(
+            IngredientSerializer(
+                Ingredient.objects.select_related("category"), many=True
+            ).data,
+            serialize_ingredients(ingredient_rows(Ingredient.objects.all())),
+        )
+
+    def test_recipes(self):
+        recipes = Recipe.objects.order_by("name")
+        for user in (AnonymousUser(), self.buyer):
+            request = self.recipe_request(user)
+            with self.subTest(user=str(user)):
+                self.assertSameOutput(
+                    RecipeSerializer(
+                        recipes.prefetch_related("ingredients__ingredient", "tags"),
+                        many=True,
+                        context={"request": request},
+                    ).data,
+                    serialize_recipes(recipe_rows(recipes), request),
+                )
+
+    def test_meal_plans(self):
+        meal_plans = MealPlan.objects.filter(user=self.buyer)
+        self.assertSameOutput(
+            MealPlanSerializer(
+                meal_plans.prefetch_related("recipes__recipe"), many=True
+            ).data,
+            serialize_meal_plans(meal_plan_rows(meal_plans)),
+        )
+
+    def test_shopping_lists(self):
+        shopping_lists = ShoppingList.objects.filter(user=self.buyer)
+        self.assertSameOutput(
+            ShoppingListSerializer(
+                shopping_lists.prefetch_related("items__ingredient"), many=True
+            ).data,
+            serialize_shopping_lists(shopping_list_rows(shopping_lists)),
+        )
+
+    def test_msgpack_matches_json(self):
+        shopping_lists = ShoppingList.objects.filter(user=self.buyer)
+        for data in [
+            serialize_shopping_lists(shopping_list_rows(shopping_lists)),
+            {"id": shopping_lists[0].id, "quantity": Decimal("1.5")},
+        ]:
+            self.assertEqual(
+                msgpack.unpackb(MessagePackRenderer().render(data)),
+                json.loads(JSONRenderer().render(data)),
+            )
+
+    def test_purchases(self):
+        purchases = UserPurchase.objects.filter(user=self.buyer)
+        self.assertSameOutput(
+            UserPurchaseSerializer(
+                purchases.select_related("premium_meal_plan"), many=True
+            ).data,
+            serialize_purchases(purchase_rows(purchases)),
+        )
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TieredCacheTests(SimpleTestCase):
+    """Инвалидация L1 через брокер событий (LocalBroker вместо Redis)"""
+
+    def setUp(self):
+        self.local = reference_cache()
+        self.local.clear()
+        # Кэш другого процесса: свой L1 и своя подписка на тот же канал
+        self.remote = TieredCache("", settings.CACHES["reference"])
+        self.remote._tier = LocalTier(self.remote.channel)
+        self.key = self.remote.make_key("reference:tags")
+        self.local.tier.ensure_listener()
+        self.remote.tier.ensure_listener()
+
+    def test_invalidation_drops_other_process_l1(self):
+        reference_data("tags", lambda: ["Быстро"])
+        self.assertEqual(self.remote.get("reference:tags"), ["Быстро"])
+        self.assertIsNotNone(self.remote.tier.get(self.key))
+
+        invalidate_reference("tags")
+        self.assertTrue(wait_for(lambda: self.remote.tier.get(self.key) is None))
+        self.assertIsNone(self.remote.get("reference:tags"))
+
+    def test_read_racing_invalidation_is_not_cached(self):
+        self.local.set("reference:tags", ["Старое"])
+        self.remote._namespace()
+        l2_get = self.remote.l2.get
+
+        def racing_get(*args, **kwargs):
+            value = l2_get(*args, **kwargs)
+            # Пока значение читается из L2, другой процесс его меняет
+            generation = self.remote.tier.generation
+            self.local.set("reference:tags", ["Новое"])
+            self.assertTrue(wait_for(lambda: self.remote.tier.generation != generation))
+            return value
+
+        with mock.patch.object(self.remote.l2, "get", racing_get):
+            self.assertEqual(self.remote.get("reference:tags"), ["Старое"])
+        self.assertIsNone(self.remote.tier.get(self.key))
+        self.assertEqual(self.remote.get("reference:tags"), ["Новое"])
+
+    def test_clear_keeps_other_l2_data(self):
+        cache.set("throttle:bucket", 1)
+        self.addCleanup(cache.delete, "throttle:bucket")
+        self.local.add("reference:tags", ["Быстро"])
+        self.assertEqual(self.remote.get("reference:tags"), ["Быстро"])
+        self.assertIsNotNone(self.remote.tier.get(self.key))
+        self.local.clear()
+        self.assertEqual(cache.get("throttle:bucket"), 1)
+        self.assertIsNone(self.local.get("reference:tags"))
+        self.assertTrue(wait_for(lambda: self.remote.tier.get(self.key) is None))
+        self.assertIsNone(self.remote.get("reference:tags"))
+
+    def test_l2_keys_use_own_prefix(self):
+        self.local.set("reference:tags", ["Быстро"])
+        self.assertIsNone(cache.get("reference:tags"))
+        l2_key = self.local._l2_key(self.local.make_key("reference:tags"))
+        self.assertTrue(l2_key.startswith("reference:"))
+        self.assertEqual(cache.get(l2_key), ["Быстро"])
+
+    def test_threads_share_process_l1(self):
+        channels = get_broker()._channels
+        subscribers = len(channels[self.local.channel])
+        tiers = set()
+
+        def read():
+            reference_data("tags", lambda: ["Быстро"])
+            tiers.add(id(reference_cache().tier))
+
+        for _ in range(20):
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join()
+        self.assertEqual(tiers, {id(self.local.tier)})
+        self.assertEqual(len(channels[self.local.channel]), subscribers)
+
+
+ROBOKASSA_PASSWORD2 = "robokassa-test-password-2"
+
+
+@override_settings(
+    ROBOKASSA_TEST_MODE=True, ROBOKASSA_TEST_PASSWORD2=ROBOKASSA_PASSWORD2
+)
+class MiddlewareStackTests(TestCase):
+    """
+    Сокращенная цепочка middleware для /api/ (core/middleware.py) не меняет
+    поведение админки и колбэков Robokassa
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="password")
+        cls.buyer = User.objects.create_user("buyer")
+        cls.menu = PremiumMealPlan.objects.create(
+            name="Рыбная неделя", description="Меню", price=Decimal("299")
+        )
+
+    def stacks(self):
+        return [
+            ("full", full_stack_middleware()),
+            ("lean", settings.MIDDLEWARE),
+        ]
+
+    def admin_flow(self):
+        client = APIClient(enforce_csrf_checks=True)
+        results = []
+
+        response = client.get("/admin/login/")
+        results.append(
+            (
+                response.status_code,
+                sorted(response.cookies),
+                response["X-Frame-Options"],
+            )
+        )
+
+        credentials = {"username": "admin", "password": "password"}
+        response = client.post("/admin/login/", credentials)
+        results.append((response.status_code,))
+
+        credentials["csrfmiddlewaretoken"] = client.cookies["csrftoken"].value
+        response = client.post("/admin/login/?next=/admin/", credentials)
+        results.append(
+            (response.status_code, sorted(response.cookies), response["Location"])
+        )
+
+        for path in ["/admin/", "/admin/core/recipe/"]:
+            response = client.get(path)
+            results.append((response.status_code, response["X-Frame-Options"]))
+        return results
+
+    def test_admin_keeps_full_stack(self):
+        results = {}
+        for name, middleware in self.stacks():
+            with override_settings(MIDDLEWARE=middleware):
+                results[name] = self.admin_flow()
+        self.assertEqual(results["lean"], results["full"])
+        self.assertEqual(
+            results["lean"][:3],
+            [
+                (200, ["csrftoken"], "DENY"),
+                (403,),
+                (302, ["csrftoken", "sessionid"], "/admin/"),
+            ],
+        )
+
+    def signed_result(self, purchase, out_sum):
+        shp = {"Shp_user": str(purchase.user_id)}
+        base = f"{out_sum}:{purchase.order_number}:{ROBOKASSA_PASSWORD2}"
+        base += "".join(f":{key}={value}" for key, value in sorted(shp.items()))
+        return {
+            "OutSum": out_sum,
+            "InvId": str(purchase.order_number),
+            "SignatureValue": hashlib.md5(base.encode()).hexdigest().upper(),
+            **shp,
+        }
+
+    def payment_callbacks(self):
+        client = APIClient(enforce_csrf_checks=True)
+        paid = UserPurchase.objects.create(
+            user=self.buyer, premium_meal_plan=self.menu, price_paid=Decimal("299")
+        )
+        cancelled = UserPurchase.objects.create(
+            user=self.buyer, premium_meal_plan=self.menu, price_paid=Decimal("299")
+        )
+        results = []
+
+        response = client.post(
+            "/api/payments/result/", self.signed_result(paid, "299.00")
+        )
+        # Номера заказов в двух прогонах разные
+        results.append(
+            (
+                response.status_code,
+                response.content == f"OK{paid.order_number}".encode(),
+            )
+        )
+        paid.refresh_from_db()
+        results.append(paid.status)
+
+        response = client.post("/api/payments/success/", {"InvId": paid.order_number})
+        results.append((response.status_code, response.json()["success"]))
+
+        response = client.post(
+            "/api/payments/result/",
+            {**self.signed_result(paid, "299.00"), "SignatureValue": "BAD"},
+        )
+        results.append((response.status_code, response.content))
+
+        response = client.post("/api/payments/fail/", {"InvId": cancelled.order_number})
+        cancelled.refresh_from_db()
+        results.append((response.status_code, cancelled.status))
+
+        response = client.get("/api/payments/success/")
+        results.append((response.status_code, response.json()))
+        return results
+
+    def test_payment_callbacks_behave_the_same(self):
+        results = {}
+        for name, middleware in self.stacks():
+            with override_settings(MIDDLEWARE=middleware):
+                results[name] = self.payment_callbacks()
+        self.assertEqual(results["lean"], results["full"])
+        self.assertEqual(results["lean"][:3], [(200, True), "paid", (200, True)])
+
+    def test_api_skips_session_middleware(self):
+        for name, middleware in self.stacks():
+            with self.subTest(stack=name), override_settings(MIDDLEWARE=middleware):
+                response = APIClient().get("/api/payments/success/")
+                self.assertEqual(response.has_header("X-Frame-Options"), name == "full")
+                self.assertFalse(response.cookies)
+
+
+class ShoppingListBatchCheckTests(TestCase):
+    """Офлайн-отметки (batch_check): last-writer-wins, идемпотентность, откат"""
+
+    url = "/api/shopping-list-items/batch_check/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("shopper")
+        cls.shopping_list = ShoppingList.objects.create(
+            user=cls.user, period_start=date(2026, 3, 2), period_end=date(2026, 3, 8)
+        )
+        cls.items = [
+            ShoppingListItem.objects.create(
+                shopping_list=cls.shopping_list,
+                ingredient=Ingredient.objects.create(name=name, default_unit="g"),
+                quantity=Decimal("100"),
+                unit="g",
+            )
+            for name in ["Морковь", "Лук"]
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def check(self, *operations):
+        return self.client.post(
+            self.url,
+            {
+                "operations": [
+                    {
+                        "item_id": str(item.id),
+                        "checked": checked,
+                        "client_timestamp": at,
+                    }
+                    for item, checked, at in operations
+                ]
+            },
+            format="json",
+        )
+
+    def test_later_timestamp_wins(self):
+        carrot, onion = self.items
+        response = self.check(
+            (carrot, True, "2026-03-03T10:00:00Z"),
+            (carrot, False, "2026-03-03T09:00:00Z"),
+            (onion, True, "2026-03-03T10:00:00Z"),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(response.data["applied"]), sorted([carrot.id, onion.id])
+        )
+        self.assertEqual(response.data["shopping_lists"][0]["items_checked"], 2)
+
+        # Операция старше серверного состояния не применяется
+        response = self.check((carrot, False, "2026-03-03T09:30:00Z"))
+        self.assertEqual(response.data["applied"], [])
+        carrot.refresh_from_db()
+        self.assertTrue(carrot.checked)
+
+        self.shopping_list.refresh_from_db()
+        self.assertEqual(
+            (self.shopping_list.total_items, self.shopping_list.items_checked), (2, 2)
+        )
+
+    def test_replay_is_noop(self):
+        carrot, _ = self.items
+        self.check((carrot, True, "2026-03-03T10:00:00Z"))
+        response = self.client.get("/api/shopping-lists/")
+        etag = response["ETag"]
+        changes = SyncChange.objects.count()
+        updated_at = ShoppingList.objects.get().updated_at
+
+        response = self.check((carrot, True, "2026-03-03T10:00:00Z"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["applied"], [])
+        self.assertEqual(SyncChange.objects.count(), changes)
+        self.assertEqual(ShoppingList.objects.get().updated_at, updated_at)
+        response = self.client.get("/api/shopping-lists/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_failure_rolls_back(self):
+        carrot, _ = self.items
+        changes = SyncChange.objects.count()
+        with mock.patch("core.api.record_changes", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.check((carrot, True, "2026-03-03T10:00:00Z"))
+        carrot.refresh_from_db()
+        self.assertFalse(carrot.checked)
+        self.assertEqual(SyncChange.objects.count(), changes)
+
+
+class ShoppingListUpdateTests(TestCase):
+    """Пересборка списка (update_shopping_list) пишет журнал пачками"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("shopper")
+        cls.ingredients = [
+            Ingredient.objects.create(name=f"Ингредиент {number}", default_unit="g")
+            for number in range(51)
+        ]
+
+    def test_removed_items_get_tombstones(self):
+        shopping_list = ShoppingList.objects.create(
+            user=self.user, period_start=date(2026, 3, 2), period_end=date(2026, 3, 8)
+        )
+        removed_ids = {
+            ShoppingListItem.objects.create(
+                shopping_list=shopping_list,
+                ingredient=ingredient,
+                quantity=Decimal("1"),
+                unit="g",
+            ).id
+            for ingredient in self.ingredients
+        }
+        cursor = SyncChange.objects.latest("id").id
+        aggregated = [
+            {
+                "ingredient": self.ingredients[0],
+                "quantity": Decimal("2"),
+                "unit": "g",
+                "category": None,
+            }
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            update_shopping_list(shopping_list, aggregated, [])
+        self.assertLess(len(queries), 20)
+
+        (added,) = shopping_list.items.all()
+        changes = SyncChange.objects.filter(id__gt=cursor, model="shopping_list_item")
+        self.assertEqual(
+            set(changes.filter(deleted=True).values_list("object_id", flat=True)),
+            removed_ids,
+        )
+        self.assertEqual(
+            list(changes.filter(deleted=False).values_list("object_id", flat=True)),
+            [added.id],
+        )
+
+
+class CompressionTests(TestCase):
+    """Сжимаются ответы API, но не HTML админки (BREACH)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="password")
+        Tag.objects.bulk_create(Tag(name=f"Тег {number}") for number in range(100))
+
+    def test_api_is_compressed(self):
+        response = APIClient().get("/api/tags/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response["Content-Encoding"], ["gzip", "br"])
+
+    def test_admin_html_is_not_compressed(self):
+        client = APIClient()
+        client.force_login(self.admin)
+        for path in ["/admin/login/", "/admin/core/tag/"]:
+            response = client.get(path, HTTP_ACCEPT_ENCODING="gzip, br", follow=True)
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(len(response.content), 1024)
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class RecipeThumbnailTests(TestCase):
+    """Карточки недели ссылаются на миниатюру, только если она создана"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.user = User.objects.create_user("planner")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(name="Борщ", instructions="Сварить")
+        meal_plan = MealPlan.objects.create(
+            user=self.user, date=date(2026, 3, 2), meal_type="lunch"
+        )
+        RecipeMealPlan.objects.create(meal_plan=meal_plan, recipe=self.recipe)
+
+    def save_image(self, image):
+        self.recipe.image = image
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.save()
+        self.recipe.refresh_from_db()
+
+    def card(self):
+        response = self.client.get("/api/meal-plans/week/?date=2026-03-02")
+        self.assertEqual(response.status_code, 200)
+        return response.data["days"][0]["meals"]["lunch"]["recipes"][0]
+
+    def test_thumbnail_is_used_once_created(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), "red").save(buffer, "PNG")
+        self.save_image(SimpleUploadedFile("borsch.png", buffer.getvalue()))
+        self.assertTrue(self.recipe.thumbnail.startswith("thumbnails/"))
+
+        card = self.card()
+        self.assertTrue(card["thumbnail"].endswith(self.recipe.thumbnail))
+        self.assertNotEqual(card["thumbnail"], card["image"])
+
+    def test_missing_thumbnail_falls_back_to_image(self):
+        # Оригинала нет в хранилище - миниатюру создать не удалось
+        self.save_image("recipes/missing.jpg")
+        self.assertEqual(self.recipe.thumbnail, "")
+        card = self.card()
+        self.assertTrue(card["image"].endswith("recipes/missing.jpg"))
+        self.assertEqual(card["thumbnail"], card["image"])
+
+
+class SyncJournalTests(TestCase):
+    """Дельта-синхронизация (/api/sync/): снимок, изменения и tombstones"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("planner")
+        self.other = User.objects.create_user("neighbour")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.meal_plan = MealPlan.objects.create(
+            user=self.user, date=date(2026, 3, 2), meal_type="lunch"
+        )
+
+    def sync(self, cursor=None):
+        params = {} if cursor is None else {"cursor": cursor}
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_snapshot_then_delta(self):
+        snapshot = self.sync()
+        self.assertTrue(snapshot["reset"])
+        self.assertEqual(
+            [meal_plan["id"] for meal_plan in snapshot["meal_plans"]],
+            [str(self.meal_plan.id)],
+        )
+
+        self.meal_plan.meal_type = "dinner"
+        self.meal_plan.save()
+        shopping_list = ShoppingList.objects.create(
+            user=self.user, period_start=date(2026, 3, 2), period_end=date(2026, 3, 8)
+        )
+        shopping_list_id = shopping_list.id
+        shopping_list.delete()
+        MealPlan.objects.create(
+            user=self.other, date=date(2026, 3, 2), meal_type="lunch"
+        )
+
+        delta = self.sync(snapshot["cursor"])
+        self.assertFalse(delta["reset"])
+        self.assertEqual(
+            [meal_plan["id"] for meal_plan in delta["meal_plans"]],
+            [str(self.meal_plan.id)],
+        )
+        self.assertEqual(delta["shopping_lists"], [])
+        self.assertEqual(delta["deleted"]["shopping_lists"], [str(shopping_list_id)])
+
+        latest = self.sync(delta["cursor"])
+        self.assertEqual(latest["cursor"], delta["cursor"])
+        self.assertEqual(latest["meal_plans"], [])
+        self.assertEqual(latest["deleted"]["shopping_lists"], [])
+
+    def test_pages_follow_journal_order(self):
+        cursor = self.sync()["cursor"]
+        for meal_type in ["breakfast", "dinner"]:
+            MealPlan.objects.create(
+                user=self.user, date=date(2026, 3, 2), meal_type=meal_type
+            )
+        first = build_sync_payload(self.user, cursor, limit=1)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["meal_plans"]), 1)
+        second = build_sync_payload(self.user, first["cursor"], limit=1)
+        self.assertFalse(second["has_more"])
+        self.assertNotEqual(second["meal_plans"], first["meal_plans"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/sync/", {"cursor": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalUserDataTests(TestCase):
+    """ETag/304 по счетчикам пользователя и версиям общих данных"""
+
+    week_url = "/api/meal-plans/week/?date=2026-03-02"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("planner")
+        self.other = User.objects.create_user("neighbour")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(name="Борщ", instructions="Сварить")
+        self.carrot = Ingredient.objects.create(name="Морковь", default_unit="g")
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag.removeprefix("W/"))
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_own_write_changes_etag(self):
+        etag = self.etag(self.week_url)
+        self.assertNotModified(self.week_url, etag)
+        # Слабый ETag после сжатия тоже подходит
+        self.assertNotModified(self.week_url, f"W/{etag}")
+
+        meal_plan = MealPlan.objects.create(
+            user=self.user, date=date(2026, 3, 2), meal_type="lunch"
+        )
+        RecipeMealPlan.objects.create(meal_plan=meal_plan, recipe=self.recipe)
+        self.assertModified(self.week_url, etag)
+        response = self.client.get(self.week_url)
+        self.assertEqual(
+            response.data["days"][0]["meals"]["lunch"]["recipes"][0]["name"], "Борщ"
+        )
+
+    def test_unrelated_writes_keep_etag(self):
+        etag = self.etag(self.week_url)
+        lists_etag = self.etag("/api/shopping-lists/")
+
+        # Списки покупок - другой счетчик, планы соседа - другой пользователь
+        ShoppingList.objects.create(
+            user=self.user, period_start=date(2026, 3, 2), period_end=date(2026, 3, 8)
+        )
+        MealPlan.objects.create(
+            user=self.other, date=date(2026, 3, 2), meal_type="lunch"
+        )
+        self.assertNotModified(self.week_url, etag)
+        self.assertModified("/api/shopping-lists/", lists_etag)
+
+    def test_shared_versions_change_etag(self):
+        week_etag = self.etag(self.week_url)
+        lists_etag = self.etag("/api/shopping-lists/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.name = "Борщ украинский"
+            self.recipe.save()
+        self.assertModified(self.week_url, week_etag)
+        self.assertNotModified("/api/shopping-lists/", lists_etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.carrot.name = "Морковь молодая"
+            self.carrot.save()
+        self.assertModified("/api/shopping-lists/", lists_etag)
+
+
+class MealPlanBulkTests(TestCase):
+    """Пакетное редактирование планов (/api/meal-plans/bulk/)"""
+
+    url = "/api/meal-plans/bulk/"
+    day = date(2026, 3, 2)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.other = User.objects.create_user("neighbour")
+        cls.soup, cls.salad, cls.cake = [
+            Recipe.objects.create(name=name, instructions="Приготовить")
+            for name in ["Суп", "Салат", "Торт"]
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.lunch = MealPlan.objects.create(
+            user=self.user, date=self.day, meal_type="lunch"
+        )
+        self.soup_entry, self.salad_entry = [
+            RecipeMealPlan.objects.create(
+                meal_plan=self.lunch, recipe=recipe, order=order
+            )
+            for order, recipe in enumerate([self.soup, self.salad])
+        ]
+
+    def bulk(self, *operations):
+        return self.client.post(self.url, {"operations": operations}, format="json")
+
+    def slot_recipes(self, meal_type):
+        return list(
+            RecipeMealPlan.objects.filter(
+                meal_plan__user=self.user,
+                meal_plan__date=self.day,
+                meal_plan__meal_type=meal_type,
+            )
+            .order_by("order")
+            .values_list("recipe__name", "portions")
+        )
+
+    def test_operations_apply_in_order(self):
+        day = self.day.isoformat()
+        cursor = SyncChange.objects.latest("id").id
+        response = self.bulk(
+            {
+                "op": "add",
+                "date": day,
+                "meal_type": "lunch",
+                "recipe_id": str(self.cake.id),
+                "order": 0,
+            },
+            {
+                "op": "move",
+                "recipe_meal_plan_id": str(self.soup_entry.id),
+                "date": day,
+                "meal_type": "dinner",
+            },
+            {
+                "op": "portions",
+                "recipe_meal_plan_id": str(self.salad_entry.id),
+                "portions": 4,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(meal_plan["meal_type"] for meal_plan in response.json()),
+            ["dinner", "lunch"],
+        )
+        self.assertEqual(self.slot_recipes("lunch"), [("Торт", 2), ("Салат", 4)])
+        self.assertEqual(self.slot_recipes("dinner"), [("Суп", 2)])
+        # Новый слот, новый рецепт и два измененных попадают в журнал
+        self.assertEqual(
+            sorted(
+                SyncChange.objects.filter(id__gt=cursor).values_list("model", flat=True)
+            ),
+            ["meal_plan"] + ["recipe_meal_plan"] * 3,
+        )
+
+    def test_failed_operation_rolls_back(self):
+        changes = SyncChange.objects.count()
+        response = self.bulk(
+            {
+                "op": "add",
+                "date": "2026-03-03",
+                "meal_type": "lunch",
+                "recipe_id": str(self.cake.id),
+            },
+            {"op": "remove", "recipe_meal_plan_id": str(self.soup_entry.id)},
+            {
+                "op": "portions",
+                "recipe_meal_plan_id": str(self.soup_entry.id),
+                "portions": 3,
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["operation"], 2)
+        self.assertFalse(MealPlan.objects.filter(date=date(2026, 3, 3)).exists())
+        self.assertEqual(self.slot_recipes("lunch"), [("Суп", 2), ("Салат", 2)])
+        self.assertEqual(SyncChange.objects.count(), changes)
+
+    def test_other_users_entries_are_not_found(self):
+        other_lunch = MealPlan.objects.create(
+            user=self.other, date=self.day, meal_type="lunch"
+        )
+        entry = RecipeMealPlan.objects.create(meal_plan=other_lunch, recipe=self.soup)
+        response = self.bulk(
+            {"op": "portions", "recipe_meal_plan_id": str(entry.id), "portions": 5}
+        )
+        self.assertEqual(response.status_code, 400)
+        entry.refresh_from_db()
+        self.assertEqual(entry.portions, 2)
+
+
+class MealPlanCopyTests(TestCase):
+    """Копирование периода планов (/api/meal-plans/copy/)"""
+
+    url = "/api/meal-plans/copy/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.soup, cls.salad = [
+            Recipe.objects.create(name=name, instructions="Приготовить")
+            for name in ["Суп", "Салат"]
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Неделя 2-8 марта: обед в понедельник и среду
+        for day, recipe in [(2, self.soup), (4, self.salad)]:
+            meal_plan = MealPlan.objects.create(
+                user=self.user, date=date(2026, 3, day), meal_type="lunch"
+            )
+            RecipeMealPlan.objects.create(meal_plan=meal_plan, recipe=recipe)
+
+    def copy(self, **data):
+        return self.client.post(
+            self.url,
+            {"source_start": "2026-03-02", "source_end": "2026-03-08", **data},
+            format="json",
+        )
+
+    def lunches(self):
+        return list(
+            RecipeMealPlan.objects.filter(meal_plan__user=self.user)
+            .order_by("meal_plan__date", "order")
+            .values_list("meal_plan__date", "recipe__name")
+        )
+
+    def test_repeat(self):
+        response = self.copy(repeat=2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["target_starts"], ["2026-03-09", "2026-03-16"])
+        self.assertEqual(response.data["created_recipes"], 4)
+        self.assertEqual([day.day for day, _ in self.lunches()], [2, 4, 9, 11, 16, 18])
+
+    def test_overlapping_targets_are_rejected(self):
+        for data in [
+            {"target_starts": ["2026-03-05"]},
+            {"target_starts": ["2026-03-09", "2026-03-12"]},
+            {"target_starts": ["2026-02-25"]},
+            {"repeat": 1, "target_starts": ["2026-03-09"]},
+        ]:
+            with self.subTest(data=data):
+                response = self.copy(**data)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.lunches()), 2)
+
+    def test_conflicts(self):
+        target = MealPlan.objects.create(
+            user=self.user, date=date(2026, 3, 9), meal_type="lunch"
+        )
+        RecipeMealPlan.objects.create(meal_plan=target, recipe=self.salad)
+
+        response = self.copy(target_starts=["2026-03-09"])
+        self.assertEqual(response.data["skipped_meal_plans"], 1)
+        self.assertEqual(
+            [name for day, name in self.lunches() if day.day == 9], ["Салат"]
+        )
+
+        response = self.copy(target_starts=["2026-03-09"], on_conflict="merge")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [name for day, name in self.lunches() if day.day == 9], ["Салат", "Суп"]
+        )
+
+
+class MealPlanTemplateTests(TestCase):
+    """Шаблоны планов питания: создание из периода и раскладка на даты"""
+
+    url = "/api/meal-plan-templates/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.other = User.objects.create_user("neighbour")
+        cls.soup, cls.salad = [
+            Recipe.objects.create(name=name, instructions="Приготовить")
+            for name in ["Суп", "Салат"]
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day, meal_type, recipe in [
+            (2, "lunch", self.soup),
+            (3, "dinner", self.salad),
+        ]:
+            meal_plan = MealPlan.objects.create(
+                user=self.user, date=date(2026, 3, day), meal_type=meal_type
+            )
+            RecipeMealPlan.objects.create(
+                meal_plan=meal_plan, recipe=recipe, portions=day
+            )
+
+    def create_template(self):
+        response = self.client.post(
+            self.url,
+            {
+                "name": "Рабочая неделя",
+                "start_date": "2026-03-02",
+                "end_date": "2026-03-08",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def apply(self, template_id, start_date):
+        return self.client.post(
+            f"{self.url}{template_id}/apply/", {"start_date": start_date}, format="json"
+        )
+
+    def entries(self, start, end):
+        return list(
+            RecipeMealPlan.objects.filter(
+                meal_plan__user=self.user,
+                meal_plan__date__gte=start,
+                meal_plan__date__lte=end,
+            )
+            .order_by("meal_plan__date")
+            .values_list(
+                "meal_plan__date", "meal_plan__meal_type", "recipe__name", "portions"
+            )
+        )
+
+    def test_create_and_apply(self):
+        template = self.create_template()
+        self.assertEqual(template["duration_days"], 7)
+        self.assertEqual(
+            sorted(
+                (recipe["day_number"], recipe["meal_type"], recipe["recipe_name"])
+                for recipe in template["recipes"]
+            ),
+            [(1, "lunch", "Суп"), (2, "dinner", "Салат")],
+        )
+
+        response = self.apply(template["id"], "2026-03-16")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created_recipes_count"], 2)
+        self.assertEqual(len(response.data["meal_plans"]), 2)
+        self.assertEqual(
+            self.entries(date(2026, 3, 16), date(2026, 3, 22)),
+            [
+                (date(2026, 3, 16), "lunch", "Суп", 2),
+                (date(2026, 3, 17), "dinner", "Салат", 3),
+            ],
+        )
+
+        # Повторное применение не дублирует рецепты
+        response = self.apply(template["id"], "2026-03-16")
+        self.assertEqual(response.data["created_recipes_count"], 0)
+        self.assertEqual(len(self.entries(date(2026, 3, 16), date(2026, 3, 22))), 2)
+
+    def test_other_users_template_is_not_found(self):
+        template = self.create_template()
+        client = APIClient()
+        client.force_authenticate(self.other)
+        response = client.post(
+            f"{self.url}{template['id']}/apply/",
+            {"start_date": "2026-03-16"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(MealPlan.objects.filter(user=self.other).exists())
+
+    def test_invalid_period(self):
+        response = self.client.post(
+            self.url,
+            {"name": "Пусто", "start_date": "2026-03-08", "end_date": "2026-03-02"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.apply(self.create_template()["id"], "not-a-date")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,271 @@
+"""
+Защита тяжелых эндпоинтов от циклов в клиенте и штормов повторов.
+
+- Token bucket на пользователя и на IP: у каждого scope своя скорость
+  пополнения и емкость (settings.MEALTIME_THROTTLING["RATES"]).
+- Ограничение числа одновременных тяжелых запросов пользователя
+  (settings.MEALTIME_THROTTLING["CONCURRENCY"]).
+
+При превышении DRF возвращает 429 с заголовком Retry-After.
+
+Использование:
+    @action(detail=False, methods=["post"],
+            throttle_classes=bucket_throttles("shopping_lists.generate"))
+    @limit_concurrency("shopping_lists.generate")
+    def generate(self, request): ...
+"""
+
+import functools
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600}
+
+# Если слот не освободился (воркер упал), он истечет сам
+CONCURRENCY_SLOT_TTL = 300
+
+
+def parse_rate(rate):
+    """'10/min' -> (емкость 10, пополнение 10/60 токена в секунду)"""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class MemoryBucketBackend:
+    """Состояние в памяти процесса: лимиты считаются отдельно на каждый воркер"""
+
+    MAX_KEYS = 10000
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._slots = {}
+
+    def take(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, wait = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, wait = False, (1 - tokens) / refill_rate
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now, capacity, refill_rate)
+        return allowed, wait
+
+    def _prune(self, now, capacity, refill_rate):
+        # Полностью пополненные корзины не отличаются от отсутствующих
+        full_after = capacity / refill_rate
+        self._buckets = {
+            key: state
+            for key, state in self._buckets.items()
+            if now - state[1] < full_after
+        }
+
+    def acquire_slot(self, key, limit):
+        with self._lock:
+            if self._slots.get(key, 0) >= limit:
+                return False
+            self._slots[key] = self._slots.get(key, 0) + 1
+            return True
+
+    def release_slot(self, key):
+        with self._lock:
+            remaining = self._slots.get(key, 0) - 1
+            if remaining > 0:
+                self._slots[key] = remaining
+            else:
+                self._slots.pop(key, None)
+
+
+class CacheBucketBackend:
+    """
+    Состояние в общем кэше Django (Redis/Memcached) - лимиты общие для всех
+    воркеров. Корзины обновляются без блокировок, поэтому при гонке
+    возможен небольшой перерасход; счетчик слотов атомарен (incr/decr).
+    """
+
+    def __init__(self, cache="default", **options):
+        self.cache = caches[cache]
+
+    def take(self, key, capacity, refill_rate):
+        now = time.time()
+        key = f"throttle:bucket:{key}"
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        timeout = int(capacity / refill_rate) + 1
+        if tokens >= 1:
+            self.cache.set(key, (tokens - 1, now), timeout)
+            return True, 0
+        self.cache.set(key, (tokens, now), timeout)
+        return False, (1 - tokens) / refill_rate
+
+    def acquire_slot(self, key, limit):
+        key = f"throttle:slots:{key}"
+        self.cache.add(key, 0, CONCURRENCY_SLOT_TTL)
+        try:
+            active = self.cache.incr(key)
+        except ValueError:
+            # Ключ истек между add и incr
+            self.cache.add(key, 1, CONCURRENCY_SLOT_TTL)
+            active = 1
+        if active > limit:
+            self.cache.decr(key)
+            return False
+        self.cache.touch(key, CONCURRENCY_SLOT_TTL)
+        return True
+
+    def release_slot(self, key):
+        try:
+            self.cache.decr(f"throttle:slots:{key}")
+        except ValueError:
+            pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_throttling_config():
+    return getattr(settings, "MEALTIME_THROTTLING", {})
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = get_throttling_config()
+                backend_class = import_string(
+                    config.get("BACKEND", "core.throttling.MemoryBucketBackend")
+                )
+                _backend = backend_class(**config.get("OPTIONS", {}))
+    return _backend
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый token bucket; scope и kind задаются в подклассах"""
+
+    scope = None
+    kind = None
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = (
+            get_throttling_config().get("RATES", {}).get(self.scope, {}).get(self.kind)
+        )
+        if not rate:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        allowed, self.wait_seconds = get_backend().take(
+            f"{self.scope}:{key}", capacity, refill_rate
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    kind = "user"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return f"user:{request.user.pk}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    kind = "ip"
+
+    def get_cache_key(self, request, view):
+        return f"ip:{self.get_ident(request)}"
+
+
+def bucket_throttles(scope):
+    """Классы throttle для scope: корзина на пользователя и корзина на IP"""
+    return [
+        type(f"{base.__name__}[{scope}]", (base,), {"scope": scope})
+        for base in (UserTokenBucketThrottle, IPTokenBucketThrottle)
+    ]
+
+
+class SlotReleasingContent:
+    """Содержимое потокового ответа, которое освобождает слот при close()"""
+
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+        self.released = False
+
+    def __iter__(self):
+        return iter(self.content)
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            self.release()
+
+
+def limit_concurrency(scope):
+    """
+    Декоратор для action и function-based view: не больше N одновременных
+    запросов пользователя (или IP для анонимов) в этом scope. Потоковый
+    ответ держит слот до закрытия потока.
+    """
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            limit = get_throttling_config().get("CONCURRENCY", {}).get(scope)
+            if not limit:
+                return view_func(*args, **kwargs)
+
+            request = next(arg for arg in args if isinstance(arg, Request))
+
+            if request.user and request.user.is_authenticated:
+                ident = f"user:{request.user.pk}"
+            else:
+                ident = f"ip:{BaseThrottle().get_ident(request)}"
+            key = f"{scope}:{ident}"
+
+            backend = get_backend()
+            if not backend.acquire_slot(key, limit):
+                raise Throttled(
+                    wait=1, detail="Предыдущий запрос еще выполняется, повторите позже"
+                )
+            try:
+                response = view_func(*args, **kwargs)
+            except BaseException:
+                backend.release_slot(key)
+                raise
+            if getattr(response, "streaming", False):
+                # Поток (SSE) занимает воркер, пока клиент подключен: слот
+                # освобождается при закрытии ответа
+                response.streaming_content = SlotReleasingContent(
+                    response.streaming_content, lambda: backend.release_slot(key)
+                )
+            else:
+                backend.release_slot(key)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,90 @@
+"""
+Миниатюры изображений рецептов для компактных карточек.
+
+Миниатюра хранится в том же хранилище, что и оригинал:
+thumbnails/<SIZE>/<путь оригинала>.jpg. Создается при сохранении рецепта
+(core/signals.py) и больше не пересоздается: новое изображение рецепта
+загружается под новым именем файла. Для уже загруженных изображений -
+manage.py generate_thumbnails.
+
+Имя созданной миниатюры записывается в Recipe.thumbnail, и чтение
+(карточки недели) не обращается к хранилищу. Пока миниатюры нет (не
+создана, не удалось прочитать оригинал, изображение только что заменено),
+карточка ссылается на оригинал.
+"""
+
+import io
+import logging
+import os
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+from .models import Recipe
+from .reference import bump_reference_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"SIZE": 320, "QUALITY": 80}
+
+_storage = Recipe._meta.get_field("image").storage
+
+
+def get_thumbnail_config():
+    return {**DEFAULTS, **getattr(settings, "MEALTIME_THUMBNAILS", {})}
+
+
+def thumbnail_name(name, size):
+    return f"thumbnails/{size}/{os.path.splitext(name)[0]}.jpg"
+
+
+def recipe_thumbnail(recipe):
+    """Миниатюра текущего изображения рецепта, если она создана; иначе оригинал"""
+    image = recipe.image.name
+    if image and recipe.thumbnail == thumbnail_name(
+        image, get_thumbnail_config()["SIZE"]
+    ):
+        return recipe.thumbnail
+    return image
+
+
+def ensure_thumbnail(name):
+    """
+    Имя миниатюры изображения name в хранилище; None, если изображения нет
+    или его не удалось прочитать
+    """
+    if not name:
+        return None
+    config = get_thumbnail_config()
+    thumbnail = thumbnail_name(name, config["SIZE"])
+    if _storage.exists(thumbnail):
+        return thumbnail
+
+    try:
+        with _storage.open(name) as file:
+            image = Image.open(file)
+            image.thumbnail((config["SIZE"], config["SIZE"]))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=config["QUALITY"], optimize=True)
+    except OSError:
+        logger.warning("Не удалось создать миниатюру для %s", name, exc_info=True)
+        return None
+    return _storage.save(thumbnail, ContentFile(buffer.getvalue()))
+
+
+def update_recipe_thumbnails(name):
+    """
+    Создает миниатюру изображения name и записывает ее в рецепты с этим
+    изображением. Возвращает имя миниатюры или None.
+    """
+    thumbnail = ensure_thumbnail(name)
+    updated = (
+        Recipe.objects.filter(image=name)
+        .exclude(thumbnail=thumbnail or "")
+        .update(thumbnail=thumbnail or "")
+    )
+    if updated:
+        # Кэш карточек недели зависит от версии рецептов (core/week.py)
+        bump_reference_version("recipes")
+    return thumbnail
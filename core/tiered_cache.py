@@ -0,0 +1,355 @@
+"""
+Двухуровневый кэш для справочных данных.
+
+L1 - ограниченный LRU в памяти процесса (общий для всех потоков), L2 -
+общий кэш (обычно Redis). Чтение из L1 не требует сетевого запроса. Любая
+запись или удаление через TieredCache рассылает сообщение об инвалидации
+через брокер событий (core/events.py, Redis pub/sub), и остальные воркеры
+сразу выбрасывают устаревшие записи из своего L1. L1_TIMEOUT ограничивает устаревание, если
+сообщение потерялось (например, при переподключении к брокеру L1
+очищается целиком).
+
+Ключи в L2 строятся с KEY_PREFIX и VERSION самого TieredCache и номером
+пространства ключей, который тоже хранится в L2. clear() меняет номер
+пространства, а не очищает L2: остальные данные общего кэша (отзывы,
+лимиты запросов и т.д.) не трогаются, старые ключи истекают по TIMEOUT.
+
+Настройка в settings.CACHES:
+
+    "reference": {
+        "BACKEND": "core.tiered_cache.TieredCache",
+        "KEY_PREFIX": "reference",
+        "OPTIONS": {"L2": "default", "MAX_ENTRIES": 1000, "L1_TIMEOUT": 300},
+    }
+"""
+
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from .events import get_broker
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE = "reference"
+NAMESPACE_KEY = "tiered:namespace"
+
+
+class LocalTier:
+    """
+    L1 процесса: LRU, счетчик поколений и подписка на канал инвалидации.
+    Django создает экземпляр кэша на каждый поток, поэтому состояние
+    вынесено сюда и общее для всех экземпляров TieredCache процесса
+    (get_local_tier).
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.pid = os.getpid()
+        self.origin = uuid.uuid4().hex
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        # Увеличивается при каждой инвалидации: значение, прочитанное из L2
+        # до прихода инвалидации, не попадает в L1
+        self.generation = 0
+        self.listening = False
+        # (истекает, номер пространства ключей в L2)
+        self.namespace = None
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, pickled = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        return pickled
+
+    def set(self, key, pickled, timeout, generation, max_entries):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + timeout, pickled)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+
+    def get_namespace(self):
+        with self.lock:
+            if self.namespace is None or self.namespace[0] <= time.monotonic():
+                return None
+            return self.namespace[1]
+
+    def set_namespace(self, namespace, timeout, generation):
+        with self.lock:
+            if generation == self.generation and self.listening:
+                self.namespace = (time.monotonic() + timeout, namespace)
+
+    def drop(self, keys=None):
+        with self.lock:
+            self.generation += 1
+            if keys is None:
+                self.entries.clear()
+                self.namespace = None
+            else:
+                for key in keys:
+                    self.entries.pop(key, None)
+
+    # Инвалидация между процессами
+
+    def ensure_listener(self):
+        """
+        Подписка на канал инвалидации, одна на процесс. Без подписки L1 не
+        используется: иначе чужие изменения были бы не видны.
+        """
+        if self.listening:
+            return True
+        with self.lock:
+            if self.listening:
+                return True
+            try:
+                subscription = get_broker().subscribe(self.channel)
+            except Exception:
+                logger.exception("Не удалось подписаться на %s", self.channel)
+                return False
+            # Инвалидации до подписки не дошли: прочитанное раньше не кэшируем
+            self.generation += 1
+            self.entries.clear()
+            self.namespace = None
+            self.listening = True
+        threading.Thread(target=self.listen, args=(subscription,), daemon=True).start()
+        return True
+
+    def listen(self, subscription):
+        try:
+            while True:
+                message = subscription.get(timeout=30)
+                if message is None:
+                    continue
+                message = json.loads(message)
+                if message["origin"] != self.origin:
+                    self.drop(message.get("keys"))
+        except Exception:
+            logger.exception("Подписка на %s прервана", self.channel)
+        finally:
+            # Сообщения могли потеряться: начинаем с пустого L1
+            with self.lock:
+                self.listening = False
+            self.drop()
+            subscription.close()
+
+    def publish(self, keys=None):
+        self.drop(keys)
+        message = json.dumps({"origin": self.origin, "keys": keys})
+        try:
+            get_broker().publish(self.channel, message)
+        except Exception:
+            logger.exception("Не удалось разослать инвалидацию кэша")
+
+
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+def get_local_tier(key, channel):
+    """L1 текущего процесса для кэша с данным ключом (после fork - новый)"""
+    pid = os.getpid()
+    tier = _local_tiers.get(key)
+    if tier is None or tier.pid != pid:
+        with _local_tiers_lock:
+            tier = _local_tiers.get(key)
+            if tier is None or tier.pid != pid:
+                tier = _local_tiers[key] = LocalTier(channel)
+    return tier
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.l2_alias = options.get("L2", "default")
+        self.l1_timeout = options.get("L1_TIMEOUT", 300)
+        self.channel = options.get("CHANNEL", "cache-invalidation")
+        # Экземпляры с одинаковыми L2, каналом и префиксом ключей делят L1
+        self.tier_key = (self.l2_alias, self.channel, self.key_prefix)
+        self._tier = None
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    @property
+    def tier(self):
+        if self._tier is None or self._tier.pid != os.getpid():
+            self._tier = get_local_tier(self.tier_key, self.channel)
+        return self._tier
+
+    # L1
+
+    def _l1_get(self, key):
+        return self.tier.get(key)
+
+    def _l1_set(self, key, value, timeout, generation):
+        tier = self.tier
+        if not tier.ensure_listener():
+            return
+        timeout = self.l1_timeout if timeout is None else min(timeout, self.l1_timeout)
+        if timeout <= 0:
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        tier.set(key, pickled, timeout, generation, self._max_entries)
+
+    def _invalidate(self, keys=None):
+        self.tier.publish(keys)
+
+    # L2
+
+    def _namespace(self):
+        """Номер пространства ключей в L2 (в L1 - не дольше L1_TIMEOUT)"""
+        tier = self.tier
+        namespace = tier.get_namespace()
+        if namespace is None:
+            generation = tier.generation
+            namespace_key = self.make_key(NAMESPACE_KEY)
+            namespace = self.l2.get(namespace_key)
+            if namespace is None:
+                self.l2.add(namespace_key, uuid.uuid4().hex, None)
+                namespace = self.l2.get(namespace_key)
+            if tier.ensure_listener():
+                tier.set_namespace(namespace, self.l1_timeout, generation)
+        return namespace
+
+    def _l2_key(self, made_key, namespace=None):
+        return f"{made_key}:{namespace or self._namespace()}"
+
+    def _l2_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # API кэша Django
+
+    def get(self, key, default=None, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        pickled = self._l1_get(made_key)
+        if pickled is not None:
+            return pickle.loads(pickled)
+        generation = self.tier.generation
+        value = self.l2.get(self._l2_key(made_key), self)
+        if value is self:
+            return default
+        self._l1_set(made_key, value, None, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = {}
+        for key in keys:
+            made_key = self.make_and_validate_key(key, version=version)
+            pickled = self._l1_get(made_key)
+            if pickled is not None:
+                found[key] = pickle.loads(pickled)
+            else:
+                missing[key] = made_key
+        if missing:
+            generation = self.tier.generation
+            namespace = self._namespace()
+            l2_keys = {
+                self._l2_key(made_key, namespace): (key, made_key)
+                for key, made_key in missing.items()
+            }
+            for l2_key, value in self.l2.get_many(l2_keys).items():
+                key, made_key = l2_keys[l2_key]
+                self._l1_set(made_key, value, None, generation)
+                found[key] = value
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self.l2.set(self._l2_key(made_key), value, self._l2_timeout(timeout))
+        self._invalidate([made_key])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        return self.l2.add(self._l2_key(made_key), value, self._l2_timeout(timeout))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        namespace = self._namespace()
+        made_keys = {
+            key: self.make_and_validate_key(key, version=version) for key in data
+        }
+        failed = self.l2.set_many(
+            {
+                self._l2_key(made_keys[key], namespace): value
+                for key, value in data.items()
+            },
+            self._l2_timeout(timeout),
+        )
+        self._invalidate(list(made_keys.values()))
+        return [
+            key
+            for key, made_key in made_keys.items()
+            if self._l2_key(made_key, namespace) in failed
+        ]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        return self.l2.touch(self._l2_key(made_key), self._l2_timeout(timeout))
+
+    def delete(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        deleted = self.l2.delete(self._l2_key(made_key))
+        self._invalidate([made_key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        namespace = self._namespace()
+        made_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        self.l2.delete_many(
+            [self._l2_key(made_key, namespace) for made_key in made_keys]
+        )
+        self._invalidate(made_keys)
+
+    def has_key(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        if self._l1_get(made_key) is not None:
+            return True
+        return self.l2.has_key(self._l2_key(made_key))
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        value = self.l2.incr(self._l2_key(made_key), delta)
+        self._invalidate([made_key])
+        return value
+
+    def clear(self):
+        # Только свои ключи: новое пространство ключей в L2
+        self.l2.set(self.make_key(NAMESPACE_KEY), uuid.uuid4().hex, None)
+        self._invalidate()
+
+
+def reference_cache():
+    return caches[REFERENCE_CACHE]
+
+
+def reference_data(name, loader):
+    """Справочные данные из кэша; при промахе считаются loader()"""
+    cache = reference_cache()
+    key = f"reference:{name}"
+    data = cache.get(key)
+    if data is None:
+        data = loader()
+        # add, а не set: заполнение после промаха не требует рассылки
+        cache.add(key, data)
+    return data
+
+
+def invalidate_reference(*names):
+    reference_cache().delete_many([f"reference:{name}" for name in names])
@@ -3,6 +3,8 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .api import *
 from .payments import *
+from .batch import BatchView
+from .ical import meal_plan_calendar
 
 router = DefaultRouter()
 
@@ -11,6 +13,7 @@ router.register(r"cooking-methods", CookingMethodViewSet)
 router.register(r"ingredients", IngredientViewSet)
 router.register(r"recipes", RecipeViewSet)
 router.register(r"meal-plans", MealPlanViewSet)
+router.register(r"meal-plan-templates", MealPlanTemplateViewSet)
 router.register(r"shopping-lists", ShoppingListViewSet)
 router.register(r"shopping-list-items", ShoppingListItemViewSet)
 router.register(r"shopping-templates", ShoppingListTemplateViewSet)
@@ -38,4 +41,10 @@ urlpatterns = [
     path('api/payments/success/', payment_success, name='payment_success'),
     path('api/payments/fail/', payment_fail, name='payment_fail'),
     path('api/sitemap-data/', sitemap_data, name='sitemap_data'),
+    path("api/sync/", sync_changes, name="sync_changes"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path("api/bootstrap/", bootstrap, name="bootstrap"),
+    path(
+        "api/calendar/<str:token>.ics", meal_plan_calendar, name="meal_plan_calendar"
+    ),
 ]
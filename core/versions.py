@@ -0,0 +1,101 @@
+import functools
+import hashlib
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .models import UserDataVersion
+from .reference import reference_version
+
+# Общие данные, которые попадают в ответы с личными данными: их изменение
+# тоже меняет ETag (версии из core/reference.py)
+SHARED_VERSIONS = {
+    "meal_plans": ["recipes"],
+    "shopping_lists": ["ingredients", "categories"],
+    "purchases": ["premium_meal_plans"],
+}
+
+
+def bump_user_version(user_id, *counters):
+    """
+    Атомарно увеличивает счетчики версий пользователя (в рамках текущей
+    транзакции). Строка создается при первом изменении.
+    """
+    updates = {counter: F(counter) + 1 for counter in counters}
+    # update() не обновляет auto_now: время изменения нужно для Last-Modified
+    updates["updated_at"] = timezone.now()
+    if UserDataVersion.objects.filter(user_id=user_id).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            UserDataVersion.objects.create(
+                user_id=user_id, **{counter: 1 for counter in counters}
+            )
+    except IntegrityError:
+        # Строку параллельно создал другой запрос
+        UserDataVersion.objects.filter(user_id=user_id).update(**updates)
+
+
+def get_user_versions(user_id, *counters):
+    """Возвращает значения счетчиков пользователя (нули, если изменений еще не было)"""
+    row = UserDataVersion.objects.filter(user_id=user_id).values(*counters).first()
+    return row or {counter: 0 for counter in counters}
+
+
+def bump_queryset_versions(queryset, *counters):
+    """
+    Увеличивает счетчики всех владельцев объектов queryset.
+    Нужно вызывать рядом с queryset.update(), который не отправляет сигналы.
+    """
+    for user_id in set(queryset.values_list("user_id", flat=True)):
+        bump_user_version(user_id, *counters)
+
+
+def user_data_etag(request, counters):
+    """ETag ответа с данными пользователя: один запрос к UserDataVersion"""
+    versions = get_user_versions(request.user.pk, *counters)
+    parts = [
+        str(request.user.pk),
+        request.build_absolute_uri(),
+        getattr(request, "accepted_media_type", ""),
+        *(str(versions[counter]) for counter in counters),
+        *(
+            reference_version(name)
+            for counter in counters
+            for name in SHARED_VERSIONS[counter]
+        ),
+    ]
+    return '"%s"' % hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def conditional_user_data(*counters):
+    """
+    Декоратор для action и list: ставит ETag по версиям данных пользователя
+    и отвечает 304 Not Modified без выполнения view, если версия у клиента
+    актуальна.
+    """
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            etag = user_data_etag(request, counters)
+            # Сжатые ответы клиент возвращает со слабым ETag (W/"...")
+            if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+            if etag in [tag.removeprefix("W/") for tag in if_none_match]:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_func(*args, **kwargs)
+            if response.status_code in (200, 304):
+                response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+            return response
+
+        return wrapper
+
+    return decorator
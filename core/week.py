@@ -0,0 +1,136 @@
+"""
+Документ недели для экрана планировщика (/api/meal-plans/week/).
+
+Сетка день × прием пищи с компактными карточками рецептов (с миниатюрами)
+и итогами по дням. Собирается двумя запросами с only() и хранится в кэше
+по версии планов питания пользователя (versions.py) и версии рецептов
+(reference.py): любое изменение дает новый ключ, старые записи уходят
+по таймауту.
+"""
+
+import hashlib
+from datetime import timedelta
+from django.core.cache import cache
+from .bootstrap import week_bounds
+from .fast_serializers import DIFFICULTY_LABELS, format_image
+from .models import MealPlan, RecipeMealPlan
+from .reference import reference_version
+from .thumbnails import recipe_thumbnail
+from .versions import get_user_versions
+
+WEEK_CACHE_TIMEOUT = 3600
+
+
+def week_cache_key(user, start, request):
+    version = get_user_versions(user.pk, "meal_plans")["meal_plans"]
+    # Ссылки на изображения абсолютные и зависят от хоста запроса
+    host = hashlib.md5(request.build_absolute_uri("/").encode()).hexdigest()[:8]
+    return (
+        f"meal_plans:week:{user.pk}:{version}:{reference_version('recipes')}:"
+        f"{start.isoformat()}:{host}"
+    )
+
+
+def recipe_card(entry, request):
+    recipe = entry.recipe
+    image = recipe.image.name
+    thumbnail = recipe_thumbnail(recipe)
+    return {
+        "id": str(entry.id),
+        "recipe": str(recipe.id),
+        "name": recipe.name,
+        "cooking_time": recipe.cooking_time,
+        "difficulty": recipe.difficulty,
+        "difficulty_display": DIFFICULTY_LABELS.get(
+            recipe.difficulty, recipe.difficulty
+        ),
+        "is_premium": recipe.is_premium,
+        "image": format_image(image, request),
+        "thumbnail": format_image(thumbnail, request),
+        "portions": entry.portions,
+        "order": entry.order,
+    }
+
+
+def build_week(user, start, end, request):
+    meal_plans = list(
+        MealPlan.objects.filter(user=user, date__gte=start, date__lte=end).only(
+            "id", "date", "meal_type"
+        )
+    )
+    cards = {meal_plan.id: [] for meal_plan in meal_plans}
+    entries = (
+        RecipeMealPlan.objects.filter(meal_plan_id__in=list(cards))
+        .select_related("recipe")
+        .only(
+            "id",
+            "meal_plan_id",
+            "portions",
+            "order",
+            "recipe__id",
+            "recipe__name",
+            "recipe__cooking_time",
+            "recipe__difficulty",
+            "recipe__image",
+            "recipe__thumbnail",
+            "recipe__is_premium",
+        )
+        .order_by("order")
+    )
+    for entry in entries:
+        cards[entry.meal_plan_id].append(recipe_card(entry, request))
+
+    grid = {}
+    for meal_plan in meal_plans:
+        grid[(meal_plan.date, meal_plan.meal_type)] = {
+            "id": str(meal_plan.id),
+            "recipes": cards[meal_plan.id],
+        }
+
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        meals = {
+            meal_type: grid.get((day, meal_type))
+            for meal_type, _ in MealPlan.MEAL_TYPES
+        }
+        day_cards = [
+            card for meal in meals.values() if meal for card in meal["recipes"]
+        ]
+        days.append(
+            {
+                "date": day.isoformat(),
+                "meals": meals,
+                "totals": {
+                    "meals_count": sum(1 for meal in meals.values() if meal),
+                    "recipes_count": len(day_cards),
+                    "cooking_time": sum(
+                        card["cooking_time"] or 0 for card in day_cards
+                    ),
+                },
+            }
+        )
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "meal_types": [
+            {"value": value, "label": label} for value, label in MealPlan.MEAL_TYPES
+        ],
+        "days": days,
+        "totals": {
+            name: sum(day["totals"][name] for day in days)
+            for name in ("meals_count", "recipes_count", "cooking_time")
+        },
+    }
+
+
+def get_week(user, day, request):
+    """Документ недели, в которую попадает day"""
+    start, end = week_bounds(day)
+    key = week_cache_key(user, start, request)
+    data = cache.get(key)
+    if data is None:
+        data = build_week(user, start, end, request)
+        cache.set(key, data, WEEK_CACHE_TIMEOUT)
+    return data
@@ -38,12 +38,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # Должен быть первым
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "core.middleware.CompressionMiddleware",
+    "core.middleware.CatalogSnapshotMiddleware",
+    # Обертки middleware Django, которые пропускают запросы к
+    # MEALTIME_MIDDLEWARE["LEAN_PATHS"] (JWT API), см. core/middleware.py
+    "core.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.CsrfViewMiddleware",
+    "core.middleware.AuthenticationMiddleware",
+    "core.middleware.MessageMiddleware",
+    "core.middleware.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "mealtime_backend.urls"
@@ -126,9 +130,23 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # GET-запросы не читают пользователя из БД, см. core/authentication.py
+        "core.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # orjson вместо стандартного json (см. manage.py benchmark_json).
+    # MessagePack - по Accept: application/msgpack (manage.py benchmark_msgpack)
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "core.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
@@ -138,6 +156,114 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Кэш. В продакшене с несколькими воркерами используйте общий бэкенд, например:
+# "BACKEND": "django.core.cache.backends.redis.RedisCache",
+# "LOCATION": "redis://127.0.0.1:6379/1",
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Справочники: LRU в памяти воркера перед общим кэшем, инвалидация
+    # через MEALTIME_EVENTS_BROKER (core/tiered_cache.py)
+    "reference": {
+        "BACKEND": "core.tiered_cache.TieredCache",
+        "TIMEOUT": 24 * 3600,
+        "KEY_PREFIX": "reference",
+        "OPTIONS": {"L2": "default", "MAX_ENTRIES": 1000, "L1_TIMEOUT": 300},
+    },
+}
+
+# Ограничение частоты тяжелых запросов (core/throttling.py).
+# RATES: token bucket на пользователя и на IP, "N/период" - N запросов
+# подряд, затем N за период. CONCURRENCY: одновременных запросов на пользователя.
+MEALTIME_THROTTLING = {
+    "BACKEND": "core.throttling.CacheBucketBackend",
+    "OPTIONS": {"cache": "default"},
+    "RATES": {
+        "shopping_lists.generate": {"user": "10/min", "ip": "30/min"},
+        "recipes.search": {"user": "60/min", "ip": "120/min"},
+        "payments.create": {"user": "5/min", "ip": "20/min"},
+        "batch": {"user": "30/min", "ip": "60/min"},
+        # Переподключения SSE-потоков списков покупок
+        "shopping_lists.events": {"user": "30/min", "ip": "60/min"},
+    },
+    "CONCURRENCY": {
+        "shopping_lists.generate": 1,
+        # Открытых SSE-потоков на пользователя: каждый занимает воркер
+        "shopping_lists.events": 3,
+        "recipes.search": 2,
+        "payments.create": 1,
+    },
+}
+
+# Пакетные запросы /api/batch/ (core/batch.py): не больше MAX_REQUESTS
+# подзапросов суммарной стоимостью до MAX_COST (COSTS - по префиксу пути)
+MEALTIME_BATCH = {
+    "MAX_REQUESTS": 10,
+    "MAX_COST": 20,
+    "ALLOWED_METHODS": ["GET"],
+    "DEFAULT_COST": 1,
+    "COSTS": {
+        "/api/recipes/search/": 3,
+        "/api/recipes/batch/": 3,
+        "/api/meal-plans/range/": 2,
+        "/api/meal-plans/week/": 2,
+        "/api/meal-plans/summary/": 2,
+        "/api/shopping-lists/history/": 3,
+        "/api/sync/": 5,
+    },
+}
+
+# Миниатюры изображений рецептов для карточек недели (core/thumbnails.py)
+MEALTIME_THUMBNAILS = {"SIZE": 320, "QUALITY": 80}
+
+# Лента планов питания iCalendar (core/ical.py): время начала приемов пищи
+# и сколько прошедших дней отдавать
+MEALTIME_CALENDAR = {"DURATION_MINUTES": 45, "PAST_DAYS": 30}
+
+# Пути JWT API: сессии, CSRF, auth, messages и X-Frame-Options для них не
+# работают (core/middleware.py). Админка проходит полную цепочку.
+MEALTIME_MIDDLEWARE = {"LEAN_PATHS": ["/api/"]}
+
+# Сжатие ответов (core/middleware.py). Ответы с CACHE_PATHS сжимаются
+# один раз и хранятся в кэше по хэшу содержимого.
+MEALTIME_COMPRESSION = {
+    "MIN_SIZE": 1024,
+    "ENCODINGS": ["br", "gzip"],
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "CACHE_PATHS": [
+        "/api/recipes/",
+        "/api/premium-meal-plans/",
+        "/api/tags/",
+        "/api/ingredients/",
+        "/api/ingredient-categories/",
+        "/api/cooking-methods/",
+        "/api/sitemap-data/",
+    ],
+    "CACHE": "default",
+    "CACHE_TIMEOUT": 3600,
+}
+
+# Кэш общей части JSON рецептов (core/recipe_fragments.py)
+MEALTIME_RECIPE_FRAGMENTS = {
+    "CACHE": "default",
+    "TIMEOUT": 24 * 3600,
+}
+
+# Статический снимок каталога для анонимных запросов (core/catalog.py).
+# BASE_URL - адрес API, для которого рендерятся абсолютные ссылки; снимок
+# отдается только запросам на этот хост. Задается переменной окружения
+# MEALTIME_CATALOG_BASE_URL (например, https://mealtime-planner.ru).
+# AUTO_PUBLISH - пересобирать снимок в фоне после изменений каталога; без
+# адреса API снимок никому не отдается, поэтому пересборка выключена.
+CATALOG_BASE_URL = os.environ.get("MEALTIME_CATALOG_BASE_URL", "")
+MEALTIME_CATALOG = {
+    "ROOT": BASE_DIR / "catalog",
+    "BASE_URL": CATALOG_BASE_URL or "http://localhost:8000",
+    "AUTO_PUBLISH": bool(CATALOG_BASE_URL),
+}
+
 # CORS settings (для разработки)
 CORS_ALLOW_ALL_ORIGINS = True  # В продакшене замените на конкретные домены
 CORS_ALLOW_CREDENTIALS = True
@@ -198,10 +324,23 @@ from datetime import timedelta
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    # Добавляет в токен username и версию токенов (auth_ver)
+    "TOKEN_OBTAIN_SERIALIZER": "core.authentication.MealtimeTokenObtainPairSerializer",
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Live-обновления списков покупок (SSE).
+# LocalBroker работает в пределах одного процесса. Для нескольких воркеров
+# gunicorn используйте Redis (нужен пакет redis):
+# MEALTIME_EVENTS_BROKER = {
+#     "BACKEND": "core.events.RedisBroker",
+#     "OPTIONS": {"url": "redis://localhost:6379/0"},
+# }
+MEALTIME_EVENTS_BROKER = {"BACKEND": "core.events.LocalBroker"}
+MEALTIME_EVENTS_KEEPALIVE = 15  # секунд между keepalive-комментариями
+MEALTIME_EVENTS_STREAM_TIMEOUT = 300  # секунд до переподключения клиента
+
 # Настройки для загрузки файлов
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB